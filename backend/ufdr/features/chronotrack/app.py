@@ -4,13 +4,28 @@ chronotrack_terminal.py
 Forensic research & case analysis using Gemini 2.5 Flash (no Flask).
 You type file paths, it sends all evidence in one multimodal API call,
 and prints structured JSON describing transcripts, entities, events, timeline, etc.
+Larger cases run in map-reduce mode instead: groups of files, and token-budgeted
+windows of long text files (see text_chunker.py), are analyzed concurrently
+and their results merged locally (see case_merge.py).
+Results are cached locally by evidence content, so re-running an unchanged case
+costs no API call (see result_cache.py).
 """
 
 import os
 import json
+import mmap
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import httpx
 from dotenv import load_dotenv
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+
+from case_merge import merge_results
+from rate_limit import RequestGate
+from result_cache import DEFAULT_CACHE_PATH, DEFAULT_MAX_BYTES, ResultCache
+from text_chunker import CHARS_PER_TOKEN, DEFAULT_CHUNK_TOKENS, DEFAULT_OVERLAP_TOKENS, TEXT_EXTENSIONS, iter_chunks
+from upload_registry import DEFAULT_REGISTRY_PATH, UploadRegistry
 
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
@@ -19,6 +34,31 @@ API_KEY = os.getenv("GEMINI_API_KEY")
 client = genai.Client(api_key=API_KEY)
 MODEL = "gemini-2.5-flash"
 
+# results of earlier runs are reused while the evidence, prompt, schema, model and config are unchanged
+CACHE_PATH = os.getenv("CHRONO_CACHE_PATH", DEFAULT_CACHE_PATH)
+CACHE_MAX_BYTES = int(os.getenv("CHRONO_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+# large files already uploaded (same content, handle not expired) are not sent again
+UPLOADS_PATH = os.getenv("CHRONO_UPLOADS_PATH", DEFAULT_REGISTRY_PATH)
+# files prepared (read or uploaded) at once for a single request
+UPLOAD_WORKERS = 4
+
+# "single" sends every file in one request, "map-reduce" analyzes groups of files
+# concurrently and merges the results; "auto" picks map-reduce when there is more than one group
+ANALYSIS_MODES = ["auto", "single", "map-reduce"]
+ANALYSIS_MODE = os.getenv("CHRONO_MODE", "auto")
+# requests in flight at once in map-reduce mode
+MAP_CONCURRENCY = int(os.getenv("CHRONO_MAP_CONCURRENCY", 4))
+# small files are analyzed together up to this many bytes / files per request
+MAP_GROUP_BYTES = 4 * 1024 * 1024
+MAP_GROUP_FILES = 8
+MAX_OUTPUT_TOKENS = 3000
+# each map request covers less evidence, but must not truncate its JSON
+MAP_MAX_OUTPUT_TOKENS = 8192
+# text files longer than one window are analyzed in windows of this many (estimated)
+# tokens, each repeating the last messages of the one before
+TEXT_CHUNK_TOKENS = int(os.getenv("CHRONO_CHUNK_TOKENS", DEFAULT_CHUNK_TOKENS))
+TEXT_OVERLAP_TOKENS = int(os.getenv("CHRONO_CHUNK_OVERLAP_TOKENS", DEFAULT_OVERLAP_TOKENS))
+
 # ------------------ helper schema ------------------
 def build_response_schema():
     return {
@@ -89,56 +129,88 @@ def build_response_schema():
 
 
 # ------------------ helper: convert file to part ------------------
-def file_to_part(path):
-    """Return a types.Part or uploaded file ref depending on size"""
+# files below this size are sent inline; larger ones go through the Files API
+INLINE_MAX_BYTES = 20 * 1024 * 1024
+# bytes read from the start of a file to recognise its type
+SNIFF_BYTES = 64
+
+# (offset, magic bytes, mime type), checked in order
+MAGIC_NUMBERS = [
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"ID3", "audio/mpeg"),
+    (8, b"WAVE", "audio/wav"),
+    (0, b"OggS", "audio/ogg"),
+    (0, b"fLaC", "audio/flac"),
+    (8, b"M4A ", "audio/mp4"),
+    (4, b"ftyp", "video/mp4"),
+    # UTF-16 chat exports (checked before the MPEG frame sync they resemble)
+    (0, b"\xff\xfe", "text/plain"),
+    (0, b"\xfe\xff", "text/plain"),
+]
+
+EXTENSION_MIME = {
+    ".txt": "text/plain", ".log": "text/plain", ".csv": "text/plain", ".json": "text/plain",
+    ".jpg": "image/jpeg", ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".mp3": "audio/mpeg", ".wav": "audio/mpeg", ".m4a": "audio/mpeg",
+    ".pdf": "application/pdf",
+}
+
+
+def detect_mime(path):
+    """MIME type from the file's first bytes, falling back to its extension."""
     with open(path, "rb") as f:
-        data = f.read()
-    size = len(data)
-    mime = "application/octet-stream"
-    ext = os.path.splitext(path)[1].lower()
-    if ext in [".txt", ".log", ".csv", ".json"]:
-        mime = "text/plain"
-    elif ext in [".jpg", ".jpeg"]:
-        mime = "image/jpeg"
-    elif ext == ".png":
-        mime = "image/png"
-    elif ext in [".mp3", ".wav", ".m4a"]:
-        mime = "audio/mpeg"
-    elif ext == ".pdf":
-        mime = "application/pdf"
+        header = f.read(SNIFF_BYTES)
+    for offset, magic, mime in MAGIC_NUMBERS:
+        if header[offset:offset + len(magic)] == magic:
+            return mime
+    # MPEG audio frame sync without an ID3 tag
+    if len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return "audio/mpeg"
+    return EXTENSION_MIME.get(os.path.splitext(path)[1].lower(), "application/octet-stream")
+
+
+def read_inline(path, size):
+    """The bytes of a small file, copied once out of a read-only memory map."""
+    if size == 0:
+        return b""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[:]
+
+
+def file_to_part(path, uploads=None):
+    """
+    Return a types.Part or uploaded file ref depending on size. The size comes
+    from os.stat and the type from a header read, so a file that is uploaded is
+    never read into memory here; only files under INLINE_MAX_BYTES are. With an
+    UploadRegistry, a live earlier upload of the same content is reused.
+    """
+    size = os.stat(path).st_size
+    mime = detect_mime(path)
 
     # Inline if small
-    if size < 20 * 1024 * 1024:
-        return types.Part.from_bytes(data=data, mime_type=mime)
+    if size < INLINE_MAX_BYTES:
+        return types.Part.from_bytes(data=read_inline(path, size), mime_type=mime)
+    elif uploads is not None:
+        uploaded = uploads.upload(path, mime)
+        return types.Part.from_uri(file_uri=uploaded.uri, mime_type=uploaded.mime_type or mime)
     else:
-        uploaded = client.files.upload(file=path)
+        # the SDK streams the file from disk
+        uploaded = client.files.upload(file=path, config={"mime_type": mime})
         return uploaded
 
-# ------------------ main logic ------------------
-def main():
-    print("🕵️‍♂️ ChronoTrack Forensic Analyzer (Terminal Edition)")
-    print("Enter paths of files to analyze (text, images, audio).")
-    print("Type 'done' when finished.\n")
-
-    file_paths = []
-    while True:
-        p = input("Path> ").strip('" ').strip()
-        if p.lower() == "done":
-            break
-        if os.path.isfile(p):
-            file_paths.append(p)
-        else:
-            print("⚠️  File not found, try again.")
 
-    if not file_paths:
-        print("No files given. Exiting.")
-        return
+def file_parts(file_paths, uploads=None, workers=UPLOAD_WORKERS):
+    """file_to_part() for every path, with independent uploads running concurrently."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda path: file_to_part(path, uploads), file_paths))
 
-    case_id = input("\nCase ID (optional): ") or "CASE-001"
-    investigator = input("Investigator name (optional): ") or "Unknown"
-
-    case_meta = {"case_id": case_id, "investigator": investigator}
-    contents = [
+# ------------------ helper: request ------------------
+def build_prompt(case_meta, file_paths):
+    """The text parts of the request; the file parts follow them."""
+    return [
         f"""
 You are a forensic AI assistant. You will receive multiple evidence files.
 Tasks:
@@ -154,17 +226,65 @@ Case metadata: {json.dumps(case_meta)}
         "FILES:\n" + "\n".join(os.path.basename(p) for p in file_paths)
     ]
 
-    # add file parts
-    for path in file_paths:
-        contents.append(file_to_part(path))
 
-    config = {
+def build_config(max_output_tokens=MAX_OUTPUT_TOKENS):
+    return {
         "response_mime_type": "application/json",
         "response_schema": build_response_schema(),
-        "max_output_tokens": 3000,
+        "max_output_tokens": max_output_tokens,
         "temperature": 0.0,
     }
 
+
+def response_text(resp):
+    """The text of a generate_content response, or None."""
+    text = getattr(resp, "text", None)
+    if not text and hasattr(resp, "candidates"):
+        try:
+            text = resp.candidates[0].content.parts[0].text
+        except Exception:
+            pass
+    return text
+
+
+class AnalysisError(Exception):
+    """A response without a usable JSON result; `detail` is the raw response or text."""
+
+    def __init__(self, message, detail=None):
+        super().__init__(message)
+        self.detail = detail
+
+
+def parse_result(resp):
+    """The JSON result of a generate_content response; raises AnalysisError."""
+    text = response_text(resp)
+    if not text:
+        raise AnalysisError("No text in response", resp)
+    try:
+        return json.loads(text)
+    except ValueError:
+        raise AnalysisError("Model did not return valid JSON; raw text below", text)
+
+
+def analyze(file_paths, case_meta, cache=None, uploads=None):
+    """
+    Runs one analysis and returns the parsed JSON result, or None after printing
+    why it failed. With a ResultCache, unchanged evidence is answered from disk.
+    """
+    prompt = build_prompt(case_meta, file_paths)
+    config = build_config()
+
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key(MODEL, prompt, config, file_paths)
+        result = cache.get(cache_key)
+        if result is not None:
+            print("\n⚡ Evidence unchanged since an earlier run; using the cached analysis.")
+            return result
+
+    # add file parts
+    contents = prompt + file_parts(file_paths, uploads)
+
     print("\n⏳ Sending evidence to Gemini 2.5 Flash...")
     try:
         resp = client.models.generate_content(
@@ -174,26 +294,211 @@ Case metadata: {json.dumps(case_meta)}
         )
     except Exception as e:
         print(f"❌ API call failed: {e}")
-        return
+        return None
 
     # try to extract JSON
-    text = getattr(resp, "text", None)
-    if not text and hasattr(resp, "candidates"):
-        try:
-            text = resp.candidates[0].content.parts[0].text
-        except Exception:
-            pass
+    try:
+        result = parse_result(resp)
+    except AnalysisError as e:
+        print(f"⚠️  {e}:\n")
+        print(e.detail)
+        return None
 
-    if not text:
-        print("⚠️  No text in response:")
-        print(resp)
+    if cache is not None:
+        cache.put(cache_key, result)
+    return result
+
+# ------------------ helper: transient errors ------------------
+# retried with backoff by RequestGate: rate limiting, timeouts and server-side failures
+# (google-genai sends requests through httpx, so dropped connections and read
+# timeouts surface as httpx.TransportError rather than the built-in exceptions)
+TRANSIENT_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+
+
+def is_transient(error):
+    if isinstance(error, errors.APIError):
+        return error.code in TRANSIENT_STATUS_CODES
+    return isinstance(error, (ConnectionError, TimeoutError, asyncio.TimeoutError, httpx.TransportError))
+
+# ------------------ map-reduce mode ------------------
+def is_chunked(path):
+    """True for a text file too long for one window (analyzed chunk by chunk)."""
+    return (os.path.splitext(path)[1].lower() in TEXT_EXTENSIONS
+            and os.stat(path).st_size > TEXT_CHUNK_TOKENS * CHARS_PER_TOKEN)
+
+
+def group_files(file_paths, max_bytes=MAP_GROUP_BYTES, max_files=MAP_GROUP_FILES):
+    """Splits the evidence into request groups: each large file alone, small files packed together."""
+    groups = []
+    current, current_bytes = [], 0
+    for path in file_paths:
+        size = os.stat(path).st_size
+        if size >= max_bytes:
+            groups.append([path])
+            continue
+        if current and (current_bytes + size > max_bytes or len(current) >= max_files):
+            groups.append(current)
+            current, current_bytes = [], 0
+        current.append(path)
+        current_bytes += size
+    if current:
+        groups.append(current)
+    return groups
+
+
+def choose_mode(file_paths, mode=ANALYSIS_MODE):
+    if mode not in ANALYSIS_MODES:
+        raise ValueError(f"Unknown analysis mode '{mode}' (expected one of {', '.join(ANALYSIS_MODES)})")
+    if mode == "auto":
+        if len(group_files(file_paths)) > 1 or any(is_chunked(p) for p in file_paths):
+            return "map-reduce"
+        return "single"
+    return mode
+
+
+async def analyze_group_async(paths, case_meta, cache=None, gate=None, uploads=None):
+    """Map step: analyzes one group of files; raises on failure."""
+    prompt = build_prompt(case_meta, paths)
+    config = build_config(MAP_MAX_OUTPUT_TOKENS)
+    cache_key = None
+    if cache is not None:
+        # hashing reads the files, so it runs off the event loop like the uploads
+        cache_key = await asyncio.to_thread(cache.key, MODEL, prompt, config, paths)
+        result = cache.get(cache_key)
+        if result is not None:
+            return result
+    parts = await asyncio.gather(*(_file_part_async(path, uploads, gate) for path in paths))
+    return await _generate_async(prompt + list(parts), config, cache, cache_key, gate)
+
+
+async def _file_part_async(path, uploads, gate):
+    """file_to_part() off the event loop; an upload is a request, so it goes through the gate."""
+    if os.stat(path).st_size < INLINE_MAX_BYTES:
+        return await asyncio.to_thread(file_to_part, path, uploads)
+    return await gate.call(lambda: asyncio.to_thread(file_to_part, path, uploads))
+
+
+async def analyze_chunk_async(path, chunk, case_meta, cache=None, gate=None):
+    """Map step: analyzes one window of a long text file; raises on failure."""
+    prompt = build_prompt(case_meta, [path]) + [
+        f"This is an excerpt of {os.path.basename(path)}, lines {chunk.first_line}-{chunk.last_line}. "
+        "Its first messages may repeat the end of the previous excerpt."
+    ]
+    config = build_config(MAP_MAX_OUTPUT_TOKENS)
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.key(MODEL, prompt + [chunk.digest], config, [])
+        result = cache.get(cache_key)
+        if result is not None:
+            return result
+    part = types.Part.from_bytes(data=chunk.text.encode("utf-8"), mime_type="text/plain")
+    return await _generate_async(prompt + [part], config, cache, cache_key, gate)
+
+
+async def _generate_async(contents, config, cache, cache_key, gate):
+    resp = await gate.call(lambda: client.aio.models.generate_content(
+        model=MODEL,
+        contents=contents,
+        config=config
+    ))
+    result = parse_result(resp)
+    if cache is not None:
+        cache.put(cache_key, result)
+    return result
+
+
+def map_jobs(file_paths, case_meta, cache=None, gate=None, uploads=None):
+    """
+    Yields (label, paths, job) for every map request, where job() returns the
+    request's coroutine. Windows of long text files are only read when reached.
+    """
+    chunked = [p for p in file_paths if is_chunked(p)]
+    for group in group_files([p for p in file_paths if p not in chunked]):
+        label = ", ".join(os.path.basename(p) for p in group)
+        yield label, group, lambda group=group: analyze_group_async(group, case_meta, cache=cache, gate=gate, uploads=uploads)
+    for path in chunked:
+        for chunk in iter_chunks(path, TEXT_CHUNK_TOKENS, TEXT_OVERLAP_TOKENS):
+            label = f"{os.path.basename(path)} lines {chunk.first_line}-{chunk.last_line}"
+            yield label, [path], lambda path=path, chunk=chunk: analyze_chunk_async(path, chunk, case_meta, cache=cache, gate=gate)
+
+
+async def analyze_map_reduce_async(file_paths, case_meta, cache=None, concurrency=MAP_CONCURRENCY, gate=None,
+                                   uploads=None):
+    """
+    Coroutine behind analyze_map_reduce(). A RequestGate shared between cases
+    paces their requests together; by default each run gets its own.
+    """
+    if gate is None:
+        gate = RequestGate(transient=is_transient)
+    jobs = enumerate(map_jobs(file_paths, case_meta, cache=cache, gate=gate, uploads=uploads))
+    outcomes = []
+    failed = []
+
+    # a fixed pool of workers pulls jobs as it goes, so at most `concurrency`
+    # requests (and text windows) are in memory at once however long the case is
+    async def worker():
+        for position, (label, paths, job) in jobs:
+            try:
+                outcomes.append((position, label, await job()))
+            except Exception as e:
+                print(f"❌ {label}: {e}")
+                failed.extend(p for p in paths if p not in failed)
+
+    print(f"\n⏳ Analyzing {len(file_paths)} files, {concurrency} requests at a time...")
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    if not outcomes:
+        return None
+
+    # reduce step: merged locally in evidence order, no further API call
+    outcomes.sort(key=lambda outcome: outcome[0])
+    result = merge_results([(label, outcome) for _, label, outcome in outcomes])
+    if failed:
+        result["failed_files"] = [os.path.basename(p) for p in failed]
+    return result
+
+
+def analyze_map_reduce(file_paths, case_meta, cache=None, concurrency=MAP_CONCURRENCY, uploads=None):
+    """
+    Analyzes groups of files and windows of long text files concurrently (at
+    most `concurrency` requests at a time) and merges their results. Returns
+    None if every request failed.
+    """
+    return asyncio.run(analyze_map_reduce_async(file_paths, case_meta, cache=cache, concurrency=concurrency,
+                                                uploads=uploads))
+
+# ------------------ main logic ------------------
+def main():
+    print("🕵️‍♂️ ChronoTrack Forensic Analyzer (Terminal Edition)")
+    print("Enter paths of files to analyze (text, images, audio).")
+    print("Type 'done' when finished.\n")
+
+    file_paths = []
+    while True:
+        p = input("Path> ").strip('" ').strip()
+        if p.lower() == "done":
+            break
+        if os.path.isfile(p):
+            file_paths.append(p)
+        else:
+            print("⚠️  File not found, try again.")
+
+    if not file_paths:
+        print("No files given. Exiting.")
         return
 
-    try:
-        result = json.loads(text)
-    except Exception:
-        print("⚠️  Model did not return valid JSON; raw text below:\n")
-        print(text)
+    case_id = input("\nCase ID (optional): ") or "CASE-001"
+    investigator = input("Investigator name (optional): ") or "Unknown"
+
+    case_meta = {"case_id": case_id, "investigator": investigator}
+    with ResultCache(CACHE_PATH, max_bytes=CACHE_MAX_BYTES) as cache, \
+            UploadRegistry(client.files, UPLOADS_PATH, digest=cache.file_digest) as uploads:
+        if choose_mode(file_paths) == "map-reduce":
+            result = analyze_map_reduce(file_paths, case_meta, cache=cache, uploads=uploads)
+        else:
+            result = analyze(file_paths, case_meta, cache=cache, uploads=uploads)
+        if uploads.uploaded or uploads.reused:
+            print(f"\n📤 Large files: {uploads.summary()}")
+    if result is None:
         return
 
     print("\n✅ Gemini 2.5 Flash Forensic Analysis Result:\n")
@@ -0,0 +1,237 @@
+"""
+batch.py
+-----------------------------------
+Non-interactive ChronoTrack runs over a manifest of cases, for queuing
+overnight work:
+
+    python batch.py cases.txt --out results --workers 2 --rpm 60
+
+The manifest has one case per line, fields separated by '|':
+
+    CASE-014 | J. Doe | evidence/014/*.jpg, evidence/014/chat.txt
+    CASE-015 | A. Roy | evidence/015/
+
+The file list is comma-separated; each entry is a file, a directory (all files
+directly inside it) or a glob ('**' recurses). Relative paths are resolved
+against the manifest's directory. Blank lines and lines starting with '#' are
+ignored.
+
+Cases are processed by a pool of workers in one event loop, each case in
+map-reduce mode. Every API request passes one shared RequestGate, which holds
+the request rate and retries transient errors with backoff
+(see rate_limit.py). Each finished case is written to <out>/<case id>.json
+and recorded in <out>/checkpoint.jsonl. A restarted batch skips the cases
+already recorded as done; failed and partial cases are tried again.
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import logging
+import os
+import re
+import time
+
+from app import CACHE_MAX_BYTES, CACHE_PATH, MAP_CONCURRENCY, UPLOADS_PATH, analyze_map_reduce_async, client, is_transient
+from rate_limit import RequestGate
+from result_cache import ResultCache
+from upload_registry import UploadRegistry
+
+CHECKPOINT_FILE = "checkpoint.jsonl"
+DEFAULT_WORKERS = 2
+# progress line interval while a batch runs (seconds)
+REPORT_INTERVAL = 60
+
+log = logging.getLogger("chronotrack.batch")
+
+
+class BatchCase:
+    def __init__(self, case_id, investigator, file_paths, line):
+        self.case_id = case_id
+        self.investigator = investigator
+        self.file_paths = file_paths
+        self.line = line
+
+    @property
+    def meta(self):
+        return {"case_id": self.case_id, "investigator": self.investigator}
+
+
+# ------------------ manifest ------------------
+def expand_files(spec, base_dir):
+    """The files named by one manifest entry (file, directory or glob), sorted."""
+    path = os.path.join(base_dir, os.path.expanduser(spec))
+    if os.path.isdir(path):
+        return sorted(os.path.join(path, name) for name in os.listdir(path)
+                      if os.path.isfile(os.path.join(path, name)))
+    if glob.has_magic(path):
+        return sorted(p for p in glob.glob(path, recursive=True) if os.path.isfile(p))
+    return [path] if os.path.isfile(path) else []
+
+
+def parse_manifest(path):
+    """[BatchCase] from a manifest file; raises ValueError on a malformed line."""
+    base_dir = os.path.dirname(os.path.abspath(path))
+    cases = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = [field.strip() for field in line.split("|")]
+            if len(fields) != 3 or not fields[0]:
+                raise ValueError(f"{path}:{number}: expected 'case id | investigator | files'")
+            case_id, investigator, specs = fields
+            if case_id in seen:
+                raise ValueError(f"{path}:{number}: duplicate case id {case_id}")
+            seen.add(case_id)
+            file_paths = []
+            for spec in filter(None, (spec.strip() for spec in specs.split(","))):
+                file_paths.extend(p for p in expand_files(spec, base_dir) if p not in file_paths)
+            cases.append(BatchCase(case_id, investigator or "Unknown", file_paths, number))
+    return cases
+
+
+# ------------------ checkpoint and output ------------------
+def output_path(out_dir, case_id):
+    return os.path.join(out_dir, re.sub(r"[^\w.-]", "_", case_id) + ".json")
+
+
+def load_checkpoint(out_dir):
+    """Case IDs recorded as done whose output file still exists."""
+    done = set()
+    path = os.path.join(out_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # a line cut short by a crash
+                continue
+            if entry.get("status") == "done" and os.path.exists(output_path(out_dir, entry["case_id"])):
+                done.add(entry["case_id"])
+    return done
+
+
+def record_checkpoint(out_dir, case_id, status, **details):
+    with open(os.path.join(out_dir, CHECKPOINT_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"case_id": case_id, "status": status, "time": time.time(), **details}) + "\n")
+
+
+def write_result(out_dir, case, result):
+    """Writes a case result atomically, so a crash never leaves a half-written output."""
+    path = output_path(out_dir, case.case_id)
+    with open(path + ".part", "w", encoding="utf-8") as f:
+        json.dump({"case": case.meta, "files": case.file_paths, "result": result}, f, indent=2, ensure_ascii=False)
+    os.replace(path + ".part", path)
+    return path
+
+
+# ------------------ runner ------------------
+class BatchStats:
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+
+    def summary(self, gate):
+        elapsed = time.monotonic() - self.started
+        rate = self.done * 3600.0 / elapsed if elapsed > 0 else 0.0
+        return (f"cases: {self.done} done, {self.failed} failed, {self.skipped} skipped of {self.total} "
+                f"({rate:.1f}/h); requests: {gate.summary()}")
+
+
+async def run_batch_async(cases, out_dir, workers=DEFAULT_WORKERS, concurrency=MAP_CONCURRENCY, gate=None, cache=None,
+                          uploads=None):
+    """Analyzes every case not yet checkpointed as done; returns the BatchStats."""
+    gate = gate or RequestGate(transient=is_transient)
+    finished = load_checkpoint(out_dir)
+    stats = BatchStats(len(cases))
+    pending = []
+    for case in cases:
+        if case.case_id in finished:
+            stats.skipped += 1
+        else:
+            pending.append(case)
+    if stats.skipped:
+        log.info("Skipping %d case(s) already done", stats.skipped)
+    queue = iter(pending)
+
+    async def worker():
+        for case in queue:
+            started = time.monotonic()
+            if not case.file_paths:
+                stats.failed += 1
+                log.error("%s: no evidence files matched (manifest line %d)", case.case_id, case.line)
+                record_checkpoint(out_dir, case.case_id, "failed", error="no evidence files")
+                continue
+            log.info("%s: analyzing %d file(s)", case.case_id, len(case.file_paths))
+            try:
+                result = await analyze_map_reduce_async(case.file_paths, case.meta, cache=cache,
+                                                        concurrency=concurrency, gate=gate, uploads=uploads)
+                if result is None:
+                    raise RuntimeError("every request failed")
+                path = write_result(out_dir, case, result)
+            except Exception as e:
+                stats.failed += 1
+                log.error("%s: failed: %s", case.case_id, e)
+                record_checkpoint(out_dir, case.case_id, "failed", error=str(e))
+                continue
+            seconds = time.monotonic() - started
+            failed_files = result.get("failed_files")
+            if failed_files:
+                # written, but analyzed again on the next run
+                stats.failed += 1
+                record_checkpoint(out_dir, case.case_id, "partial", seconds=round(seconds, 1), failed_files=failed_files)
+                log.warning("%s: %d file(s) failed, partial result -> %s", case.case_id, len(failed_files), path)
+                continue
+            stats.done += 1
+            record_checkpoint(out_dir, case.case_id, "done", seconds=round(seconds, 1))
+            log.info("%s: done in %.1fs -> %s", case.case_id, seconds, path)
+
+    async def reporter():
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            log.info("Progress: %s", stats.summary(gate))
+
+    report_task = asyncio.create_task(reporter())
+    try:
+        await asyncio.gather(*(worker() for _ in range(workers)))
+    finally:
+        report_task.cancel()
+    log.info("Finished: %s", stats.summary(gate))
+    if uploads is not None:
+        log.info("Large files: %s", uploads.summary())
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run ChronoTrack over a manifest of cases.")
+    parser.add_argument("manifest", help="one case per line: case id | investigator | files, dirs or globs")
+    parser.add_argument("--out", default="chrono_results", help="directory for per-case results and the checkpoint")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="cases analyzed at once")
+    parser.add_argument("--concurrency", type=int, default=MAP_CONCURRENCY, help="requests in flight per case")
+    parser.add_argument("--rpm", type=float, help="request rate limit across all workers (requests per minute)")
+    parser.add_argument("--burst", type=int, help="requests allowed back to back before the rate limit applies")
+    parser.add_argument("--retries", type=int, default=4, help="retries of a request after a transient error")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    cases = parse_manifest(args.manifest)
+    os.makedirs(args.out, exist_ok=True)
+    gate = RequestGate(rate_per_minute=args.rpm, burst=args.burst, transient=is_transient, attempts=args.retries + 1)
+    with ResultCache(CACHE_PATH, max_bytes=CACHE_MAX_BYTES) as cache, \
+            UploadRegistry(client.files, UPLOADS_PATH, digest=cache.file_digest) as uploads:
+        stats = asyncio.run(run_batch_async(cases, args.out, workers=args.workers, concurrency=args.concurrency,
+                                            gate=gate, cache=cache, uploads=uploads))
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,94 @@
+"""
+case_merge.py
+-----------------------------------
+Merges per-file ChronoTrack results (each matching build_response_schema())
+into one case result, without another API call.
+
+ - entities are deduplicated by (name, type), case-insensitively, keeping the
+   first spelling and the highest confidence
+ - events, links and transcripts are deduplicated on their normalized fields
+ - timeline entries are deduplicated and ordered by the date/time they start
+   with; entries without one keep their order after the dated ones
+ - summaries are kept per source, open questions are deduplicated
+"""
+
+import re
+
+LIST_FIELDS = ["transcripts", "entities", "events", "links", "timeline", "open_questions"]
+
+# leading "YYYY-MM-DD", "YYYY/MM/DD" or "YYYY-MM-DD HH:MM[:SS]" of a timeline entry
+TIMELINE_DATE_RE = re.compile(r"^\W*(\d{4})[-/](\d{2})[-/](\d{2})(?:[ T,]+(\d{1,2}):(\d{2})(?::(\d{2}))?)?")
+
+
+def _norm(value):
+    """Case- and whitespace-insensitive form of a field value."""
+    return " ".join(str(value or "").split()).casefold()
+
+
+def _key(item, fields):
+    return tuple(_norm(item.get(field)) for field in fields)
+
+
+def timeline_sort_key(entry):
+    """(year, month, day, hour, minute, second) from the start of an entry, or None."""
+    match = TIMELINE_DATE_RE.match(str(entry))
+    if not match:
+        return None
+    return tuple(int(part) if part else 0 for part in match.groups())
+
+
+def _dedupe(items, key):
+    seen = {}
+    for item in items:
+        seen.setdefault(key(item), item)
+    return list(seen.values())
+
+
+def merge_entities(entities):
+    merged = {}
+    for entity in entities:
+        key = _key(entity, ("name", "type"))
+        kept = merged.get(key)
+        if kept is None:
+            merged[key] = dict(entity)
+        elif entity.get("confidence") is not None:
+            kept["confidence"] = max(kept.get("confidence") or 0, entity["confidence"])
+    return list(merged.values())
+
+
+def merge_timeline(entries):
+    entries = _dedupe(entries, _norm)
+    dated = [(timeline_sort_key(entry), i, entry) for i, entry in enumerate(entries)]
+    undated = [entry for key, _, entry in dated if key is None]
+    dated = sorted(item for item in dated if item[0] is not None)
+    return [entry for _, _, entry in dated] + undated
+
+
+def merge_results(results):
+    """
+    Merges [(source label, result)] into one result. A single result is
+    returned unchanged apart from the deduplication.
+    """
+    collected = {field: [] for field in LIST_FIELDS}
+    summaries = []
+    for label, result in results:
+        for field in LIST_FIELDS:
+            collected[field].extend(item for item in result.get(field) or [] if item)
+        summary = (result.get("summary") or "").strip()
+        if summary:
+            summaries.append((label, summary))
+
+    if len(summaries) == 1:
+        summary = summaries[0][1]
+    else:
+        summary = "\n".join(f"[{label}] {text}" for label, text in summaries)
+
+    return {
+        "transcripts": _dedupe(collected["transcripts"], lambda t: _key(t, ("speaker", "timestamp", "text"))),
+        "entities": merge_entities(collected["entities"]),
+        "events": _dedupe(collected["events"], lambda e: _key(e, ("actor", "action", "object", "time", "location"))),
+        "links": _dedupe(collected["links"], lambda link: _key(link, ("source", "target", "relation"))),
+        "timeline": merge_timeline(collected["timeline"]),
+        "summary": summary,
+        "open_questions": _dedupe(collected["open_questions"], _norm),
+    }
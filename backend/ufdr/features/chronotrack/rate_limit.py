@@ -0,0 +1,94 @@
+"""
+rate_limit.py
+-----------------------------------
+Request pacing for ChronoTrack's concurrent modes.
+
+RequestGate wraps every API request: a token bucket holds the request rate
+under the quota (a burst of up to `burst` requests, refilled at
+`rate_per_minute`), and transient failures (rate limiting, server errors,
+dropped connections) are retried with exponential backoff and jitter. The
+gate counts requests, retries and errors, so a batch can report how close it
+runs to its quota. One gate is shared by every request in an event loop.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 60.0
+
+log = logging.getLogger("chronotrack.rate_limit")
+
+
+class TokenBucket:
+    """Async token bucket: acquire() waits until a request may be sent."""
+
+    def __init__(self, rate_per_minute, burst=None):
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or 1
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        # waiters queue on the lock, so tokens are handed out in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RequestGate:
+    """Rate limit plus retries around each request, with running counts."""
+
+    def __init__(self, rate_per_minute=None, burst=None, transient=None, attempts=DEFAULT_ATTEMPTS,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+        self.bucket = TokenBucket(rate_per_minute, burst) if rate_per_minute else None
+        self.transient = transient or (lambda error: isinstance(error, (ConnectionError, TimeoutError)))
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def backoff(self, attempt):
+        """Seconds to wait before retry number `attempt` (1-based), with jitter."""
+        return min(self.max_delay, self.base_delay * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+
+    async def call(self, make_request):
+        """Awaits make_request() under the rate limit, retrying transient failures."""
+        for attempt in range(1, self.attempts + 1):
+            if self.bucket is not None:
+                await self.bucket.acquire()
+            self.requests += 1
+            try:
+                return await make_request()
+            except Exception as e:
+                if attempt == self.attempts or not self.transient(e):
+                    self.errors += 1
+                    raise
+                self.retries += 1
+                delay = self.backoff(attempt)
+                log.warning("Transient API error (%s); retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+
+    @property
+    def requests_per_minute(self):
+        elapsed = time.monotonic() - self.started
+        return self.requests * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.requests} requests ({self.requests_per_minute:.1f}/min), "
+                f"{self.retries} retries, {self.errors} errors")
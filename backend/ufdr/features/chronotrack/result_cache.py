@@ -0,0 +1,174 @@
+"""
+result_cache.py
+-----------------------------------
+Local, content-addressed cache of ChronoTrack analysis results.
+
+A result is stored under the SHA-256 of everything that decides what Gemini
+returns: the model, the prompt text, the request config (which carries the
+response schema) and the SHA-256 of each evidence file's content, in order.
+Re-running a case whose evidence has not changed is answered from disk
+without an API call. The prompt names each file by its basename and carries
+the case metadata, so renaming a file or changing the case ID or investigator
+misses the cache, as does editing one byte of a file; moving a file to
+another directory under the same name does not.
+
+Entries live in one SQLite file. The total size of the stored results is
+bounded; once it is exceeded the least recently used entries are evicted.
+File digests are remembered by (path, size, mtime), so large recordings are
+only re-hashed after they change.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = "chrono_cache.sqlite"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_BYTES = 1024 * 1024
+# bump when the shape of the cached results changes
+CACHE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_results_last_used ON results(last_used);
+CREATE TABLE IF NOT EXISTS file_digests (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL
+);
+"""
+
+
+# ------------------ helper: hashing ------------------
+def sha256_file(path, chunk_bytes=HASH_CHUNK_BYTES):
+    """SHA-256 hex digest of a file, read in chunks so memory stays flat."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_bytes), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _canonical(value):
+    """Stable JSON text for a prompt/config value (dict keys sorted, non-JSON values via str)."""
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+# ------------------ cache ------------------
+class ResultCache:
+    """Size-bounded, LRU-evicted store of analysis results keyed by content hash."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # one connection shared by the caller's threads; the lock serializes its use
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- keys ----
+    def file_digest(self, path):
+        """SHA-256 of a file's content, reused while its size and mtime are unchanged."""
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM file_digests WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (path, st.st_size, st.st_mtime_ns)).fetchone()
+        if row:
+            return row[0]
+        digest = sha256_file(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_digests (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, digest))
+            self._conn.commit()
+        return digest
+
+    def key(self, model, prompt, config, file_paths):
+        """Cache key for one request: model, prompt, config/schema and each file's content hash."""
+        material = {
+            "version": CACHE_VERSION,
+            "model": model,
+            "prompt": prompt,
+            "config": config,
+            "files": [self.file_digest(path) for path in file_paths],
+        }
+        return hashlib.sha256(_canonical(material).encode("utf-8")).hexdigest()
+
+    # ---- lookups ----
+    def get(self, key):
+        """The cached result for `key`, or None. A hit marks the entry as recently used."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        """Stores a result, then evicts least recently used entries beyond max_bytes."""
+        value = json.dumps(result, ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            # would evict everything else and still not fit
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now))
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM results ORDER BY last_used").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    # ---- housekeeping ----
+    def stats(self):
+        """{'entries', 'bytes', 'max_bytes', 'hits', 'misses'} for this cache."""
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
@@ -0,0 +1,153 @@
+"""
+text_chunker.py
+-----------------------------------
+Splits large text evidence (chat exports, logs, CSV/JSON dumps) into
+token-budgeted windows that can be analyzed as separate requests.
+
+Windows end on message boundaries: a line that starts with a date or time
+(the way WhatsApp, SMS and most log exports start each message) opens a new
+message, and the lines after it belong to that message until the next one.
+In files without such lines every line is its own message. A message longer
+than the whole budget is cut on its own, at line ends where it has them.
+
+Consecutive windows overlap by up to `overlap_tokens` of whole messages, so
+something said across a window edge is seen whole at least once; the
+duplicates this produces are removed when the results are merged
+(case_merge.py). The file is read as a stream, at most one budget of
+characters at a time even within a line, so only the current window is held
+in memory however long a line or message runs.
+
+Token counts are estimated from the text length (CHARS_PER_TOKEN), which is
+close enough to keep every request inside its budget without an API call.
+"""
+
+import hashlib
+import re
+
+CHARS_PER_TOKEN = 4
+DEFAULT_CHUNK_TOKENS = 20000
+DEFAULT_OVERLAP_TOKENS = 500
+TEXT_EXTENSIONS = [".txt", ".log", ".csv", ".json"]
+
+# "12/01/2024, 10:15 - ", "[2024-01-12 10:15:02]", "2024-01-12T10:15", "10:15:02 ..."
+MESSAGE_START_RE = re.compile(
+    r"^\W{0,2}(\d{1,4}[-/.]\d{1,2}[-/.]\d{1,4}|\d{1,2}:\d{2}(:\d{2})?\b)"
+)
+
+
+def estimate_tokens(text):
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def detect_encoding(path):
+    """'utf-16' or 'utf-8-sig' from a byte order mark, else 'utf-8'."""
+    with open(path, "rb") as f:
+        bom = f.read(3)
+    if bom[:2] in (b"\xff\xfe", b"\xfe\xff"):
+        return "utf-16"
+    if bom == b"\xef\xbb\xbf":
+        return "utf-8-sig"
+    return "utf-8"
+
+
+class TextChunk:
+    """One window of a text file: its text and the (1-based, inclusive) lines it covers."""
+
+    def __init__(self, index, text, first_line, last_line):
+        self.index = index
+        self.text = text
+        self.first_line = first_line
+        self.last_line = last_line
+
+    @property
+    def digest(self):
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+    def __repr__(self):
+        return f"TextChunk({self.index}, lines {self.first_line}-{self.last_line}, ~{estimate_tokens(self.text)} tokens)"
+
+
+def _read_pieces(f, max_chars):
+    """Yields the lines of `f`, a line longer than `max_chars` as several pieces (only the last ends the line)."""
+    while True:
+        piece = f.readline(max_chars)
+        if not piece:
+            return
+        yield piece
+
+
+def iter_messages(lines, max_chars=None):
+    """
+    Groups lines into (first line number, text) messages. A long line may come
+    as several pieces, only the last ending in a newline. Given `max_chars`, a
+    message is cut as soon as it would grow past that many characters.
+    """
+    current = []
+    size = 0
+    first = None
+    opened = False  # the current message began with a date/time
+    number = 1  # line the next piece starts on
+    line_start = True  # the next piece starts a line
+    for piece in lines:
+        if line_start:
+            starts = bool(MESSAGE_START_RE.match(piece))
+            if current and (starts or not opened):
+                yield first, "".join(current)
+                current, size = [], 0
+            if not current:
+                opened = starts
+        if max_chars and current and size + len(piece) > max_chars:
+            # cut; the rest still belongs to the same message
+            yield first, "".join(current)
+            current, size = [], 0
+        if not current:
+            first = number
+        current.append(piece)
+        size += len(piece)
+        line_start = piece.endswith(("\n", "\r"))
+        if line_start:
+            number += 1
+    if current:
+        yield first, "".join(current)
+
+
+def iter_chunks(path, max_tokens=DEFAULT_CHUNK_TOKENS, overlap_tokens=DEFAULT_OVERLAP_TOKENS):
+    """Yields the TextChunks of a text file, in order, reading it as a stream."""
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens must be smaller than max_tokens")
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+
+    window = []  # [(first line, text)]
+    size = 0
+    index = 0
+    with open(path, "r", encoding=detect_encoding(path), errors="replace", newline="") as f:
+        for message in iter_messages(_read_pieces(f, max_chars), max_chars):
+            if window and size + len(message[1]) > max_chars:
+                yield _chunk(index, window)
+                index += 1
+                window, size = _overlap(window, overlap_chars, max_chars - len(message[1]))
+            window.append(message)
+            size += len(message[1])
+    # the window always ends with messages that were not emitted yet
+    if window:
+        yield _chunk(index, window)
+
+
+def _overlap(window, overlap_chars, room):
+    """The trailing messages of `window` carried into the next one, and their size."""
+    kept = []
+    size = 0
+    for message in reversed(window):
+        if size + len(message[1]) > min(overlap_chars, room):
+            break
+        kept.append(message)
+        size += len(message[1])
+    kept.reverse()
+    return kept, size
+
+
+def _chunk(index, window):
+    text = "".join(message[1] for message in window)
+    last_line = window[-1][0] + window[-1][1].count("\n") - (1 if window[-1][1].endswith("\n") else 0)
+    return TextChunk(index, text, window[0][0], last_line)
@@ -0,0 +1,152 @@
+"""
+upload_registry.py
+-----------------------------------
+Remembers which evidence has already been uploaded through the Files API, so
+the same recording is not sent again for a re-run or for another case.
+
+Uploads are keyed by the SHA-256 of the file's content, not its path. The
+registry keeps the remote name, URI, MIME type and expiry of each upload in a
+small SQLite file. A handle is reused while it has more than `expiry_margin`
+seconds left and the Files API still knows it; otherwise the file is uploaded
+again and the entry replaced. Two threads asking for the same content at once
+share one upload.
+
+`files_api` is anything with the client.files interface used here:
+upload(file=..., config=...) returning an object with name, uri, mime_type
+and expiration_time, and get(name=...) that raises for an unknown file. A
+local stand-in can take its place when no API is available.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+from result_cache import sha256_file
+
+DEFAULT_REGISTRY_PATH = "chrono_uploads.sqlite"
+# uploaded files live for 48 hours; assumed when the API does not say
+DEFAULT_TTL_SECONDS = 48 * 3600
+# a handle this close to expiring is not reused (it has to outlive the analysis)
+EXPIRY_MARGIN_SECONDS = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS uploads (
+    digest TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    uri TEXT NOT NULL,
+    mime_type TEXT,
+    size INTEGER NOT NULL,
+    uploaded REAL NOT NULL,
+    expires REAL NOT NULL
+);
+"""
+
+
+class UploadedFile:
+    """A live Files API handle for one piece of content."""
+
+    def __init__(self, name, uri, mime_type, expires, reused=False):
+        self.name = name
+        self.uri = uri
+        self.mime_type = mime_type
+        self.expires = expires
+        self.reused = reused
+
+    def __repr__(self):
+        return f"UploadedFile({self.name!r}, reused={self.reused})"
+
+
+def _expiry_timestamp(remote, uploaded):
+    expiration = getattr(remote, "expiration_time", None)
+    if expiration is None:
+        return uploaded + DEFAULT_TTL_SECONDS
+    if isinstance(expiration, (int, float)):
+        return float(expiration)
+    return expiration.timestamp()
+
+
+class UploadRegistry:
+    """Content-addressed registry of Files API uploads, safe to use from several threads."""
+
+    def __init__(self, files_api, path=DEFAULT_REGISTRY_PATH, digest=sha256_file,
+                 expiry_margin=EXPIRY_MARGIN_SECONDS, clock=time.time):
+        self.files_api = files_api
+        self.path = path
+        self.digest = digest
+        self.expiry_margin = expiry_margin
+        self.clock = clock
+        self.uploaded = 0
+        self.reused = 0
+        self.bytes_uploaded = 0
+        self.bytes_skipped = 0
+        self._lock = threading.Lock()
+        self._content_locks = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _content_lock(self, digest):
+        with self._lock:
+            return self._content_locks.setdefault(digest, threading.Lock())
+
+    def _live_entry(self, digest):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, uri, mime_type, expires FROM uploads WHERE digest = ?", (digest,)).fetchone()
+        if row is None or row[3] - self.expiry_margin <= self.clock():
+            return None
+        try:
+            # deleted or expired early on the server side
+            self.files_api.get(name=row[0])
+        except Exception:
+            return None
+        return UploadedFile(*row, reused=True)
+
+    def upload(self, path, mime_type=None):
+        """An UploadedFile for `path`: a live earlier upload of the same content, or a new one."""
+        digest = self.digest(path)
+        size = os.stat(path).st_size
+        with self._content_lock(digest):
+            entry = self._live_entry(digest)
+            if entry is not None:
+                with self._lock:
+                    self.reused += 1
+                    self.bytes_skipped += size
+                return entry
+
+            config = {"mime_type": mime_type} if mime_type else None
+            remote = self.files_api.upload(file=path, config=config)
+            uploaded = self.clock()
+            entry = UploadedFile(remote.name, remote.uri, getattr(remote, "mime_type", None) or mime_type,
+                                 _expiry_timestamp(remote, uploaded))
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO uploads (digest, name, uri, mime_type, size, uploaded, expires) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (digest, entry.name, entry.uri, entry.mime_type, size, uploaded, entry.expires))
+                self._conn.commit()
+                self.uploaded += 1
+                self.bytes_uploaded += size
+            return entry
+
+    def prune(self):
+        """Drops entries that have expired; returns how many."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM uploads WHERE expires <= ?", (self.clock(),))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def summary(self):
+        return (f"{self.uploaded} uploaded ({self.bytes_uploaded / 1048576:.1f} MB), "
+                f"{self.reused} reused ({self.bytes_skipped / 1048576:.1f} MB not re-sent)")
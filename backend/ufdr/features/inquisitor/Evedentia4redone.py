@@ -1,17 +1,37 @@
 import tkinter as tk
-from tkinter import messagebox, ttk
-import json
+from tkinter import filedialog, messagebox, ttk
 import os
+import threading
 from datetime import datetime
 import uuid
-import re
+
+from activity_index import DIMENSIONS, GRANULARITIES
+from background import BackgroundWriter, QueryWorker
+from bulk_import import IMPORT_FILE_TYPES, BulkImporter
+from query_engine import GENDERS, LOG_TYPES, SUSPICIOUS_FILTERS, LogQuery, QueryEngine
+from result_export import EXPORT_FILE_TYPES, ResultExporter
+from storage import USERS_FILE, open_storage, save_data
+from suspicious_matcher import SuspiciousTermMatcher
+from virtual_tree import VirtualTreeview
 
 # --- Configuration and Constants ---
 
-# File Paths for persistence
-LOGS_FILE = 'communication_logs.json'
-USERS_FILE = 'user_credentials.json'
-ACCESS_LOG_FILE = 'access_history.json'
+# File paths for persistence and the storage backend are configured in storage.py
+
+# Number of access history rows loaded per page in the admin view
+ACCESS_PAGE_SIZE = 200
+
+# Quiet period after the last filter edit before the log view query runs (ms)
+FILTER_DEBOUNCE_MS = 300
+
+# How often the bulk import and export status lines are refreshed (ms)
+IMPORT_POLL_MS = 250
+
+# How often the login screen checks whether the case data has finished loading (ms)
+LOAD_POLL_MS = 100
+
+# Rows listed in the activity summary breakdown (busiest first)
+ACTIVITY_TOP_COUNT = 50
 
 # Default user setup with roles and restrictions
 # 'restrictions' list contains features the user CANNOT access.
@@ -26,25 +46,13 @@ SUSPICIOUS_WORDS = [
     "transfer", "withdraw", "hide", "dispose", "burner phone"
 ]
 
-# --- Helper Functions for File I/O and Persistence ---
-
-def load_data(filepath, default_data={}):
-    """Loads data from a JSON file."""
-    if os.path.exists(filepath):
-        try:
-            with open(filepath, 'r') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return default_data
-    return default_data
-
-def save_data(filepath, data):
-    """Saves data to a JSON file."""
-    try:
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=4)
-    except IOError as e:
-        print(f"Error saving data to {filepath}: {e}")
+# Optional JSON file overriding SUSPICIOUS_WORDS: a list of terms or a {term: weight} object.
+# Edits are picked up at runtime and re-applied to every stored log.
+SUSPICIOUS_TERMS_FILE = 'suspicious_terms.json'
+# A Text log is flagged once the weights of the distinct terms it contains reach this score
+SUSPICIOUS_SCORE_THRESHOLD = 1.0
+# Also count terms that appear obfuscated ("b0mb", "bom b", "a t t a c k", small typos)
+FUZZY_SUSPICIOUS_MATCHING = True
 
 # --- Main Application Class ---
 
@@ -55,15 +63,28 @@ class LogAnalyzerApp:
         master.geometry("1200x800")
         master.config(bg='#f0f4f8')
         master.resizable(True, True)
-
-        # Initialize data structures with updated default user structure
-        self.logs = load_data(LOGS_FILE, default_data=[])
-        # IMPORTANT: If the USERS_FILE exists, it will load whatever format it has (old string or new dict)
-        self.users = load_data(USERS_FILE, default_data=DEFAULT_USER_DATA) 
-        self.access_history = load_data(ACCESS_LOG_FILE, default_data=[])
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
+
+        # Filtering runs on a worker thread and saves on a writer thread, so the UI never waits on either
+        self.writer = BackgroundWriter()
+        self.query_worker = QueryWorker(master)
+
+        # The case data is opened on a loader thread so the login screen shows at once;
+        # logging in is enabled when it is ready (see _poll_case_data)
+        self.storage = None
+        self.load_error = None
+        self._pending_storage = None
+        self.load_thread = threading.Thread(target=self._load_case_data, daemon=True)
+        self.load_thread.start()
+        self.matcher = SuspiciousTermMatcher.from_file(SUSPICIOUS_TERMS_FILE, SUSPICIOUS_WORDS, threshold=SUSPICIOUS_SCORE_THRESHOLD,
+                                                       fuzzy=FUZZY_SUSPICIOUS_MATCHING)
 
         self.current_user = None
         self.is_authenticated = False
+        self.importer = None
+        self.import_thread = None
+        self.exporter = None
+        self.export_thread = None
 
         # Apply a modern style (especially for Treeview)
         style = ttk.Style()
@@ -73,6 +94,36 @@ class LogAnalyzerApp:
         style.map("Treeview", background=[('selected', '#10b981')])
 
         self.setup_login_screen()
+        self.master.after(LOAD_POLL_MS, self._poll_case_data)
+
+    # --- Background Case Loading ---
+
+    def _load_case_data(self):
+        """Opens the storage backend (loader thread). The result is attached on the Tk thread."""
+        try:
+            self._pending_storage = open_storage(default_users=DEFAULT_USER_DATA, writer=self.writer)
+        except (IOError, OSError, ValueError) as e:
+            self.load_error = e
+
+    def _poll_case_data(self):
+        if self.load_thread.is_alive():
+            self.master.after(LOAD_POLL_MS, self._poll_case_data)
+            return
+        self.login_progress.stop()
+        if self.load_error is not None:
+            self.login_status_label.config(text="Case data could not be loaded.", fg='#ef4444')
+            messagebox.showerror("Load Error", f"Could not load the case data: {self.load_error}")
+            return
+
+        # Initialize data structures with updated default user structure
+        self.storage = self._pending_storage
+        self.logs = self.storage.logs
+        self.users = self.storage.users
+        self.access_history = self.storage.access_history
+        self.query_engine = QueryEngine(self.storage)
+        self.login_progress.grid_remove()
+        self.login_status_label.config(text="")
+        self.login_btn.config(state=tk.NORMAL, text="Login")
 
     # --- Authentication and Logging ---
 
@@ -97,14 +148,26 @@ class LogAnalyzerApp:
         self.password_entry.bind('<Return>', lambda event: self.attempt_login())
 
         # Login Button
-        login_btn = tk.Button(self.login_frame, text="Login", command=self.attempt_login, bg='#3b82f6', fg='white', font=('Inter', 12, 'bold'), padx=20, pady=8, relief=tk.FLAT, activebackground='#2563eb', activeforeground='white')
-        login_btn.grid(row=3, column=0, columnspan=2, pady=20)
+        self.login_btn = tk.Button(self.login_frame, text="Login", command=self.attempt_login, bg='#3b82f6', fg='white', font=('Inter', 12, 'bold'), padx=20, pady=8, relief=tk.FLAT, activebackground='#2563eb', activeforeground='white')
+        self.login_btn.grid(row=3, column=0, columnspan=2, pady=20)
+
+        # Loading indicator, shown until the case data is ready
+        if self.storage is None:
+            self.login_btn.config(state=tk.DISABLED, text="Loading case data...")
+            self.login_progress = ttk.Progressbar(self.login_frame, mode='indeterminate', length=300)
+            self.login_progress.grid(row=4, column=0, columnspan=2)
+            self.login_progress.start(10)
+            self.login_status_label = tk.Label(self.login_frame, text="Loading case data...", font=('Inter', 9), bg='#ffffff', fg='#6b7280')
+            self.login_status_label.grid(row=5, column=0, columnspan=2, pady=(5, 0))
 
     def attempt_login(self):
         """
         Checks credentials, handling both the old (string) and new (dict) password structure
         for backward compatibility.
         """
+        if self.storage is None:
+            # The case data (and the user list) is still loading
+            return
         username = self.username_entry.get()
         password = self.password_entry.get()
 
@@ -141,7 +204,6 @@ class LogAnalyzerApp:
             "action": action_description
         }
         self.access_history.append(log_entry)
-        save_data(ACCESS_LOG_FILE, self.access_history)
 
     def check_access(self, feature_name):
         """
@@ -187,6 +249,25 @@ class LogAnalyzerApp:
         self.main_frame.destroy()
         self.setup_login_screen()
 
+    def on_close(self):
+        """Stops background queries and flushes pending writes before the window is destroyed."""
+        self.query_worker.shutdown()
+        if self.import_thread:
+            # Records read so far are still saved by the importer
+            self.importer.cancel()
+            self.import_thread.join()
+        if self.export_thread:
+            # A cancelled export removes its partial file
+            self.exporter.cancel()
+            self.export_thread.join()
+        # Closing while the case is still loading waits for the loader to finish
+        self.load_thread.join()
+        storage = self.storage or self._pending_storage
+        if storage is not None:
+            storage.close()
+        self.writer.close()
+        self.master.destroy()
+
     # --- Main Application UI ---
 
     def setup_main_app(self):
@@ -207,17 +288,45 @@ class LogAnalyzerApp:
         self.notebook = ttk.Notebook(self.main_frame)
         self.notebook.pack(pady=5, padx=5, fill="both", expand=True)
 
-        self.setup_data_entry_tab()
-        self.setup_log_view_tab()
+        # Tabs are empty frames until first selected; only the opening tab is built now
+        self.logs_view = None
+        self.tab_builders = {}
+        data_entry_frame = self.add_lazy_tab("Add New Log Entry", self.setup_data_entry_tab, bg='#ffffff', padx=20, pady=20)
+        self.log_view_frame = self.add_lazy_tab("Log Data View & Search", self.setup_log_view_tab, bg='#f0f4f8', padx=10, pady=10)
+        self.activity_frame = self.add_lazy_tab("Activity Summary", self.setup_activity_tab, bg='#ffffff', padx=10, pady=10)
         
         # Role-based restriction checks for administrative tabs
         if self.check_access("admin_logs"):
-            self.setup_admin_logs_tab()
+            self.add_lazy_tab("Admin/Access History", self.setup_admin_logs_tab, bg='#ffffff', padx=10, pady=10)
 
         if self.check_access("user_management"):
-            self.setup_user_management_tab()
-        
-        self.populate_logs_treeview()
+            self.add_lazy_tab("User Management", self.setup_user_management_tab, bg='#ffffff', padx=20, pady=20)
+
+        self.build_tab(data_entry_frame)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+    def add_lazy_tab(self, text, builder, **frame_options):
+        """Adds an empty tab whose contents `builder(frame)` creates the first time it is selected."""
+        frame = tk.Frame(self.notebook, **frame_options)
+        self.notebook.add(frame, text=text)
+        self.tab_builders[str(frame)] = (frame, builder)
+        return frame
+
+    def build_tab(self, frame):
+        """Builds a lazy tab's contents if that has not happened yet. Returns True if it was built now."""
+        entry = self.tab_builders.pop(str(frame), None)
+        if entry is None:
+            return False
+        entry[1](frame)
+        return True
+
+    def on_tab_changed(self, event):
+        selected = self.notebook.select()
+        if selected in self.tab_builders:
+            self.build_tab(self.tab_builders[selected][0])
+        elif selected == str(self.activity_frame):
+            # Counts are read from the storage aggregates, so refreshing on every visit is cheap
+            self.populate_activity_summary()
 
     # --- Date/Time Helper for Dropdowns ---
     
@@ -257,10 +366,8 @@ class LogAnalyzerApp:
 
     # --- Tab 1: Data Entry ---
 
-    def setup_data_entry_tab(self):
+    def setup_data_entry_tab(self, data_entry_frame):
         """Sets up the frame for adding new communication logs."""
-        data_entry_frame = tk.Frame(self.notebook, bg='#ffffff', padx=20, pady=20)
-        self.notebook.add(data_entry_frame, text="Add New Log Entry")
 
         # Use a grid layout for the form
         form_frame = tk.Frame(data_entry_frame, bg='#ffffff')
@@ -349,6 +456,14 @@ class LogAnalyzerApp:
         add_btn = tk.Button(data_entry_frame, text="Add Log Entry", command=self.add_log_entry, bg='#10b981', fg='white', font=('Inter', 12, 'bold'), padx=20, pady=10, relief=tk.FLAT, activebackground='#059669')
         add_btn.pack(pady=20)
 
+        # Bulk Import (CSV / JSONL / JSON array extraction exports)
+        import_frame = tk.Frame(data_entry_frame, bg='#ffffff')
+        import_frame.pack(pady=5)
+        self.import_btn = tk.Button(import_frame, text="Import File...", command=self.import_logs_file, bg='#3b82f6', fg='white', font=('Inter', 10, 'bold'), relief=tk.FLAT)
+        self.import_btn.pack(side=tk.LEFT, padx=5)
+        self.import_status_label = tk.Label(import_frame, text="", font=('Inter', 10), bg='#ffffff', fg='#4b5563')
+        self.import_status_label.pack(side=tk.LEFT, padx=5)
+
         self.update_content_field() # Initial setup
 
     def update_content_field(self):
@@ -377,11 +492,26 @@ class LogAnalyzerApp:
 
     def check_for_suspicious_words(self, text_content):
         """Checks if the text content contains any suspicious words."""
-        if not text_content:
-            return False
-        # Use regex to find whole words, case-insensitive
-        pattern = r'\b(?:' + '|'.join(re.escape(word) for word in SUSPICIOUS_WORDS) + r')\b'
-        return bool(re.search(pattern, text_content, re.IGNORECASE))
+        return self.matcher.is_suspicious(text_content)
+
+    def refresh_suspicious_terms(self, force_rescan=False):
+        """
+        Reloads SUSPICIOUS_TERMS_FILE if it changed and re-applies the term list to
+        every stored log. Returns the number of logs whose flag changed.
+        """
+        if not self.matcher.reload_if_changed() and not force_rescan:
+            return 0
+        # Fuzzy matches are looked up per term in the storage's n-gram index, not per message
+        fuzzy_index = self.storage.fuzzy_index if self.matcher.fuzzy else None
+        changed = self.matcher.rescan_all(self.logs, fuzzy_index=fuzzy_index)
+        self.log_action(f"Rescanned logs for suspicious terms ({len(self.matcher.weights)} terms): {changed} flag(s) changed")
+        return changed
+
+    def rescan_suspicious_logs(self):
+        """Button handler: reloads the term list and rescans the whole case."""
+        changed = self.refresh_suspicious_terms(force_rescan=True)
+        self.populate_logs_treeview()
+        messagebox.showinfo("Rescan Complete", f"Suspicious flags updated on {changed} log entr{'y' if changed == 1 else 'ies'}.")
 
     def add_log_entry(self):
         """Validates and adds a new log entry to the data."""
@@ -424,14 +554,11 @@ class LogAnalyzerApp:
             messagebox.showerror("Error", "Please fill in all Sender/Receiver details and the Content/Duration field.")
             return
 
-        # Check for suspicious words
-        if data['type'] == "Text":
-            data['is_suspicious'] = self.check_for_suspicious_words(content)
-        else:
-            data['is_suspicious'] = False
+        # Check for suspicious words (picking up any edit to the term list first)
+        self.refresh_suspicious_terms()
+        data['is_suspicious'] = self.matcher.flag(data)
 
-        self.logs.append(data)
-        save_data(LOGS_FILE, self.logs)
+        self.logs.add(data)
         self.populate_logs_treeview()
 
         # Clear form fields (except date/time)
@@ -449,10 +576,8 @@ class LogAnalyzerApp:
 
     # --- Tab 2: Log View and Analysis ---
 
-    def setup_log_view_tab(self):
+    def setup_log_view_tab(self, log_view_frame):
         """Sets up the frame for viewing, searching, and removing log entries."""
-        log_view_frame = tk.Frame(self.notebook, bg='#f0f4f8', padx=10, pady=10)
-        self.notebook.add(log_view_frame, text="Log Data View & Search")
 
         # 1. Search and Filter Controls (Frame at the top)
         filter_frame = tk.Frame(log_view_frame, bg='#ffffff', padx=10, pady=10, relief=tk.GROOVE)
@@ -462,11 +587,14 @@ class LogAnalyzerApp:
         tk.Label(filter_frame, text="Keyword Search:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=0, column=0, padx=5, pady=5)
         self.search_keyword_var = tk.StringVar()
         tk.Entry(filter_frame, textvariable=self.search_keyword_var, font=('Inter', 10), width=20).grid(row=0, column=1, padx=5, pady=5)
+        self.search_keyword_var.trace_add("write", lambda name, index, mode: self.populate_logs_treeview(debounce_ms=FILTER_DEBOUNCE_MS))
+        self.search_fuzzy_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(filter_frame, text="Fuzzy match (typos, leetspeak, spacing)", variable=self.search_fuzzy_var, font=('Inter', 10), bg='#ffffff').grid(row=3, column=0, columnspan=2, sticky='w', padx=5, pady=5)
 
         # Type Filter
         tk.Label(filter_frame, text="Type:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=0, column=2, padx=5, pady=5)
         self.filter_type_var = tk.StringVar(value="All")
-        ttk.Combobox(filter_frame, textvariable=self.filter_type_var, values=["All", "Text", "Audio", "Video", "Call"], state="readonly", font=('Inter', 10), width=10).grid(row=0, column=3, padx=5, pady=5)
+        ttk.Combobox(filter_frame, textvariable=self.filter_type_var, values=LOG_TYPES, state="readonly", font=('Inter', 10), width=10).grid(row=0, column=3, padx=5, pady=5)
 
         # Date Range Filter
         tk.Label(filter_frame, text="Date Range (Min/Max):", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=1, column=0, padx=5, pady=5)
@@ -478,7 +606,7 @@ class LogAnalyzerApp:
         # Gender Filter
         tk.Label(filter_frame, text="Sender Gender:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=1, column=2, padx=5, pady=5)
         self.filter_gender_var = tk.StringVar(value="All")
-        ttk.Combobox(filter_frame, textvariable=self.filter_gender_var, values=["All", "M", "F", "O"], state="readonly", font=('Inter', 10), width=10).grid(row=1, column=3, padx=5, pady=5)
+        ttk.Combobox(filter_frame, textvariable=self.filter_gender_var, values=GENDERS, state="readonly", font=('Inter', 10), width=10).grid(row=1, column=3, padx=5, pady=5)
 
         # Length/Duration Filter
         tk.Label(filter_frame, text="Min Length/Duration:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=2, column=0, padx=5, pady=5)
@@ -488,16 +616,27 @@ class LogAnalyzerApp:
         # Suspicious Flag Filter
         tk.Label(filter_frame, text="Suspicious Flag:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=2, column=2, padx=5, pady=5)
         self.filter_suspicious_var = tk.StringVar(value="All")
-        ttk.Combobox(filter_frame, textvariable=self.filter_suspicious_var, values=["All", "Suspicious", "Normal"], state="readonly", font=('Inter', 10), width=10).grid(row=2, column=3, padx=5, pady=5)
+        ttk.Combobox(filter_frame, textvariable=self.filter_suspicious_var, values=SUSPICIOUS_FILTERS, state="readonly", font=('Inter', 10), width=10).grid(row=2, column=3, padx=5, pady=5)
+
+        # Filters re-run automatically (debounced) as they are edited
+        for var in (self.filter_type_var, self.filter_gender_var, self.filter_suspicious_var, self.search_fuzzy_var):
+            var.trace_add("write", lambda name, index, mode: self.populate_logs_treeview(debounce_ms=FILTER_DEBOUNCE_MS))
+        for entry in (self.filter_date_min, self.filter_date_max, self.filter_length_min):
+            entry.bind('<KeyRelease>', lambda event: self.populate_logs_treeview(debounce_ms=FILTER_DEBOUNCE_MS))
 
         # Apply Filter Button
         apply_btn = tk.Button(filter_frame, text="Apply Filters", command=self.populate_logs_treeview, bg='#3b82f6', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
-        apply_btn.grid(row=0, column=4, rowspan=3, padx=15, pady=5, sticky='ns')
+        apply_btn.grid(row=0, column=4, rowspan=4, padx=15, pady=5, sticky='ns')
+
+        # 2. Log Display (Treeview, virtualized: only the visible window of matches is inserted)
+        tree_frame = tk.Frame(log_view_frame, bg='#f0f4f8')
+        tree_frame.pack(fill='both', expand=True, pady=10)
 
-        # 2. Log Display (Treeview)
         columns = ("ID", "Type", "Sender", "Receiver", "Date", "Time", "Content/Duration", "Suspicious")
-        self.logs_tree = ttk.Treeview(log_view_frame, columns=columns, show='headings')
-        self.logs_tree.pack(fill='both', expand=True, pady=10)
+        self.logs_tree = ttk.Treeview(tree_frame, columns=columns, show='headings', selectmode='extended')
+        logs_scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL)
+        logs_scrollbar.pack(side=tk.RIGHT, fill='y')
+        self.logs_tree.pack(side=tk.LEFT, fill='both', expand=True)
 
         for col in columns:
             self.logs_tree.heading(col, text=col, anchor='center')
@@ -506,6 +645,17 @@ class LogAnalyzerApp:
         self.logs_tree.column("ID", width=50) # Keep ID shorter
         self.logs_tree.column("Content/Duration", width=250, anchor='w')
 
+        # Custom tags for suspicious entries
+        self.logs_tree.tag_configure('suspicious', background='#fee2e2', foreground='#ef4444', font=('Inter', 10, 'bold'))
+
+        self.logs_count_label = tk.Label(log_view_frame, text="", font=('Inter', 9), bg='#f0f4f8', fg='#4b5563', anchor='w')
+        self.logs_count_label.pack(fill='x')
+        self.logs_view = VirtualTreeview(
+            self.logs_tree, logs_scrollbar, self.format_log_row,
+            on_window_change=lambda first, last, total: self.logs_count_label.config(
+                text=f"Showing {first + 1}-{last} of {total} matching log entries" if total else "No matching log entries")
+        )
+
         # 3. Actions (Remove Data)
         action_frame = tk.Frame(log_view_frame, bg='#f0f4f8')
         action_frame.pack(fill='x', pady=5)
@@ -515,154 +665,361 @@ class LogAnalyzerApp:
         self.remove_id_entry.pack(side=tk.LEFT, padx=5)
         remove_btn = tk.Button(action_frame, text="Remove Selected", command=self.remove_selected_log, bg='#ef4444', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
         remove_btn.pack(side=tk.LEFT, padx=10)
+        remove_matching_btn = tk.Button(action_frame, text="Remove All Matching", command=self.remove_matching_logs, bg='#b91c1c', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
+        remove_matching_btn.pack(side=tk.LEFT, padx=5)
+        rescan_btn = tk.Button(action_frame, text="Reload Terms & Rescan", command=self.rescan_suspicious_logs, bg='#f59e0b', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
+        rescan_btn.pack(side=tk.RIGHT, padx=10)
+        self.export_btn = tk.Button(action_frame, text="Export Results...", command=self.export_filtered_logs, bg='#10b981', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
+        self.export_btn.pack(side=tk.RIGHT, padx=5)
+        self.export_status_label = tk.Label(log_view_frame, text="", font=('Inter', 9), bg='#f0f4f8', fg='#4b5563', anchor='w')
+        self.export_status_label.pack(fill='x')
 
         # Context menu for right-click to view full content
         self.logs_tree.bind("<Button-3>", self.show_context_menu)
         self.logs_tree.bind("<<TreeviewSelect>>", self.on_tree_select)
 
+        self.populate_logs_treeview()
+
     def on_tree_select(self, event):
-        """Copies the ID of the selected item to the removal field."""
-        selected_item = self.logs_tree.focus()
-        if selected_item:
-            item_id = self.logs_tree.item(selected_item, 'values')[0]
+        """Copies the IDs of the selected items to the removal field."""
+        # Row iids are the log IDs, so nothing is looked up by position
+        selected_ids = self.logs_tree.selection()
+        if selected_ids:
             self.remove_id_entry.delete(0, tk.END)
-            self.remove_id_entry.insert(0, item_id)
+            self.remove_id_entry.insert(0, ", ".join(selected_ids))
 
     def show_context_menu(self, event):
         """Displays a context menu on right-click to view full content."""
         item = self.logs_tree.identify_row(event.y)
-        if item:
+        log = self.logs.get(item) if item else None
+        if log:
             self.logs_tree.selection_set(item)
-            content_value = self.logs_tree.item(item, 'values')[6]
+            content_value = log['content_or_duration']
             
             menu = tk.Menu(self.master, tearoff=0)
             menu.add_command(label=f"Full Content/File: {content_value}", command=lambda: messagebox.showinfo("Full Content", content_value))
             menu.tk_popup(event.x_root, event.y_root)
 
-    def populate_logs_treeview(self):
-        """Applies filters and updates the Treeview display."""
-        for item in self.logs_tree.get_children():
-            self.logs_tree.delete(item)
-        
-        filtered_logs = self.logs
-        keyword = self.search_keyword_var.get().lower()
-        log_type = self.filter_type_var.get()
-        date_min_str = self.filter_date_min.get()
-        date_max_str = self.filter_date_max.get()
-        gender = self.filter_gender_var.get()
-        min_length_str = self.filter_length_min.get()
-        suspicious_flag = self.filter_suspicious_var.get()
+    def format_log_row(self, log_id):
+        """Returns the Treeview (values, tags) for a log, or None if it no longer exists."""
+        log = self.logs.get_summary(log_id)
+        if log is None:
+            return None
+        is_susp = log.get('is_suspicious', False)
+        values = (
+            log['id'], log['type'], 
+            f"{log['sender_name']} ({log['sender_gender']})", 
+            f"{log['receiver_name']} ({log['receiver_gender']})", 
+            log['date'], log['time'], 
+            log['content_or_duration'][:50] + "..." if log['content_length'] > 50 else log['content_or_duration'], 
+            "YES" if is_susp else "NO"
+        )
+        return values, ('suspicious' if is_susp else '',)
+
+    def import_logs_file(self):
+        """Streams an extraction export into the case on a background thread."""
+        if self.import_thread:
+            return
+        path = filedialog.askopenfilename(title="Import Communication Logs", filetypes=IMPORT_FILE_TYPES)
+        if not path:
+            return
 
-        try:
-            min_length = int(min_length_str) if min_length_str else -1
-        except ValueError:
-            messagebox.showerror("Filter Error", "Min Length/Duration must be a number.")
+        # Score against the current term list
+        self.refresh_suspicious_terms()
+        progress = {}
+        outcome = {}
+        self.importer = BulkImporter(self.logs, self.matcher, progress=lambda stats: progress.update(stats=stats))
+
+        def run():
+            try:
+                outcome['stats'] = self.importer.run(path)
+            except (IOError, OSError, ValueError) as e:
+                outcome['error'] = e
+
+        def poll():
+            stats = progress.get('stats')
+            if self.import_thread.is_alive():
+                if stats:
+                    self.import_status_label.config(text=f"Importing... {stats.percent:.0f}% ({stats.imported} records, {stats.rate:,.0f}/s)")
+                self.master.after(IMPORT_POLL_MS, poll)
+                return
+            self.import_thread = None
+            self.import_btn.config(state=tk.NORMAL)
+            self.populate_logs_treeview()
+            if 'error' in outcome:
+                self.import_status_label.config(text="")
+                messagebox.showerror("Import Error", f"Could not import {os.path.basename(path)}: {outcome['error']}")
+                return
+            stats = outcome['stats']
+            self.import_status_label.config(text=stats.summary())
+            self.log_action(f"Bulk imported {stats.imported} log entries from {os.path.basename(path)} ({stats.rejected} rejected)")
+            details = "\n".join(stats.errors[:5])
+            messagebox.showinfo("Import Complete", stats.summary() + (f"\n\nFirst rejected records:\n{details}" if details else ""))
+
+        self.import_btn.config(state=tk.DISABLED)
+        self.import_status_label.config(text="Importing...")
+        self.import_thread = threading.Thread(target=run, daemon=True)
+        self.import_thread.start()
+        self.master.after(IMPORT_POLL_MS, poll)
+
+    def export_filtered_logs(self):
+        """Streams the log entries matching the current filters to a file on a background thread."""
+        if self.export_thread:
+            return
+        # Resolved from the filter inputs now, not the rows on screen, which may
+        # still be the previous filter's while a debounced query is pending
+        query = self.current_log_query()
+        if query is None:
+            return
+        matching = self.query_engine.ids(query)
+        if not len(matching):
+            messagebox.showinfo("Export Results", "No log entries match the current filters.")
+            return
+        path = filedialog.asksaveasfilename(title="Export Matching Logs", defaultextension=".csv", filetypes=EXPORT_FILE_TYPES)
+        if not path:
             return
 
-        for log in self.logs:
-            keep = True
-            log_content = str(log.get('content_or_duration', '')).lower()
-            
-            # Note: log_date is now DD-MM-YYYY in the stored data
-            log_date = log.get('date', '01-01-1900') 
-
-            # 1. Keyword Search
-            if keyword and keyword not in log_content and keyword not in log.get('sender_name', '').lower() and keyword not in log.get('receiver_name', '').lower():
-                keep = False
-
-            # 2. Type Filter
-            if log_type != "All" and log.get('type') != log_type:
-                keep = False
-
-            # 3. Date Range Filter (Requires YYYY-MM-DD for comparison, so we convert)
-            if date_min_str or date_max_str:
-                try:
-                    # Convert stored DD-MM-YYYY to comparable YYYYMMDD string
-                    log_date_dt = datetime.strptime(log_date, "%d-%m-%Y")
-                    log_date_comparable = log_date_dt.strftime("%Y%m%d")
-                    
-                    if date_min_str:
-                         min_dt = datetime.strptime(date_min_str, "%Y-%m-%d").strftime("%Y%m%d")
-                         if log_date_comparable < min_dt:
-                             keep = False
-                    
-                    if date_max_str:
-                         max_dt = datetime.strptime(date_max_str, "%Y-%m-%d").strftime("%Y%m%d")
-                         if log_date_comparable > max_dt:
-                             keep = False
-                except ValueError:
-                    # If filter dates are badly formatted (still expecting YYYY-MM-DD in the filter input fields)
-                    pass
-
-
-            # 4. Gender Filter (Checks if *sender* matches the gender)
-            if gender != "All" and log.get('sender_gender') != gender:
-                keep = False
-            
-            # 5. Length/Duration Filter
+        progress = {}
+        outcome = {}
+        self.exporter = ResultExporter(self.query_engine, progress=lambda stats: progress.update(stats=stats))
+
+        def run():
             try:
-                length = int(log_content) if log.get('type') in ["Call"] and log_content.isdigit() else len(log_content)
-                if min_length > 0 and length < min_length:
-                    keep = False
-            except ValueError:
-                # If content is non-numeric when expected to be, or other error, skip length check
-                pass
-
-            # 6. Suspicious Flag Filter
-            is_susp = log.get('is_suspicious', False)
-            if suspicious_flag == "Suspicious" and not is_susp:
-                keep = False
-            if suspicious_flag == "Normal" and is_susp:
-                keep = False
-
-            if keep:
-                tag = 'suspicious' if is_susp else ''
-                # Custom tags for suspicious entries
-                self.logs_tree.tag_configure('suspicious', background='#fee2e2', foreground='#ef4444', font=('Inter', 10, 'bold'))
-                
-                self.logs_tree.insert("", "end", values=(
-                    log['id'], log['type'], 
-                    f"{log['sender_name']} ({log['sender_gender']})", 
-                    f"{log['receiver_name']} ({log['receiver_gender']})", 
-                    log['date'], log['time'], 
-                    log['content_or_duration'][:50] + "..." if len(log['content_or_duration']) > 50 else log['content_or_duration'], 
-                    "YES" if is_susp else "NO"
-                ), tags=(tag,))
+                outcome['stats'] = self.exporter.run(matching, path)
+            except (IOError, OSError, ValueError) as e:
+                outcome['error'] = e
+
+        def poll():
+            stats = progress.get('stats')
+            if self.export_thread.is_alive():
+                if stats:
+                    self.export_status_label.config(text=f"Exporting... {stats.percent:.0f}% ({stats.written} of {stats.total} records, {stats.rate:,.0f}/s)")
+                self.master.after(IMPORT_POLL_MS, poll)
+                return
+            self.export_thread = None
+            self.export_btn.config(state=tk.NORMAL)
+            if 'error' in outcome:
+                self.export_status_label.config(text="")
+                messagebox.showerror("Export Error", f"Could not export to {os.path.basename(path)}: {outcome['error']}")
+                return
+            stats = outcome['stats']
+            self.export_status_label.config(text=stats.summary())
+            self.log_action(f"Exported {stats.written} log entries to {os.path.basename(path)}")
+
+        self.export_btn.config(state=tk.DISABLED)
+        self.export_status_label.config(text="Exporting...")
+        self.export_thread = threading.Thread(target=run, daemon=True)
+        self.export_thread.start()
+        self.master.after(IMPORT_POLL_MS, poll)
+
+    def populate_logs_treeview(self, debounce_ms=0):
+        """
+        Applies filters and updates the Treeview display. The filter inputs are read
+        here; the query itself runs on the worker thread, and a newer call cancels it.
+        """
+        if self.logs_view is None:
+            # The log view is populated when its tab is first opened
+            return
+        # Stay quiet while the user is still typing; complain on an explicit apply
+        query = self.current_log_query(quiet=bool(debounce_ms))
+        if query is None:
+            return
+
+        def run_query(token):
+            # 1. Keyword, 2. Type, 3. Date Range, 4. Gender (of the *sender*), 5. Length/Duration
+            # and 6. Suspicious Flag filters are answered by the storage backend's indexes;
+            # the result comes back in chronological order
+            return self.query_engine.ids(query, token=token)
+
+        def show_results(result_ids):
+            # Only the visible window is materialized; rows already on screen are diffed, not rebuilt
+            self.logs_view.set_rows(result_ids)
+
+        def show_error(error):
+            messagebox.showerror("Filter Error", f"Filtering failed: {error}")
+
+        self.logs_count_label.config(text="Filtering...")
+        self.query_worker.submit(run_query, show_results, on_error=show_error, debounce_ms=debounce_ms)
+
+    def current_log_query(self, quiet=False):
+        """
+        Builds the LogQuery for the log view's filter inputs, or returns None (after
+        an error dialog unless `quiet`) when Min Length/Duration is not a number.
+        """
+        min_length_str = self.filter_length_min.get()
+        try:
+            min_length = int(min_length_str) if min_length_str else -1
+        except ValueError:
+            if not quiet:
+                messagebox.showerror("Filter Error", "Min Length/Duration must be a number.")
+            return None
+
+        filters = {
+            'keyword': self.search_keyword_var.get(),
+            'log_type': self.filter_type_var.get(),
+            'gender': self.filter_gender_var.get(),
+            'min_length': min_length,
+            'suspicious': self.filter_suspicious_var.get(),
+            'fuzzy': self.search_fuzzy_var.get(),
+        }
+        # Date Range Filter bounds (YYYY-MM-DD in the filter input fields)
+        try:
+            query = LogQuery(date_from=self.filter_date_min.get(), date_to=self.filter_date_max.get(), **filters)
+        except ValueError:
+            # Badly formatted filter dates disable the date range filter
+            query = LogQuery(**filters)
+        return query
 
     def remove_selected_log(self):
-        """Removes the log entry with the ID from the removal entry field."""
+        """Removes the log entries whose IDs are in the removal entry field (comma separated)."""
         if not self.check_access("remove_logs"):
             return
 
-        item_id = self.remove_id_entry.get().strip()
-        if not item_id:
+        item_ids = [item_id.strip() for item_id in self.remove_id_entry.get().replace(',', ' ').split()]
+        if not item_ids:
             messagebox.showerror("Error", "Please enter or select a Log ID to remove.")
             return
 
-        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete log entry ID: {item_id}?"):
+        if len(item_ids) == 1:
+            item_id = item_ids[0]
+            if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete log entry ID: {item_id}?"):
+                return
+            if self.logs.remove(item_id) is not None:
+                self.populate_logs_treeview()
+                self.remove_id_entry.delete(0, tk.END)
+                self.log_action(f"Removed log entry with ID: {item_id}")
+                messagebox.showinfo("Success", f"Log ID {item_id} removed.")
+            else:
+                messagebox.showerror("Error", f"Log ID {item_id} not found.")
             return
 
-        initial_len = len(self.logs)
-        self.logs = [log for log in self.logs if log['id'] != item_id]
+        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete {len(item_ids)} selected log entries?"):
+            return
+        self.remove_logs(item_ids)
+        self.remove_id_entry.delete(0, tk.END)
 
-        if len(self.logs) < initial_len:
-            save_data(LOGS_FILE, self.logs)
-            self.populate_logs_treeview()
-            self.remove_id_entry.delete(0, tk.END)
-            self.log_action(f"Removed log entry with ID: {item_id}")
-            messagebox.showinfo("Success", f"Log ID {item_id} removed.")
-        else:
-            messagebox.showerror("Error", f"Log ID {item_id} not found.")
+    def remove_matching_logs(self):
+        """Removes every log entry matching the current filters in one batch."""
+        if not self.check_access("remove_logs"):
+            return
+
+        # Resolved from the filter inputs now: the log view may still show the
+        # previous filter's rows while a debounced or running query is pending
+        query = self.current_log_query()
+        if query is None:
+            return
+        matching = self.query_engine.ids(query)
+        if not len(matching):
+            messagebox.showinfo("Remove Logs", "No log entries match the current filters.")
+            return
+        if not messagebox.askyesno("Confirm Deletion", f"Are you sure you want to delete all {len(matching)} log entries matching the current filters?"):
+            return
+        self.remove_logs(list(matching))
+
+    def remove_logs(self, item_ids):
+        """Deletes a batch of log IDs as one operation and reports the outcome."""
+        removed = self.logs.remove_many(item_ids)
+        self.populate_logs_treeview()
+        removed_ids = [log['id'] for log in removed]
+        self.log_action(f"Removed {len(removed)} log entries in one batch" + (f": {', '.join(removed_ids)}" if len(removed_ids) <= 10 else ""))
+        missing = len(set(item_ids)) - len(removed)
+        messagebox.showinfo("Success", f"{len(removed)} log entries removed." + (f" {missing} ID(s) were not found." if missing else ""))
+
+    # --- Tab 3: Activity Summary ---
+
+    def setup_activity_tab(self, activity_frame):
+        """Sets up the frame summarizing message counts per time bucket."""
+
+        # 1. Bucket size, date range and breakdown dimension
+        filter_frame = tk.Frame(activity_frame, bg='#ffffff')
+        filter_frame.pack(fill='x')
+
+        tk.Label(filter_frame, text="Per:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=0, column=0, padx=5, pady=5)
+        self.activity_granularity_var = tk.StringVar(value="day")
+        ttk.Combobox(filter_frame, textvariable=self.activity_granularity_var, values=list(GRANULARITIES), state="readonly", font=('Inter', 10), width=8).grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(filter_frame, text="From/To (YYYY-MM-DD):", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=0, column=2, padx=5, pady=5)
+        self.activity_from_entry = tk.Entry(filter_frame, font=('Inter', 10), width=12)
+        self.activity_from_entry.grid(row=0, column=3, padx=5, pady=5)
+        self.activity_to_entry = tk.Entry(filter_frame, font=('Inter', 10), width=12)
+        self.activity_to_entry.grid(row=0, column=4, padx=5, pady=5)
+
+        tk.Label(filter_frame, text="Break Down By:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=0, column=5, padx=5, pady=5)
+        self.activity_dimension_var = tk.StringVar(value="sender")
+        ttk.Combobox(filter_frame, textvariable=self.activity_dimension_var, values=list(DIMENSIONS), state="readonly", font=('Inter', 10), width=10).grid(row=0, column=6, padx=5, pady=5)
+
+        refresh_btn = tk.Button(filter_frame, text="Refresh", command=self.populate_activity_summary, bg='#f59e0b', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
+        refresh_btn.grid(row=0, column=7, padx=15, pady=5)
+
+        for var in (self.activity_granularity_var, self.activity_dimension_var):
+            var.trace_add("write", lambda name, index, mode: self.populate_activity_summary())
+
+        self.activity_total_label = tk.Label(activity_frame, text="", font=('Inter', 10, 'bold'), bg='#ffffff', fg='#1f2937', anchor='w')
+        self.activity_total_label.pack(fill='x', pady=(10, 0))
+
+        # 2. Counts per bucket (left) and per type/sender/receiver over the range (right)
+        tables_frame = tk.Frame(activity_frame, bg='#ffffff')
+        tables_frame.pack(fill='both', expand=True, pady=10)
+
+        self.activity_tree = ttk.Treeview(tables_frame, columns=("Period", "Messages", "Suspicious"), show='headings')
+        self.activity_tree.pack(side=tk.LEFT, fill='both', expand=True, padx=(0, 5))
+        self.activity_breakdown_tree = ttk.Treeview(tables_frame, columns=("Value", "Messages", "Suspicious"), show='headings')
+        self.activity_breakdown_tree.pack(side=tk.LEFT, fill='both', expand=True, padx=(5, 0))
+        for tree in (self.activity_tree, self.activity_breakdown_tree):
+            for col in tree['columns']:
+                tree.heading(col, text=col, anchor='center')
+                tree.column(col, anchor='center', width=100)
+            tree.column(tree['columns'][0], anchor='w', width=200)
+            tree.tag_configure('suspicious', foreground='#ef4444')
+
+        self.populate_activity_summary()
+
+    def populate_activity_summary(self):
+        """Fills the activity summary from the storage backend's time-bucket aggregates."""
+        granularity = self.activity_granularity_var.get()
+        dimension = self.activity_dimension_var.get()
+        date_from = self.activity_from_entry.get().strip()
+        date_to = self.activity_to_entry.get().strip()
+        try:
+            histogram = self.query_engine.histogram(granularity, date_from, date_to)
+            breakdown = self.query_engine.breakdown(dimension, date_from, date_to)
+        except ValueError:
+            messagebox.showerror("Filter Error", "From/To dates must be in YYYY-MM-DD format.")
+            return
 
+        for tree in (self.activity_tree, self.activity_breakdown_tree):
+            tree.delete(*tree.get_children())
+        for label, total, suspicious in histogram:
+            self.activity_tree.insert("", "end", values=(label, total, suspicious), tags=('suspicious' if suspicious else '',))
+        self.activity_breakdown_tree.heading("Value", text=dimension.capitalize())
+        for value, total, suspicious in breakdown[:ACTIVITY_TOP_COUNT]:
+            self.activity_breakdown_tree.insert("", "end", values=(value, total, suspicious), tags=('suspicious' if suspicious else '',))
 
-    # --- Tab 3: Admin Logs (Access History) ---
+        total = sum(row[1] for row in histogram)
+        suspicious = sum(row[2] for row in histogram)
+        self.activity_total_label.config(text=f"{total} messages in {len(histogram)} active {granularity}(s), {suspicious} suspicious")
 
-    def setup_admin_logs_tab(self):
+    # --- Tab 4: Admin Logs (Access History) ---
+
+    def setup_admin_logs_tab(self, admin_log_frame):
         """Sets up the frame for viewing access and action history."""
-        admin_log_frame = tk.Frame(self.notebook, bg='#ffffff', padx=10, pady=10)
-        self.notebook.add(admin_log_frame, text="Admin/Access History")
 
-        # 1. Log Display (Treeview)
+        # 1. User and Time Range Filters
+        filter_frame = tk.Frame(admin_log_frame, bg='#ffffff')
+        filter_frame.pack(fill='x')
+
+        tk.Label(filter_frame, text="User:", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=0, column=0, padx=5, pady=5)
+        self.access_user_var = tk.StringVar(value="All")
+        self.access_user_cb = ttk.Combobox(filter_frame, textvariable=self.access_user_var, values=["All"] + self.access_history.users(), state="readonly", font=('Inter', 10), width=15)
+        self.access_user_cb.grid(row=0, column=1, padx=5, pady=5)
+
+        tk.Label(filter_frame, text="From/To (YYYY-MM-DD [HH:MM:SS]):", font=('Inter', 10, 'bold'), bg='#ffffff').grid(row=0, column=2, padx=5, pady=5)
+        self.access_from_entry = tk.Entry(filter_frame, font=('Inter', 10), width=20)
+        self.access_from_entry.grid(row=0, column=3, padx=5, pady=5)
+        self.access_to_entry = tk.Entry(filter_frame, font=('Inter', 10), width=20)
+        self.access_to_entry.grid(row=0, column=4, padx=5, pady=5)
+
+        # 2. Log Display (Treeview)
         columns = ("Timestamp", "User", "Action Description")
         self.access_tree = ttk.Treeview(admin_log_frame, columns=columns, show='headings')
         self.access_tree.pack(fill='both', expand=True, pady=10)
@@ -672,33 +1029,59 @@ class LogAnalyzerApp:
             self.access_tree.column(col, anchor='w', width=150)
         self.access_tree.column("Action Description", width=500)
 
-        self.populate_access_treeview()
+        # 3. Refresh and Paging Buttons
+        button_frame = tk.Frame(admin_log_frame, bg='#ffffff')
+        button_frame.pack(pady=10)
+        refresh_btn = tk.Button(button_frame, text="Refresh Logs", command=self.populate_access_treeview, bg='#f59e0b', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
+        refresh_btn.pack(side=tk.LEFT, padx=5)
+        self.access_more_btn = tk.Button(button_frame, text="Load Older", command=self.load_more_access_history, bg='#6b7280', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
+        self.access_more_btn.pack(side=tk.LEFT, padx=5)
 
-        # 2. Refresh Button
-        refresh_btn = tk.Button(admin_log_frame, text="Refresh Logs", command=self.populate_access_treeview, bg='#f59e0b', fg='white', font=('Inter', 10, 'bold'), padx=10, relief=tk.FLAT)
-        refresh_btn.pack(pady=10)
+        self.populate_access_treeview()
 
     def populate_access_treeview(self):
-        """Updates the Access History Treeview display."""
-        # Reload to ensure latest actions are shown
-        self.access_history = load_data(ACCESS_LOG_FILE, default_data=[]) 
+        """Restarts the Access History view at the newest page for the current filters."""
+        user = self.access_user_var.get()
+        start = self.access_from_entry.get().strip()
+        end = self.access_to_entry.get().strip()
+
+        # A bare date covers the whole day on either end of the range
+        if len(start) == 10:
+            start += " 00:00:00"
+        if len(end) == 10:
+            end += " 23:59:59"
+
+        # Entries are appended on the writer thread; wait for queued ones so the newest show up
+        self.writer.flush()
+        self.access_user_cb.config(values=["All"] + self.access_history.users())
+        self.access_cursor = self.access_history.iter_newest_first(
+            user=None if user == "All" else user,
+            start=start or None,
+            end=end or None
+        )
 
         for item in self.access_tree.get_children():
             self.access_tree.delete(item)
-        
-        for log in reversed(self.access_history): # Show newest first
+        self.load_more_access_history()
+
+    def load_more_access_history(self):
+        """Appends the next (older) page of access history to the Treeview."""
+        loaded = 0
+        for log in self.access_cursor:
             self.access_tree.insert("", "end", values=(
                 log.get('timestamp', 'N/A'), 
                 log.get('user', 'N/A'), 
                 log.get('action', 'N/A')
             ))
+            loaded += 1
+            if loaded >= ACCESS_PAGE_SIZE:
+                break
+        self.access_more_btn.config(state=tk.NORMAL if loaded >= ACCESS_PAGE_SIZE else tk.DISABLED)
             
-    # --- Tab 4: User Management (Admin Only) ---
+    # --- Tab 5: User Management (Admin Only) ---
     
-    def setup_user_management_tab(self):
+    def setup_user_management_tab(self, user_manage_frame):
         """Sets up the frame for adding new users (Admin only)."""
-        user_manage_frame = tk.Frame(self.notebook, bg='#ffffff', padx=20, pady=20)
-        self.notebook.add(user_manage_frame, text="User Management")
 
         tk.Label(user_manage_frame, text="Add New System User", font=('Inter', 14, 'bold'), bg='#ffffff', fg='#1f2937').pack(pady=10)
 
@@ -780,7 +1163,7 @@ class LogAnalyzerApp:
                 "role": new_role,
                 "restrictions": restrictions
             }
-            save_data(USERS_FILE, self.users)
+            self.storage.save_users()
             self.log_action(f"Admin '{admin_user}' added new user: {new_user} with role: {new_role}")
             
             messagebox.showinfo("Success", f"User '{new_user}' added successfully with role '{new_role}'.")
@@ -0,0 +1,216 @@
+import json
+import os
+
+# --- Segmented Access History Journal ---
+#
+# Access history is append-only, so it is written as a directory of JSONL
+# segments instead of one ever-growing JSON document:
+#   <dir>/segment-YYYYMMDD-HHMMSS.jsonl   one access entry per line
+#   <dir>/index.json                      time range, users and count per sealed segment
+# A new segment is started when the calendar day changes or the active segment
+# reaches `max_entries`. Readers walk segments newest-first and use the index to
+# skip every segment that cannot contain a match.
+
+INDEX_FILE = 'index.json'
+SEGMENT_PREFIX = 'segment-'
+DEFAULT_SEGMENT_ENTRIES = 10000
+
+
+def _segment_name(timestamp):
+    """Builds a sortable segment file name from a 'YYYY-MM-DD HH:MM:SS' timestamp."""
+    digits = ''.join(ch for ch in timestamp if ch.isdigit())[:14].ljust(14, '0')
+    return f"{SEGMENT_PREFIX}{digits[:8]}-{digits[8:]}.jsonl"
+
+
+class AccessJournal:
+    """Append-only access history split into time-based segments with a per-segment index."""
+
+    def __init__(self, directory, legacy_path=None, max_entries=DEFAULT_SEGMENT_ENTRIES, writer=None):
+        self.directory = directory
+        self.legacy_path = legacy_path
+        self.max_entries = max_entries
+        self.writer = writer
+
+        self._sealed = []   # index entries for closed segments, oldest first
+        self._active = None # index entry for the segment currently appended to
+        self._active_file = None
+
+        self.load()
+
+    @property
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_FILE)
+
+    # --- Loading and Migration ---
+
+    def load(self):
+        """Reads the segment index and recovers the active segment."""
+        is_new = not os.path.isdir(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._sealed = []
+        if os.path.exists(self._index_path):
+            try:
+                with open(self._index_path, 'r', encoding='utf-8') as f:
+                    self._sealed = json.load(f)
+            except (json.JSONDecodeError, IOError):
+                self._sealed = []
+
+        # Segments missing from the index were still open when the app last ran
+        # (or it stopped before the index was rewritten); rebuild their metadata.
+        indexed = {seg['file'] for seg in self._sealed}
+        unindexed = sorted(name for name in os.listdir(self.directory)
+                           if name.startswith(SEGMENT_PREFIX) and name not in indexed)
+        recovered = [self._scan_segment(name) for name in unindexed]
+        recovered = [seg for seg in recovered if seg['count']]
+
+        self._active = recovered.pop() if recovered else None
+        if recovered:
+            self._sealed.extend(recovered)
+            self._sealed.sort(key=lambda seg: seg['file'])
+            self._write_index()
+
+        if is_new:
+            self._migrate_legacy()
+
+    def _scan_segment(self, name):
+        meta = {"file": name, "start": None, "end": None, "users": [], "count": 0}
+        for entry in self._read_segment(name):
+            self._update_meta(meta, entry)
+        return meta
+
+    def _migrate_legacy(self):
+        """One-time import of a legacy whole-document access history file."""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                legacy_entries = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error migrating legacy access history from {self.legacy_path}: {e}")
+            return
+        for entry in legacy_entries:
+            self._append(entry, flush=False)
+        if self._active_file:
+            self._active_file.flush()
+        print(f"Migrated {len(legacy_entries)} access entries from {self.legacy_path} to {self.directory}")
+
+    def _write_index(self):
+        tmp_path = self._index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._sealed, f, indent=4)
+        os.replace(tmp_path, self._index_path)
+
+    # --- Writes ---
+
+    @staticmethod
+    def _update_meta(meta, entry):
+        timestamp = entry.get('timestamp', '')
+        if meta['start'] is None or timestamp < meta['start']:
+            meta['start'] = timestamp
+        if meta['end'] is None or timestamp > meta['end']:
+            meta['end'] = timestamp
+        user = entry.get('user', 'N/A')
+        if user not in meta['users']:
+            meta['users'].append(user)
+        meta['count'] += 1
+
+    def _needs_rotation(self, timestamp):
+        if self._active is None:
+            return True
+        if self._active['count'] >= self.max_entries:
+            return True
+        # Segments cover at most one calendar day
+        return timestamp[:10] != (self._active['start'] or '')[:10]
+
+    def _rotate(self, timestamp):
+        if self._active_file:
+            self._active_file.close()
+            self._active_file = None
+        if self._active and self._active['count']:
+            self._sealed.append(self._active)
+            self._write_index()
+
+        name = _segment_name(timestamp)
+        suffix = 1
+        while os.path.exists(os.path.join(self.directory, name)):
+            name = _segment_name(timestamp).replace('.jsonl', f"-{suffix}.jsonl")
+            suffix += 1
+        self._active = {"file": name, "start": None, "end": None, "users": [], "count": 0}
+
+    def _append(self, entry, flush=True):
+        timestamp = entry.get('timestamp', '')
+        if self._needs_rotation(timestamp):
+            self._rotate(timestamp)
+        if self._active_file is None:
+            self._active_file = open(os.path.join(self.directory, self._active['file']), 'a', encoding='utf-8')
+        self._active_file.write(json.dumps(entry))
+        self._active_file.write('\n')
+        if flush:
+            self._active_file.flush()
+        self._update_meta(self._active, entry)
+
+    def append(self, entry):
+        """Appends one access entry to the active segment (on the writer thread, if any)."""
+        if self.writer:
+            self.writer.submit(self._append, entry)
+        else:
+            self._append(entry)
+
+    def close(self):
+        if self._active_file:
+            self._active_file.close()
+            self._active_file = None
+
+    # --- Reads ---
+
+    def __len__(self):
+        segments = self._sealed + ([self._active] if self._active else [])
+        return sum(seg['count'] for seg in segments)
+
+    def users(self):
+        """Returns every user that appears in the history."""
+        names = set()
+        for seg in self._sealed + ([self._active] if self._active else []):
+            names.update(seg['users'])
+        return sorted(names)
+
+    def _read_segment(self, name):
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            return []
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+        return entries
+
+    def iter_newest_first(self, user=None, start=None, end=None):
+        """
+        Yields entries newest-first, optionally limited to one user and/or an
+        inclusive 'YYYY-MM-DD HH:MM:SS' time range. Segments whose index entry
+        rules them out are never opened.
+        """
+        segments = self._sealed + ([self._active] if self._active else [])
+        for seg in reversed(segments):
+            if start and seg['end'] and seg['end'] < start:
+                continue
+            if end and seg['start'] and seg['start'] > end:
+                continue
+            if user and user not in seg['users']:
+                continue
+            for entry in reversed(self._read_segment(seg['file'])):
+                timestamp = entry.get('timestamp', '')
+                if user and entry.get('user') != user:
+                    continue
+                if start and timestamp < start:
+                    continue
+                if end and timestamp > end:
+                    continue
+                yield entry
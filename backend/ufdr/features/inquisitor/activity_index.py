@@ -0,0 +1,171 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+
+from date_index import SECONDS_PER_DAY, datetime_key
+
+# --- Activity Aggregates ---
+#
+# Message counts per time bucket, kept up to date as logs are added, updated
+# and removed, so "how many messages per hour/day/week between X and Y, and how
+# many were suspicious" never rescans the logs. Buckets are numbered from the
+# date/time key of date_index.datetime_key; weeks start on Monday.
+#
+# Each bucket holds a [total, suspicious] pair for every breakdown cell:
+#   ('all', None)          every dated log in the bucket
+#   ('type', value)        per log type
+#   ('sender', value)      per sender name
+#   ('receiver', value)    per receiver name
+# A query filters on at most one of these dimensions. Range bounds are widened
+# to whole buckets. Undated logs are only counted in `undated`.
+
+# Bucket size and offset in seconds (0001-01-01 is a Monday, so weeks start a day in)
+GRANULARITIES = {
+    'hour': (3600, 0),
+    'day': (SECONDS_PER_DAY, 0),
+    'week': (7 * SECONDS_PER_DAY, SECONDS_PER_DAY),
+}
+DIMENSIONS = {'type': 'type', 'sender': 'sender_name', 'receiver': 'receiver_name'}
+ALL = ('all', None)
+
+
+def bucket_of(granularity, key):
+    """Bucket number of a date/time key."""
+    size, offset = GRANULARITIES[granularity]
+    return (key - offset) // size
+
+
+def bucket_start(granularity, bucket):
+    """Date/time key at which a bucket starts."""
+    size, offset = GRANULARITIES[granularity]
+    return bucket * size + offset
+
+
+def bucket_label(granularity, bucket):
+    """Display label for a bucket: 'YYYY-MM-DD HH:00', 'YYYY-MM-DD' or 'week of YYYY-MM-DD'."""
+    key = bucket_start(granularity, bucket)
+    day = date.fromordinal(key // SECONDS_PER_DAY).isoformat()
+    if granularity == 'hour':
+        return f"{day} {key % SECONDS_PER_DAY // 3600:02d}:00"
+    if granularity == 'week':
+        return f"week of {day}"
+    return day
+
+
+def bucket_range(granularity, min_key=None, max_key=None):
+    """Inclusive (first, last) bucket numbers covering a key range; None for an open end."""
+    return (None if min_key is None else bucket_of(granularity, min_key),
+            None if max_key is None else bucket_of(granularity, max_key))
+
+
+def check_query(granularity, dimension=None):
+    """Raises ValueError for an unknown granularity or dimension."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}' (expected one of {', '.join(GRANULARITIES)})")
+    if dimension is not None and dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension '{dimension}' (expected one of {', '.join(DIMENSIONS)})")
+
+
+class ActivityIndex:
+    """Per-bucket message counts for every granularity, maintained incrementally."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._buckets = {granularity: {} for granularity in GRANULARITIES}
+        self._order = {granularity: [] for granularity in GRANULARITIES}
+        self.undated = 0
+
+    @staticmethod
+    def _cells(log):
+        yield ALL
+        for dimension, field in DIMENSIONS.items():
+            yield (dimension, log.get(field))
+
+    def _apply(self, log, delta):
+        key = datetime_key(log.get('date', ''), log.get('time', ''))
+        if key is None:
+            self.undated += delta
+            return
+        suspicious = delta if log.get('is_suspicious', False) else 0
+        cells = list(self._cells(log))
+        for granularity, buckets in self._buckets.items():
+            bucket = bucket_of(granularity, key)
+            counts = buckets.get(bucket)
+            if counts is None:
+                if delta < 0:
+                    continue
+                counts = buckets[bucket] = {}
+                insort(self._order[granularity], bucket)
+            for cell in cells:
+                pair = counts.get(cell)
+                if pair is None:
+                    pair = counts[cell] = [0, 0]
+                pair[0] += delta
+                pair[1] += suspicious
+                if pair[0] <= 0:
+                    del counts[cell]
+            if not counts:
+                del buckets[bucket]
+                order = self._order[granularity]
+                del order[bisect_left(order, bucket)]
+
+    # --- Maintenance (called by the log store) ---
+
+    def rebuild(self, logs):
+        self._reset()
+        for log in logs:
+            self._apply(log, 1)
+
+    def add(self, log):
+        self._apply(log, 1)
+
+    def remove(self, log):
+        self._apply(log, -1)
+
+    # --- Queries ---
+
+    def _range(self, granularity, min_key, max_key):
+        """Bucket numbers overlapping the key range, in order."""
+        order = self._order[granularity]
+        first, last = bucket_range(granularity, min_key, max_key)
+        lo = 0 if first is None else bisect_left(order, first)
+        hi = len(order) if last is None else bisect_right(order, last)
+        return order[lo:hi]
+
+    def histogram(self, granularity, min_key=None, max_key=None, dimension=None, value=None):
+        """
+        Returns [(bucket, total, suspicious)] for every non-empty bucket in the
+        range, oldest first; with a `dimension`, only logs whose field equals `value`.
+        """
+        check_query(granularity, dimension)
+        cell = ALL if dimension is None else (dimension, value)
+        buckets = self._buckets[granularity]
+        rows = []
+        for bucket in self._range(granularity, min_key, max_key):
+            pair = buckets[bucket].get(cell)
+            if pair:
+                rows.append((bucket, pair[0], pair[1]))
+        return rows
+
+    def breakdown(self, dimension, min_key=None, max_key=None, granularity='day'):
+        """
+        Returns [(value, total, suspicious)] over the range for every value of
+        `dimension`, busiest first. The range is widened to whole `granularity` buckets.
+        """
+        check_query(granularity, dimension)
+        buckets = self._buckets[granularity]
+        totals = {}
+        for bucket in self._range(granularity, min_key, max_key):
+            for (cell_dimension, value), (total, suspicious) in buckets[bucket].items():
+                if cell_dimension != dimension:
+                    continue
+                pair = totals.get(value)
+                if pair is None:
+                    totals[value] = [total, suspicious]
+                else:
+                    pair[0] += total
+                    pair[1] += suspicious
+        rows = [(value, total, suspicious) for value, (total, suspicious) in totals.items()]
+        rows.sort(key=lambda row: (-row[1], str(row[0])))
+        return rows
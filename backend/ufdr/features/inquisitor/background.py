@@ -0,0 +1,129 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# --- Background Query Execution and Writes ---
+#
+# Tk widgets may only be touched from the mainloop thread, so long-running
+# work is split in two halves:
+#   QueryWorker       runs queries on one worker thread. Rapid requests are
+#                     debounced, a new request cancels the previous one, and
+#                     only the newest result is handed back to the mainloop
+#                     (results are polled from a queue with after()).
+#   BackgroundWriter  performs file writes on one thread in submission order,
+#                     so saving never blocks the UI.
+
+DEFAULT_POLL_MS = 30
+
+
+class QueryCancelled(Exception):
+    """Raised inside a query once a newer query has superseded it."""
+
+
+class CancelToken:
+    """Cancellation flag handed to each query; long queries call check() between steps."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise QueryCancelled()
+
+
+class QueryWorker:
+    """Debounced, cancellable query runner whose callbacks fire on the Tk mainloop."""
+
+    def __init__(self, widget, poll_ms=DEFAULT_POLL_MS):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inquisitor-query')
+        self._results = queue.Queue()
+        self._token = None
+        self._debounce_id = None
+        self._inflight = 0
+
+    def submit(self, query, on_done, on_error=None, debounce_ms=0):
+        """
+        Runs `query(token)` on the worker thread once no newer submission has
+        arrived for `debounce_ms`. Any earlier query is cancelled, and
+        `on_done(result)` / `on_error(exc)` are only called for the newest one.
+        """
+        if self._debounce_id is not None:
+            self.widget.after_cancel(self._debounce_id)
+            self._debounce_id = None
+        if self._token:
+            self._token.cancel()
+        token = self._token = CancelToken()
+        self._debounce_id = self.widget.after(debounce_ms, lambda: self._start(token, query, on_done, on_error))
+
+    def _start(self, token, query, on_done, on_error):
+        self._debounce_id = None
+        if token.cancelled:
+            return
+        self._inflight += 1
+        self._executor.submit(self._run, token, query, on_done, on_error)
+        if self._inflight == 1:
+            self.widget.after(self.poll_ms, self._poll)
+
+    def _run(self, token, query, on_done, on_error):
+        """Worker thread: runs the query and queues its outcome for the mainloop."""
+        if token.cancelled:
+            self._results.put((token, None, None))
+            return
+        try:
+            self._results.put((token, on_done, query(token)))
+        except QueryCancelled:
+            self._results.put((token, None, None))
+        except Exception as e:
+            self._results.put((token, on_error, e))
+
+    def _poll(self):
+        """Mainloop: delivers finished results, dropping those of superseded queries."""
+        while True:
+            try:
+                token, callback, value = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._inflight -= 1
+            if callback and not token.cancelled:
+                callback(value)
+        if self._inflight:
+            self.widget.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        if self._token:
+            self._token.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+class BackgroundWriter:
+    """Runs file writes on a single background thread, in the order they were submitted."""
+
+    def __init__(self):
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='inquisitor-writer')
+
+    @staticmethod
+    def _run(fn, args):
+        try:
+            fn(*args)
+        except (IOError, OSError) as e:
+            print(f"Error in background write: {e}")
+
+    def submit(self, fn, *args):
+        """Queues `fn(*args)` behind every write submitted before it."""
+        return self._executor.submit(self._run, fn, args)
+
+    def flush(self):
+        """Blocks until every write submitted so far has finished."""
+        self._executor.submit(lambda: None).result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
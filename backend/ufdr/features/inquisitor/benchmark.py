@@ -0,0 +1,571 @@
+import argparse
+import gc
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import types
+import uuid
+
+# --- Inquisitor Benchmark Suite ---
+#
+# Runs the hot paths of LogAnalyzerApp against seeded synthetic cases, with Tk
+# replaced by an in-process stand-in so it works on a machine without a
+# display:
+#   populate/<case>   a log view filter, from the call to the first page being
+#                     applied to the (mock) Treeview
+#   check_suspicious  check_for_suspicious_words on every Text message
+#   log_action        one access history append (plus the writer flush)
+#   save_data / load_data   the legacy whole-document JSON persistence
+#   store_load / store_compact   opening the journaled store / writing a snapshot
+#   startup_login / startup_ready   app start to the login screen / to the case
+#                     data being loaded in the background
+# Each operation reports latency percentiles, throughput and the peak RSS seen
+# while it ran. Results can be saved as a baseline and later runs compared
+# against it; a slowdown beyond the tolerance exits with status 1. The
+# committed benchmark_baseline.json covers the default sizes:
+#
+#   python benchmark.py --save-baseline benchmark_baseline.json
+#   python benchmark.py --baseline benchmark_baseline.json
+
+DEFAULT_SIZES = [10000, 100000, 1000000]
+DEFAULT_REPEAT = 5
+DEFAULT_SEED = 1337
+# A result regresses when its p50 latency grows by more than this fraction...
+DEFAULT_TOLERANCE = 0.25
+# ...and by more than this many milliseconds (filters out timer noise on fast ops)
+NOISE_FLOOR_MS = 1.0
+RSS_SAMPLE_SECONDS = 0.005
+
+FIRST_NAMES = ["Aarav", "Priya", "Rahul", "Ananya", "Vikram", "Sneha", "Arjun", "Kavya", "Rohan", "Isha",
+               "Karan", "Meera", "Aditya", "Pooja", "Nikhil", "Divya", "Sanjay", "Neha", "Amit", "Riya"]
+FILLER_WORDS = ["hello", "ok", "see", "you", "tomorrow", "call", "me", "when", "free", "where", "are",
+                "reached", "home", "send", "money", "the", "package", "is", "ready", "at", "station",
+                "please", "confirm", "time", "thanks", "bro", "will", "be", "late", "tonight"]
+LOG_TYPE_WEIGHTS = [("Text", 70), ("Call", 20), ("Audio", 5), ("Video", 5)]
+GENDER_CHOICES = ["M", "F", "O"]
+# Share of Text messages that contain one of the suspicious terms
+SUSPICIOUS_RATE = 0.05
+
+# Log view filters measured by populate/<case>
+FILTER_CASES = [
+    ("all", {}),
+    ("keyword_common", {'keyword': 'money'}),
+    ("keyword_prefix", {'keyword': 'pack'}),
+    ("type_text", {'log_type': "Text"}),
+    ("date_month", {'date_from': '2024-03-01', 'date_to': '2024-03-31'}),
+    ("suspicious", {'suspicious': "Suspicious"}),
+    ("combined", {'keyword': 'send', 'log_type': "Text", 'gender': "F", 'date_from': '2024-01-01',
+                  'date_to': '2024-06-30', 'min_length': 20}),
+]
+
+
+# --- Synthetic Data ---
+
+def generate_logs(count, seed=DEFAULT_SEED, suspicious_words=()):
+    """Yields `count` communication logs shaped like the ones LogAnalyzerApp stores."""
+    rng = random.Random(seed)
+    names = [f"{name} {rng.choice(FIRST_NAMES)[0]}." for name in FIRST_NAMES for _ in range(5)]
+    genders = {name: rng.choice(GENDER_CHOICES) for name in names}
+    types = [log_type for log_type, weight in LOG_TYPE_WEIGHTS for _ in range(weight)]
+    suspicious_words = list(suspicious_words)
+    for _ in range(count):
+        log_type = rng.choice(types)
+        sender, receiver = rng.sample(names, 2)
+        if log_type == "Text":
+            words = rng.choices(FILLER_WORDS, k=rng.randint(3, 20))
+            if suspicious_words and rng.random() < SUSPICIOUS_RATE:
+                words.insert(rng.randrange(len(words) + 1), rng.choice(suspicious_words))
+            content = ' '.join(words)
+        elif log_type == "Call":
+            content = str(rng.randint(5, 3600))
+        else:
+            content = f"recording_{rng.randint(1, 99999)}.{'mp3' if log_type == 'Audio' else 'mp4'}"
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "type": log_type,
+            "sender_name": sender,
+            "receiver_name": receiver,
+            "sender_gender": genders[sender],
+            "receiver_gender": genders[receiver],
+            "date": f"{rng.randint(1, 28):02d}-{rng.randint(1, 12):02d}-{rng.choice((2023, 2024))}",
+            "time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+            "content_or_duration": content,
+            "is_suspicious": False,
+        }
+
+
+def generate_access_history(count, users, seed=DEFAULT_SEED):
+    """Yields `count` access entries in chronological order."""
+    rng = random.Random(seed + 1)
+    actions = ["Successful login by user: {user}", "Added new Text log entry with ID: {id}",
+               "Removed log entry with ID: {id}", "User logged out: {user}"]
+    moment = time.mktime((2024, 1, 1, 0, 0, 0, 0, 0, -1))
+    for _ in range(count):
+        moment += rng.randint(1, 600)
+        user = rng.choice(users)
+        yield {
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(moment)),
+            "user": user,
+            "action": rng.choice(actions).format(user=user, id=uuid.UUID(int=rng.getrandbits(128), version=4)),
+        }
+
+
+# --- Headless Tk ---
+
+def install_headless_tk():
+    """
+    Registers a minimal stand-in for tkinter (and ttk / messagebox / filedialog)
+    in sys.modules. Widgets accept any call; StringVar, Entry and Text keep their
+    values; after() callbacks run from HeadlessRoot.pump().
+    """
+    tk = types.ModuleType('tkinter')
+    ttk = types.ModuleType('tkinter.ttk')
+    messagebox = types.ModuleType('tkinter.messagebox')
+    filedialog = types.ModuleType('tkinter.filedialog')
+
+    class Widget:
+        root = None
+
+        def __init__(self, *args, **kwargs):
+            self._text = ''
+            self._variable = kwargs.get('textvariable')
+
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: None
+
+        def after(self, ms, callback, *args):
+            return Widget.root.after(ms, callback, *args)
+
+        def after_idle(self, callback, *args):
+            return Widget.root.after(0, callback, *args)
+
+        def after_cancel(self, after_id):
+            Widget.root.after_cancel(after_id)
+
+        def get(self, *args):
+            return self._variable.get() if self._variable else self._text
+
+        def insert(self, index, text, *args, **kwargs):
+            self._text += text
+
+        def delete(self, *args):
+            self._text = ''
+
+    class HeadlessRoot(Widget):
+        def __init__(self, *args, **kwargs):
+            super().__init__()
+            Widget.root = self
+            self._queue = {}
+            self._next_id = 0
+
+        def after(self, ms, callback, *args):
+            self._next_id += 1
+            self._queue[self._next_id] = (time.perf_counter() + ms / 1000.0, callback, args)
+            return self._next_id
+
+        def after_cancel(self, after_id):
+            self._queue.pop(after_id, None)
+
+        def pump(self, until=None, timeout=60.0):
+            """Runs due callbacks until `until()` is true (or the queue empties, or `timeout` seconds pass)."""
+            deadline = time.perf_counter() + timeout if timeout is not None else float('inf')
+            while self._queue and time.perf_counter() < deadline:
+                if until and until():
+                    return
+                after_id = min(self._queue, key=lambda key: self._queue[key][0])
+                due, callback, args = self._queue[after_id]
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                del self._queue[after_id]
+                callback(*args)
+
+    class Treeview(Widget):
+        def insert(self, *args, **kwargs):
+            return kwargs.get('iid')
+
+        def delete(self, *args):
+            pass
+
+        def get_children(self, *args):
+            return ()
+
+        def selection(self):
+            return ()
+
+    class StringVar:
+        def __init__(self, master=None, value=''):
+            self._value = value
+            self._traces = []
+
+        def get(self):
+            return self._value
+
+        def set(self, value):
+            self._value = value
+            for callback in self._traces:
+                callback('', '', 'write')
+
+        def trace_add(self, mode, callback):
+            self._traces.append(callback)
+
+    for name in ('Frame', 'Label', 'Button', 'Entry', 'Text', 'Toplevel', 'Scrollbar', 'Menu', 'Canvas',
+                 'Checkbutton', 'LabelFrame', 'Listbox'):
+        setattr(tk, name, type(name, (Widget,), {}))
+    for name in ('Style', 'Combobox', 'Notebook', 'Scrollbar', 'Frame', 'Label', 'Button', 'Progressbar'):
+        setattr(ttk, name, type(name, (Widget,), {}))
+    for name in ('END', 'LEFT', 'RIGHT', 'TOP', 'BOTTOM', 'BOTH', 'X', 'Y', 'W', 'E', 'N', 'S', 'CENTER',
+                 'FLAT', 'RAISED', 'GROOVE', 'VERTICAL', 'HORIZONTAL', 'NORMAL', 'DISABLED'):
+        setattr(tk, name, name.lower())
+    tk.Tk = HeadlessRoot
+    tk.StringVar = tk.BooleanVar = tk.IntVar = tk.DoubleVar = StringVar
+    ttk.Treeview = Treeview
+    for name in ('showerror', 'showinfo', 'showwarning'):
+        setattr(messagebox, name, lambda *args, **kwargs: None)
+    messagebox.askyesno = lambda *args, **kwargs: True
+    filedialog.askopenfilename = filedialog.asksaveasfilename = lambda *args, **kwargs: ''
+    tk.ttk, tk.messagebox, tk.filedialog = ttk, messagebox, filedialog
+
+    sys.modules.update({'tkinter': tk, 'tkinter.ttk': ttk, 'tkinter.messagebox': messagebox,
+                        'tkinter.filedialog': filedialog})
+    return tk
+
+
+# --- Measurement ---
+
+def _current_rss():
+    """Resident set size of this process in bytes, or None where it cannot be read."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, AttributeError):
+        return None
+
+
+class RSSSampler:
+    """Polls the process RSS on a background thread and keeps the peak."""
+
+    def __init__(self, interval=RSS_SAMPLE_SECONDS):
+        self.interval = interval
+        self.peak = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = _current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+class Result:
+    """Latencies of one operation at one case size."""
+
+    def __init__(self, name, size, unit='ops'):
+        self.name = name
+        self.size = size
+        self.unit = unit
+        self.latencies = []
+        self.items = 0
+        self.peak_rss = None
+        self.matches = None
+
+    def record(self, seconds, items=1):
+        self.latencies.append(seconds)
+        self.items += items
+
+    def to_dict(self):
+        ordered = sorted(self.latencies)
+        total = sum(ordered)
+        return {
+            'op': self.name,
+            'size': self.size,
+            'runs': len(ordered),
+            'p50_ms': percentile(ordered, 0.50) * 1000,
+            'p90_ms': percentile(ordered, 0.90) * 1000,
+            'p99_ms': percentile(ordered, 0.99) * 1000,
+            'max_ms': (ordered[-1] if ordered else 0.0) * 1000,
+            'throughput': self.items / total if total else 0.0,
+            'unit': self.unit,
+            'peak_rss_mb': self.peak_rss / (1024 * 1024) if self.peak_rss else None,
+            'matches': self.matches,
+        }
+
+
+def measure(name, size, fn, repeat, items=1, unit='ops'):
+    """Times `fn()` `repeat` times; `items` is the work per call used for throughput."""
+    result = Result(name, size, unit)
+    gc.collect()
+    with RSSSampler() as sampler:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            result.record(time.perf_counter() - started, items)
+    result.peak_rss = sampler.peak
+    return result
+
+
+# --- Benchmarks ---
+
+def _write_case(size, seed, suspicious_words):
+    """Writes a synthetic case into the current directory in the journaled store's format."""
+    from access_journal import AccessJournal
+    from storage import ACCESS_LOG_DIR, LOGS_JOURNAL_FILE, LOGS_SNAPSHOT_FILE
+
+    with open(LOGS_SNAPSHOT_FILE, 'w', encoding='utf-8') as f:
+        for log in generate_logs(size, seed=seed, suspicious_words=suspicious_words):
+            f.write(json.dumps(log))
+            f.write('\n')
+    open(LOGS_JOURNAL_FILE, 'w').close()
+
+    access = AccessJournal(ACCESS_LOG_DIR)
+    for entry in generate_access_history(max(100, size // 10), ["admin", "analyst"], seed=seed):
+        access.append(entry)
+    access.close()
+
+
+def _open_app(tk, size=None, results=None):
+    """
+    Starts LogAnalyzerApp on the headless root, waits for the case data, logs in
+    as admin and opens the log view. With `results`, appends the startup timings.
+    """
+    import Evedentia4redone as inquisitor
+
+    started = time.perf_counter()
+    root = tk.Tk()
+    app = inquisitor.LogAnalyzerApp(root)
+    login_shown = time.perf_counter()
+    # Poll for query results every millisecond so the UI poll interval does not mask the query time
+    app.query_worker.poll_ms = 1
+    # Loading a large case can take minutes; the login below needs it finished
+    root.pump(until=lambda: app.storage is not None, timeout=None)
+    if results is not None:
+        results.append(Result('startup_login', size))
+        results[-1].record(login_shown - started)
+        results.append(Result('startup_ready', size))
+        results[-1].record(time.perf_counter() - started)
+    app.username_entry.insert(0, 'admin')
+    app.password_entry.insert(0, inquisitor.DEFAULT_USER_DATA['admin']['password'])
+    app.attempt_login()
+    app.build_tab(app.log_view_frame)
+    root.pump()
+    return root, app
+
+
+def _run_filter(root, app, filters):
+    """Applies one log view filter and waits for its first page to reach the Treeview."""
+    applied = []
+    original = app.logs_view.set_rows
+
+    def set_rows(rows):
+        original(rows)
+        applied.append(len(rows))
+
+    app.logs_view.set_rows = set_rows
+    try:
+        app.search_keyword_var._value = filters.get('keyword', '')
+        app.filter_type_var._value = filters.get('log_type', "All")
+        app.filter_gender_var._value = filters.get('gender', "All")
+        app.filter_suspicious_var._value = filters.get('suspicious', "All")
+        app.filter_date_min._text = filters.get('date_from', '')
+        app.filter_date_max._text = filters.get('date_to', '')
+        app.filter_length_min._text = str(filters.get('min_length', ''))
+        app.populate_logs_treeview()
+        root.pump(until=lambda: applied)
+    finally:
+        app.logs_view.set_rows = original
+    return applied[0] if applied else 0
+
+
+def bench_size(tk, size, repeat, seed, workdir):
+    """Runs every benchmark against a fresh synthetic case of `size` logs."""
+    import Evedentia4redone as inquisitor
+    from storage import load_data, open_storage, save_data
+
+    results = []
+    case_dir = os.path.join(workdir, f"case-{size}")
+    os.makedirs(case_dir)
+    os.chdir(case_dir)
+
+    print(f"[{size}] generating case...", file=sys.stderr)
+    _write_case(size, seed, inquisitor.SUSPICIOUS_WORDS)
+
+    print(f"[{size}] store load...", file=sys.stderr)
+    load_repeat = min(repeat, 3)
+    results.append(measure('store_load', size, lambda: open_storage(backend='journal').close(),
+                           load_repeat, items=size, unit='records'))
+
+    root, app = _open_app(tk, size, results)
+    try:
+        for case, filters in FILTER_CASES:
+            print(f"[{size}] populate/{case}...", file=sys.stderr)
+            matches = _run_filter(root, app, filters)
+            result = measure(f'populate/{case}', size, lambda: _run_filter(root, app, filters), repeat)
+            result.matches = matches
+            results.append(result)
+
+        print(f"[{size}] check_suspicious...", file=sys.stderr)
+        texts = [log['content_or_duration'] for log in app.logs if log['type'] == "Text"][:200000]
+        result = Result('check_suspicious', size, unit='messages')
+        with RSSSampler() as sampler:
+            for text in texts:
+                started = time.perf_counter()
+                app.check_for_suspicious_words(text)
+                result.record(time.perf_counter() - started)
+        result.peak_rss = sampler.peak
+        results.append(result)
+
+        print(f"[{size}] log_action...", file=sys.stderr)
+        calls = 2000
+        result = Result('log_action', size)
+        flush_result = Result('log_action_flush', size, unit='entries')
+        with RSSSampler() as sampler:
+            for i in range(calls):
+                started = time.perf_counter()
+                app.log_action(f"Benchmark action {i}")
+                result.record(time.perf_counter() - started)
+            # Appends are queued on the writer thread; this is the time to get them on disk
+            started = time.perf_counter()
+            app.writer.flush()
+            flush_result.record(time.perf_counter() - started, calls)
+        result.peak_rss = flush_result.peak_rss = sampler.peak
+        results.extend([result, flush_result])
+
+        print(f"[{size}] save_data / load_data...", file=sys.stderr)
+        logs = list(app.logs)
+        legacy_path = os.path.join(case_dir, 'legacy_logs.json')
+        save_repeat = min(repeat, 3)
+        results.append(measure('save_data', size, lambda logs=logs: save_data(legacy_path, logs), save_repeat,
+                               items=size, unit='records'))
+        results.append(measure('load_data', size, lambda: load_data(legacy_path, []), save_repeat,
+                               items=size, unit='records'))
+        del logs
+
+        print(f"[{size}] store_compact...", file=sys.stderr)
+        first_id = next(iter(app.logs))['id']
+
+        def compact():
+            app.logs.update_many({first_id: {"is_suspicious": True}})
+            app.logs.compact()
+
+        results.append(measure('store_compact', size, compact, save_repeat, items=size, unit='records'))
+    finally:
+        app.on_close()
+        os.chdir(workdir)
+        shutil.rmtree(case_dir, ignore_errors=True)
+    return [result.to_dict() for result in results]
+
+
+# --- Reporting and Baselines ---
+
+def print_table(rows):
+    header = f"{'size':>8}  {'operation':<26}{'runs':>6}{'p50 ms':>11}{'p90 ms':>11}{'p99 ms':>11}{'max ms':>11}  {'throughput':<22}{'peak RSS':>10}"
+    print(header)
+    print('-' * len(header))
+    for row in rows:
+        rss = f"{row['peak_rss_mb']:.0f} MB" if row['peak_rss_mb'] is not None else "n/a"
+        throughput = f"{row['throughput']:,.0f} {row['unit']}/s"
+        print(f"{row['size']:>8}  {row['op']:<26}{row['runs']:>6}{row['p50_ms']:>11.3f}{row['p90_ms']:>11.3f}"
+              f"{row['p99_ms']:>11.3f}{row['max_ms']:>11.3f}  {throughput:<22}{rss:>10}")
+
+
+def compare_to_baseline(rows, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Returns a description of every row whose p50 latency regressed against the baseline."""
+    previous = {(row['size'], row['op']): row for row in baseline.get('results', [])}
+    regressions = []
+    for row in rows:
+        base = previous.get((row['size'], row['op']))
+        if not base:
+            continue
+        slower_by = row['p50_ms'] - base['p50_ms']
+        if slower_by > NOISE_FLOOR_MS and row['p50_ms'] > base['p50_ms'] * (1 + tolerance):
+            regressions.append(f"{row['size']:>8}  {row['op']:<26} p50 {base['p50_ms']:.3f} ms -> {row['p50_ms']:.3f} ms "
+                               f"(+{100 * slower_by / base['p50_ms']:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the inquisitor hot paths on synthetic cases.")
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help="comma-separated case sizes (default: 10000,100000,1000000)")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="runs per timed operation")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--output', help="write the results as JSON")
+    parser.add_argument('--baseline', help="compare against a saved baseline; exit 1 on regression")
+    parser.add_argument('--save-baseline', help="save these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="allowed p50 slowdown before a result counts as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    output_paths = [os.path.abspath(path) if path else None for path in (args.output, args.baseline, args.save_baseline)]
+    output_path, baseline_path, save_baseline_path = output_paths
+
+    # The app writes its case files to the working directory, so every run gets a scratch directory
+    tk = install_headless_tk()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    workdir = tempfile.mkdtemp(prefix='inquisitor-bench-')
+    start_dir = os.getcwd()
+    rows = []
+    try:
+        for size in sizes:
+            rows.extend(bench_size(tk, size, args.repeat, args.seed, workdir))
+    finally:
+        os.chdir(start_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print_table(rows)
+    report = {'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': sys.version.split()[0],
+              'seed': args.seed, 'repeat': args.repeat, 'results': rows}
+    for path in (output_path, save_baseline_path):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(rows, baseline, tolerance=args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {baseline_path}:")
+            for line in regressions:
+                print(line)
+            return 1
+        print(f"\nNo regressions against {baseline_path}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
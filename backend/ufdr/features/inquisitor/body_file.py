@@ -0,0 +1,146 @@
+import mmap
+import tempfile
+import threading
+import weakref
+
+# --- Memory-Mapped Log Bodies ---
+#
+# The Treeview only ever shows the first 50 characters of a message, so the
+# log store keeps long `content_or_duration` values out of its in-memory
+# records. Each long body is appended (UTF-8) to a spill file and the record
+# holds a BodyRef instead: the file, offset and size in it, the body's length
+# in characters and a short preview. Bodies are read back through a read-only
+# memory map when a caller asks for the full record. A record whose body did
+# not change keeps its BodyRef, and the log store copies the live bodies to a
+# fresh file when it compacts (BodyFile.copy), so the file grows with the case
+# rather than with its edit history. A BodyRef names its file, so a record
+# read while the store switches files still resolves.
+#
+# The spill file is private to the process: an unnamed temporary file in the
+# case directory, rebuilt whenever the store loads. The snapshot and journal
+# stay the source of truth, so nothing here needs to survive a crash, and
+# several processes can open the same case without sharing it.
+
+# Contents up to this many characters stay inline in the in-memory record
+INLINE_BODY_CHARS = 64
+# Characters of a spilled body kept in memory for previews (the log view shows 50)
+PREVIEW_CHARS = 64
+
+
+class BodyRef:
+    """Location of a spilled body in a BodyFile, with its length and a preview."""
+
+    __slots__ = ('bodies', 'offset', 'size', 'length', 'preview')
+
+    def __init__(self, bodies, offset, size, length, preview):
+        self.bodies = bodies
+        self.offset = offset
+        self.size = size
+        self.length = length
+        self.preview = preview
+
+
+class BodyFile:
+    """Append-only spill file for long log bodies, read back through mmap."""
+
+    def __init__(self, directory=None):
+        self._file = tempfile.TemporaryFile(prefix='inquisitor-bodies-', dir=directory or None)
+        # A file the log store replaced at compaction is closed with its last BodyRef
+        weakref.finalize(self, self._file.close)
+        self._end = 0
+        # (map, bytes mapped), replaced as one value so a reader never pairs a
+        # new map with the old size or the other way round
+        self._view = (None, 0)
+        self._lock = threading.Lock()
+
+    def append(self, text):
+        """Stores `text` and returns its BodyRef."""
+        data = text.encode('utf-8')
+        with self._lock:
+            offset = self._end
+            self._file.write(data)
+            self._end += len(data)
+        return BodyRef(self, offset, len(data), len(text), text[:PREVIEW_CHARS])
+
+    def copy(self, ref):
+        """Stores the body behind `ref` (held in any BodyFile) and returns its new BodyRef."""
+        data = ref.bodies.read_bytes(ref)
+        with self._lock:
+            offset = self._end
+            self._file.write(data)
+            self._end += len(data)
+        return BodyRef(self, offset, ref.size, ref.length, ref.preview)
+
+    def read(self, ref):
+        """Returns the full body for a BodyRef into this file."""
+        return self.read_bytes(ref).decode('utf-8')
+
+    def read_bytes(self, ref):
+        """Returns the encoded body for a BodyRef into this file."""
+        end = ref.offset + ref.size
+        body_map, mapped = self._view
+        if end > mapped:
+            body_map = self._remap(end)
+        return body_map[ref.offset:end]
+
+    def _remap(self, end):
+        """Maps the file again once appends have grown it past the current mapping."""
+        with self._lock:
+            body_map, mapped = self._view
+            if end > mapped:
+                self._file.flush()
+                # The previous map is released when the last reader drops it
+                body_map = mmap.mmap(self._file.fileno(), self._end, access=mmap.ACCESS_READ)
+                self._view = (body_map, self._end)
+            return body_map
+
+    def __len__(self):
+        """Bytes stored so far."""
+        return self._end
+
+    def close(self):
+        with self._lock:
+            body_map, _ = self._view
+            if body_map is not None:
+                body_map.close()
+            self._view = (None, 0)
+            self._file.close()
+
+
+def pack(log, bodies, previous=None):
+    """
+    Returns `log` as kept in memory: a long body is moved to `bodies` and replaced
+    by a BodyRef. When `log` replaces the in-memory record `previous` with the same
+    body, its BodyRef is reused instead of spilling the body again.
+    """
+    content = log.get('content_or_duration')
+    if not isinstance(content, str) or len(content) <= INLINE_BODY_CHARS:
+        return log
+    record = dict(log)
+    ref = previous.get('content_or_duration') if previous is not None else None
+    if isinstance(ref, BodyRef) and ref.length == len(content) and ref.bodies.read(ref) == content:
+        record['content_or_duration'] = ref
+    else:
+        record['content_or_duration'] = bodies.append(content)
+    return record
+
+
+def unpack(record):
+    """Returns the full log for an in-memory record, reading a spilled body back from its file."""
+    content = record.get('content_or_duration')
+    if not isinstance(content, BodyRef):
+        return record
+    log = dict(record)
+    log['content_or_duration'] = content.bodies.read(content)
+    return log
+
+
+def summarize(record):
+    """
+    Returns a copy of an in-memory record whose `content_or_duration` is at most
+    PREVIEW_CHARS long, plus `content_length` (the full length), without reading the body.
+    """
+    content = record.get('content_or_duration') or ''
+    if isinstance(content, BodyRef):
+        return {**record, 'content_or_duration': content.preview, 'content_length': content.length}
+    return {**record, 'content_or_duration': content[:PREVIEW_CHARS], 'content_length': len(content)}
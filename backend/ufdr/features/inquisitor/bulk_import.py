@@ -0,0 +1,409 @@
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+
+from suspicious_matcher import SuspiciousTermMatcher
+
+# --- Streaming Bulk Import ---
+#
+# Extraction exports (CSV, JSONL or one large JSON array) are read record by
+# record, so a file never has to fit in memory. Each record is mapped onto the
+# log schema, its date and time are normalized to DD-MM-YYYY / HH:MM:SS, and
+# records are grouped into batches. Suspicious-term scoring for each batch runs
+# in a process pool while the next batch is being parsed. Scored batches go to
+# the store's add_batches(), which keeps them in memory and persists the case
+# once at the end rather than writing a journal line per record.
+
+BATCH_SIZE = 5000
+# Batches scored ahead of the store, per worker process
+MAX_BATCHES_IN_FLIGHT_PER_WORKER = 2
+PROGRESS_INTERVAL = 1.0
+JSON_CHUNK_SIZE = 1 << 20
+MAX_REPORTED_ERRORS = 20
+
+IMPORT_FILE_TYPES = [
+    ("Extraction exports", "*.csv *.jsonl *.ndjson *.json"),
+    ("All files", "*.*"),
+]
+
+# Source column/key names accepted for each log field (matched case-insensitively)
+FIELD_ALIASES = {
+    'id': ('id', 'log_id', 'message_id', 'uuid'),
+    'type': ('type', 'kind', 'message_type', 'category'),
+    'sender_name': ('sender_name', 'sender', 'from', 'from_name'),
+    'receiver_name': ('receiver_name', 'receiver', 'recipient', 'to', 'to_name'),
+    'sender_gender': ('sender_gender', 'from_gender'),
+    'receiver_gender': ('receiver_gender', 'to_gender'),
+    'date': ('date',),
+    'time': ('time',),
+    'timestamp': ('timestamp', 'datetime', 'date_time'),
+    'content_or_duration': ('content_or_duration', 'content', 'body', 'message', 'text', 'duration', 'file_name'),
+}
+
+TYPE_ALIASES = {
+    'text': "Text", 'sms': "Text", 'mms': "Text", 'message': "Text", 'chat': "Text",
+    'call': "Call", 'voice call': "Call",
+    'audio': "Audio", 'voice note': "Audio",
+    'video': "Video",
+}
+
+# Accepted date shapes: DD-MM-YYYY, DD/MM/YYYY, DD.MM.YYYY, YYYY-MM-DD and YYYY/MM/DD.
+# Parsed with precompiled patterns; strptime is several times slower per record.
+DMY_RE = re.compile(r'(\d{1,2})([-/.])(\d{1,2})\2(\d{4})$')
+YMD_RE = re.compile(r'(\d{4})([-/])(\d{1,2})\2(\d{1,2})$')
+# HH:MM[:SS[.fff]] with an optional AM/PM suffix
+TIME_RE = re.compile(r'(\d{1,2}):(\d{2})(?::(\d{2})(?:\.\d+)?)?\s*([AP]M)?$')
+
+
+# --- Record Normalization ---
+
+def normalize_date(value):
+    """Returns `value` as 'DD-MM-YYYY'. Raises ValueError if it is not a recognised date."""
+    value = str(value).strip()
+    match = DMY_RE.match(value)
+    if match:
+        day, month, year = int(match.group(1)), int(match.group(3)), int(match.group(4))
+    else:
+        match = YMD_RE.match(value)
+        if not match:
+            raise ValueError(f"unrecognised date '{value}'")
+        year, month, day = int(match.group(1)), int(match.group(3)), int(match.group(4))
+    try:
+        date(year, month, day)
+    except ValueError:
+        raise ValueError(f"unrecognised date '{value}'")
+    return f"{day:02d}-{month:02d}-{year:04d}"
+
+
+def normalize_time(value):
+    """Returns `value` as 'HH:MM:SS'. Raises ValueError if it is not a recognised time."""
+    value = str(value).strip().upper()
+    match = TIME_RE.match(value)
+    if not match:
+        raise ValueError(f"unrecognised time '{value}'")
+    hours, minutes, seconds = int(match.group(1)), int(match.group(2)), int(match.group(3) or 0)
+    meridiem = match.group(4)
+    if meridiem:
+        if not 1 <= hours <= 12:
+            raise ValueError(f"unrecognised time '{value}'")
+        hours = hours % 12 + (12 if meridiem == 'PM' else 0)
+    if not (hours < 24 and minutes < 60 and seconds < 60):
+        raise ValueError(f"unrecognised time '{value}'")
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def split_timestamp(value):
+    """
+    Splits a combined timestamp into ('DD-MM-YYYY', 'HH:MM:SS'). Accepts ISO 8601
+    strings (any UTC offset is dropped, keeping the wall-clock time as recorded)
+    and Unix epochs in seconds or milliseconds, which are read as UTC.
+    """
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.strip().isdigit()):
+        seconds = float(value)
+        if seconds > 1e11:
+            seconds /= 1000.0
+        moment = datetime.fromtimestamp(seconds, timezone.utc)
+    else:
+        moment = datetime.fromisoformat(str(value).strip())
+    return (f"{moment.day:02d}-{moment.month:02d}-{moment.year:04d}",
+            f"{moment.hour:02d}:{moment.minute:02d}:{moment.second:02d}")
+
+
+def _pick(record, field):
+    for key in FIELD_ALIASES[field]:
+        value = record.get(key)
+        if value is not None and value != '':
+            return value
+    return None
+
+
+def normalize_record(raw):
+    """Maps one source record onto the log schema. Raises ValueError if it cannot be used."""
+    if not isinstance(raw, dict):
+        raise ValueError("record is not an object")
+    record = {str(key).strip().lower(): value for key, value in raw.items()}
+
+    raw_type = str(_pick(record, 'type') or 'Text').strip()
+    log_type = TYPE_ALIASES.get(raw_type.lower())
+    if log_type is None:
+        raise ValueError(f"unknown type '{raw_type}'")
+
+    content = _pick(record, 'content_or_duration')
+    if content is None or not str(content).strip():
+        raise ValueError("missing content/duration")
+
+    date_value, time_value = _pick(record, 'date'), _pick(record, 'time')
+    if date_value is None:
+        timestamp = _pick(record, 'timestamp')
+        if timestamp is None:
+            raise ValueError("missing date")
+        date_str, time_str = split_timestamp(timestamp)
+    else:
+        date_str = normalize_date(date_value)
+        time_str = normalize_time(time_value) if time_value is not None else '00:00:00'
+
+    log_id = _pick(record, 'id')
+    return {
+        "id": str(log_id) if log_id is not None else str(uuid.uuid4()),
+        "type": log_type,
+        "sender_name": str(_pick(record, 'sender_name') or '').strip(),
+        "receiver_name": str(_pick(record, 'receiver_name') or '').strip(),
+        "sender_gender": str(_pick(record, 'sender_gender') or '').strip().upper(),
+        "receiver_gender": str(_pick(record, 'receiver_gender') or '').strip().upper(),
+        "date": date_str,
+        "time": time_str,
+        "content_or_duration": str(content).strip(),
+    }
+
+
+# --- Streaming Readers ---
+
+def _iter_csv(text_file):
+    for row in csv.DictReader(text_file):
+        yield row
+
+
+def _iter_jsonl(text_file):
+    for line in text_file:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Rejected as "not an object" rather than aborting the import
+                yield None
+
+
+def _iter_json_array(text_file, chunk_size=JSON_CHUNK_SIZE):
+    """Yields the elements of a top-level JSON array, reading the file in chunks."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof, opened = '', 0, False, False
+    while True:
+        while pos < len(buf) and (buf[pos].isspace() or (opened and buf[pos] == ',')):
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                if opened:
+                    raise ValueError("unterminated JSON array")
+                return
+            buf, pos = text_file.read(chunk_size), 0
+            eof = not buf
+            continue
+
+        if not opened:
+            if buf[pos] != '[':
+                raise ValueError("expected a JSON array of records")
+            opened = True
+            pos += 1
+            continue
+        if buf[pos] == ']':
+            return
+
+        try:
+            element, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            # The element runs past the end of the buffer: read more and retry
+            if eof:
+                raise
+            chunk = text_file.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield element
+        pos = end
+
+
+def _reader_for(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return _iter_csv
+    if extension in ('.jsonl', '.ndjson'):
+        return _iter_jsonl
+    if extension == '.json':
+        return _iter_json_array
+    raise ValueError(f"Unsupported import file type: {extension or path}")
+
+
+# --- Suspicious Scoring Workers ---
+
+_worker_matcher = None
+
+
+def _init_scoring_worker(weights, threshold, fuzzy=False):
+    global _worker_matcher
+    _worker_matcher = SuspiciousTermMatcher(weights, threshold=threshold, fuzzy=fuzzy)
+
+
+def _score_texts(texts):
+    """Worker process: flags for one batch (None marks a non-Text record)."""
+    return [text is not None and _worker_matcher.is_suspicious(text) for text in texts]
+
+
+# --- Importer ---
+
+class ImportStats:
+    """Running totals for one import, handed to the progress callback."""
+
+    def __init__(self, path):
+        self.path = path
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.suspicious = 0
+        self.errors = []
+        self.cancelled = False
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self):
+        """Imported records per second."""
+        return self.imported / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def percent(self):
+        return 100.0 * self.bytes_read / self.total_bytes if self.total_bytes else 100.0
+
+    def summary(self):
+        return (f"Imported {self.imported} of {self.read} records from {os.path.basename(self.path)} "
+                f"({self.rejected} rejected, {self.suspicious} suspicious) in {self.elapsed:.1f}s "
+                f"[{self.rate:,.0f} records/s]")
+
+
+class BulkImporter:
+    """Streams an export file into a log store in scored batches."""
+
+    def __init__(self, store, matcher, batch_size=BATCH_SIZE, workers=None, progress=None,
+                 progress_interval=PROGRESS_INTERVAL):
+        self.store = store
+        self.matcher = matcher
+        self.batch_size = batch_size
+        self.workers = max(1, (os.cpu_count() or 2) - 1) if workers is None else workers
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stops reading after the current batch; records already read are still saved."""
+        self._cancel.set()
+
+    def run(self, path):
+        """Imports one file and returns its ImportStats."""
+        stats = ImportStats(path)
+        reader = _reader_for(path)
+        with open(path, 'rb') as raw:
+            text_file = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+            batches = self._scored_batches(self._normalized_batches(reader(text_file), raw, stats), stats)
+            self.store.add_batches(batches)
+        stats.cancelled = self._cancel.is_set()
+        stats.finished = time.monotonic()
+        stats.bytes_read = stats.total_bytes
+        if self.progress:
+            self.progress(stats)
+        return stats
+
+    def _normalized_batches(self, records, raw, stats):
+        batch = []
+        for record in records:
+            stats.read += 1
+            try:
+                batch.append(normalize_record(record))
+            except (ValueError, TypeError, OverflowError) as e:
+                stats.rejected += 1
+                if len(stats.errors) < MAX_REPORTED_ERRORS:
+                    stats.errors.append(f"Record {stats.read}: {e}")
+            if len(batch) >= self.batch_size:
+                stats.bytes_read = raw.tell()
+                yield batch
+                batch = []
+                if self._cancel.is_set():
+                    return
+        if batch:
+            yield batch
+
+    def _scored_batches(self, batches, stats):
+        """Scores batches in the process pool, keeping a bounded number in flight."""
+        pool = None
+        in_flight = deque()
+        last_report = 0.0
+        try:
+            for batch in batches:
+                texts = [log['content_or_duration'] if log['type'] == "Text" else None for log in batch]
+                if pool is None and self.workers and len(batch) >= self.batch_size:
+                    # Only files with more than one batch are worth starting worker processes for
+                    pool = ProcessPoolExecutor(
+                        max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                        initializer=_init_scoring_worker, initargs=(self.matcher.weights, self.matcher.threshold, self.matcher.fuzzy)
+                    )
+                if pool is None:
+                    in_flight.append((batch, [text is not None and self.matcher.is_suspicious(text) for text in texts]))
+                else:
+                    in_flight.append((batch, pool.submit(_score_texts, texts)))
+
+                while in_flight and (pool is None or len(in_flight) > self.workers * MAX_BATCHES_IN_FLIGHT_PER_WORKER):
+                    yield self._finish_batch(in_flight.popleft(), stats)
+                    if self.progress and time.monotonic() - last_report >= self.progress_interval:
+                        last_report = time.monotonic()
+                        self.progress(stats)
+            while in_flight:
+                yield self._finish_batch(in_flight.popleft(), stats)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    @staticmethod
+    def _finish_batch(item, stats):
+        batch, flags = item
+        if not isinstance(flags, list):
+            flags = flags.result()
+        for log, flagged in zip(batch, flags):
+            log['is_suspicious'] = flagged
+        stats.imported += len(batch)
+        stats.suspicious += sum(flags)
+        return batch
+
+
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python bulk_import.py <export file> [<export file> ...]")
+        sys.exit(1)
+
+    from Evedentia4redone import FUZZY_SUSPICIOUS_MATCHING, SUSPICIOUS_SCORE_THRESHOLD, SUSPICIOUS_TERMS_FILE, SUSPICIOUS_WORDS
+    from storage import open_storage
+
+    def report(stats):
+        print(f"  {stats.percent:5.1f}%  {stats.imported} imported, {stats.rejected} rejected  "
+              f"[{stats.rate:,.0f} records/s]")
+
+    storage = open_storage()
+    matcher = SuspiciousTermMatcher.from_file(SUSPICIOUS_TERMS_FILE, SUSPICIOUS_WORDS, threshold=SUSPICIOUS_SCORE_THRESHOLD,
+                                              fuzzy=FUZZY_SUSPICIOUS_MATCHING)
+    importer = BulkImporter(storage.logs, matcher, progress=report)
+    for path in sys.argv[1:]:
+        print(f"Importing {path} ...")
+        try:
+            stats = importer.run(path)
+        except (IOError, OSError, ValueError) as e:
+            print(f"Error importing {path}: {e}")
+            continue
+        print(stats.summary())
+        for error in stats.errors:
+            print(f"  {error}")
+    storage.close()
@@ -0,0 +1,242 @@
+from bisect import bisect_left, insort
+from collections import deque
+
+from date_index import datetime_key
+
+# --- Contact Graph ---
+#
+# Who talks to whom, kept up to date as logs are added, updated and removed.
+# Every sender -> receiver pair is a directed Edge carrying message and call
+# counts, total call seconds, suspicious-message counts and the sorted
+# date/time keys of its logs (so first/last contact survive removals). An
+# undirected adjacency map over the edges answers shortest paths and k-hop
+# neighborhoods with a breadth-first search that only touches the people it
+# reaches, and per-person totals answer top-talker queries without a scan.
+
+CALL_TYPE = "Call"
+
+
+def call_seconds(log):
+    """Duration of a Call log in seconds (0 when not a number)."""
+    duration = str(log.get('content_or_duration', '')).strip()
+    return int(duration) if duration.isdigit() else 0
+
+
+class Edge:
+    """Communication totals for one sender -> receiver pair."""
+
+    __slots__ = ('sender', 'receiver', 'messages', 'calls', 'call_seconds', 'suspicious', 'keys')
+
+    def __init__(self, sender, receiver):
+        self.sender = sender
+        self.receiver = receiver
+        self.messages = 0
+        self.calls = 0
+        self.call_seconds = 0
+        self.suspicious = 0
+        self.keys = []  # sorted date/time keys of the dated logs on this edge
+
+    @property
+    def total(self):
+        return self.messages + self.calls
+
+    @property
+    def first_key(self):
+        return self.keys[0] if self.keys else None
+
+    @property
+    def last_key(self):
+        return self.keys[-1] if self.keys else None
+
+    def to_dict(self):
+        return {
+            'sender': self.sender, 'receiver': self.receiver, 'messages': self.messages,
+            'calls': self.calls, 'call_seconds': self.call_seconds, 'suspicious': self.suspicious,
+            'first_key': self.first_key, 'last_key': self.last_key,
+        }
+
+
+class ContactGraph:
+    """Directed sender -> receiver edges with per-person totals, maintained incrementally."""
+
+    def __init__(self):
+        self._reset()
+
+    def _reset(self):
+        self._edges = {}      # (sender, receiver) -> Edge
+        self._adjacent = {}   # person -> {other person: number of directed edges between them}
+        self._totals = {}     # person -> logs sent or received
+
+    def _link(self, a, b, delta):
+        for person, other in ((a, b), (b, a)):
+            neighbors = self._adjacent.setdefault(person, {})
+            count = neighbors.get(other, 0) + delta
+            if count > 0:
+                neighbors[other] = count
+            else:
+                neighbors.pop(other, None)
+                if not neighbors:
+                    del self._adjacent[person]
+
+    def _count(self, person, delta):
+        total = self._totals.get(person, 0) + delta
+        if total > 0:
+            self._totals[person] = total
+        else:
+            self._totals.pop(person, None)
+
+    def _apply(self, log, delta, sort=True):
+        sender = log.get('sender_name')
+        receiver = log.get('receiver_name')
+        if not sender or not receiver:
+            return
+        edge = self._edges.get((sender, receiver))
+        if edge is None:
+            if delta < 0:
+                return
+            edge = self._edges[(sender, receiver)] = Edge(sender, receiver)
+            self._link(sender, receiver, 1)
+
+        if log.get('type') == CALL_TYPE:
+            edge.calls += delta
+            edge.call_seconds += delta * call_seconds(log)
+        else:
+            edge.messages += delta
+        if log.get('is_suspicious', False):
+            edge.suspicious += delta
+        key = datetime_key(log.get('date', ''), log.get('time', ''))
+        if key is not None:
+            if delta > 0:
+                if sort:
+                    insort(edge.keys, key)
+                else:
+                    edge.keys.append(key)
+            else:
+                pos = bisect_left(edge.keys, key)
+                if pos < len(edge.keys) and edge.keys[pos] == key:
+                    del edge.keys[pos]
+        self._count(sender, delta)
+        if receiver != sender:
+            self._count(receiver, delta)
+
+        if edge.total <= 0:
+            del self._edges[(sender, receiver)]
+            self._link(sender, receiver, -1)
+
+    # --- Maintenance (called by the log store) ---
+
+    def rebuild(self, logs):
+        self._reset()
+        for log in logs:
+            self._apply(log, 1, sort=False)
+        for edge in self._edges.values():
+            edge.keys.sort()
+
+    def add(self, log):
+        self._apply(log, 1)
+
+    def remove(self, log):
+        self._apply(log, -1)
+
+    # --- Queries ---
+
+    def __contains__(self, person):
+        return person in self._adjacent
+
+    def edge(self, sender, receiver):
+        """The Edge from `sender` to `receiver`, or None if they never communicated that way."""
+        return self._edges.get((sender, receiver))
+
+    def edges_of(self, person):
+        """Every Edge into or out of `person`."""
+        pairs = set()
+        for other in self._adjacent.get(person, ()):
+            pairs.update(((person, other), (other, person)))
+        return [self._edges[pair] for pair in pairs if pair in self._edges]
+
+    def top_talkers(self, limit=10):
+        """[(person, logs sent or received)], busiest first."""
+        ranked = sorted(self._totals.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def top_contacts(self, person, limit=10):
+        """
+        [(other person, total, suspicious)] for everyone `person` exchanged logs
+        with (both directions combined), busiest first.
+        """
+        contacts = []
+        for other in self._adjacent.get(person, ()):
+            total = suspicious = 0
+            for pair in {(person, other), (other, person)}:
+                edge = self._edges.get(pair)
+                if edge is not None:
+                    total += edge.total
+                    suspicious += edge.suspicious
+            contacts.append((other, total, suspicious))
+        contacts.sort(key=lambda row: (-row[1], row[0]))
+        return contacts[:limit]
+
+    def shortest_path(self, source, target):
+        """
+        The fewest-hops chain of people linking `source` to `target` (direction
+        ignored), as a list of names from source to target, or None if unconnected.
+        """
+        if source not in self._adjacent or target not in self._adjacent:
+            return None
+        if source == target:
+            return [source]
+
+        # Bidirectional BFS: always expand the smaller frontier
+        parents = {source: None}
+        children = {target: None}
+        forward = [source]
+        backward = [target]
+        while forward and backward:
+            if len(forward) <= len(backward):
+                forward, meet = self._expand(forward, parents, children)
+            else:
+                backward, meet = self._expand(backward, children, parents)
+            if meet is not None:
+                path = []
+                person = meet
+                while person is not None:
+                    path.append(person)
+                    person = parents[person]
+                path.reverse()
+                person = children[meet]
+                while person is not None:
+                    path.append(person)
+                    person = children[person]
+                return path
+        return None
+
+    def _expand(self, frontier, seen, other_seen):
+        """Advances one BFS level; returns (next frontier, meeting person or None)."""
+        next_frontier = []
+        for person in frontier:
+            for other in self._adjacent[person]:
+                if other in seen:
+                    continue
+                seen[other] = person
+                if other in other_seen:
+                    return next_frontier, other
+                next_frontier.append(other)
+        return next_frontier, None
+
+    def neighborhood(self, person, hops=1):
+        """{other person: distance} for everyone within `hops` links of `person` (direction ignored)."""
+        if person not in self._adjacent:
+            return {}
+        distances = {person: 0}
+        queue = deque([person])
+        while queue:
+            current = queue.popleft()
+            distance = distances[current]
+            if distance >= hops:
+                continue
+            for other in self._adjacent[current]:
+                if other not in distances:
+                    distances[other] = distance + 1
+                    queue.append(other)
+        del distances[person]
+        return distances
@@ -0,0 +1,35 @@
+from datetime import date
+
+# --- Chronological Date/Time Keys ---
+#
+# Each log's 'date' (DD-MM-YYYY) and 'time' (HH:MM:SS) are parsed once, when the
+# log is added or loaded, into one integer key: seconds since 0001-01-01. Keys
+# compare chronologically, so the log columns (log_columns.py) and the SQLite
+# `ts` column sort and range-filter logs as plain integers. Logs whose date
+# cannot be parsed have no key; they are listed first and never fall inside a
+# range.
+
+SECONDS_PER_DAY = 86400
+
+
+def datetime_key(date_str, time_str='00:00:00'):
+    """Converts 'DD-MM-YYYY' and 'HH:MM:SS' into a sortable integer, or None if invalid."""
+    try:
+        day, month, year = (int(part) for part in date_str.split('-'))
+        hours, minutes, seconds = (int(part) for part in (time_str or '00:00:00').split(':'))
+        ordinal = date(year, month, day).toordinal()
+    except (ValueError, AttributeError):
+        return None
+    if not (0 <= hours < 24 and 0 <= minutes < 60 and 0 <= seconds < 60):
+        return None
+    return ordinal * SECONDS_PER_DAY + hours * 3600 + minutes * 60 + seconds
+
+
+def filter_date_key(date_str, end_of_day=False):
+    """
+    Converts a 'YYYY-MM-DD' filter bound into a key covering the start (or end) of
+    that day. Raises ValueError on a malformed bound.
+    """
+    year, month, day = (int(part) for part in date_str.split('-'))
+    key = date(year, month, day).toordinal() * SECONDS_PER_DAY
+    return key + SECONDS_PER_DAY - 1 if end_of_day else key
@@ -0,0 +1,275 @@
+import re
+from collections import Counter
+
+# --- Fuzzy Term Index ---
+#
+# Catches obfuscated spellings ("b0mb", "bom b", "a t t a c k") that the
+# whole-word matchers miss. Message text is normalized first: lower-cased,
+# common leetspeak digits and symbols mapped back to letters, and split into
+# alphanumeric words. Besides the words themselves a message contributes
+# joined terms for spaced-out spellings: a word glued to a neighbour of at
+# most JOIN_PIECE_CHARS characters ("bom b" -> "bomb") and every stretch of a
+# run of such short pieces, up to MAX_JOINED_CHARS ("a t t a c k" -> "attack").
+#
+# The index maps each term to the Text logs containing it, and each character
+# trigram of the (padded) term to the terms containing it. A query word is
+# matched against the vocabulary, never against messages: trigram counts
+# propose candidate terms (a term within k edits of a word of length m shares
+# at least m - 4k of its padded trigrams), and a bounded edit distance check
+# (adjacent transpositions count as one edit) confirms them. A multi-word
+# query matches a log that contains the words spaced together as one term, or
+# every word separately.
+#
+# FuzzyTermSet turns the same lookup around for flagging one message at a
+# time: the trigram index is built over a fixed set of query terms, and each
+# term of the message proposes the query words it could be a misspelling of.
+
+LEET = str.maketrans({
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b',
+    '@': 'a', '$': 's', '!': 'i', '|': 'i', '+': 't',
+})
+WORD_RE = re.compile(r'[a-z0-9]+')
+# Pieces this short are joined to their neighbours (spaced-out spellings)
+JOIN_PIECE_CHARS = 2
+# Longest term joined from a run of short pieces
+MAX_JOINED_CHARS = 20
+GRAM = 3
+# Trigrams one edit can remove from a word (a transposition touches four)
+GRAMS_PER_EDIT = GRAM + 1
+# Message terms whose fuzzy matches FuzzyTermSet remembers (message vocabulary repeats a lot)
+TERM_CACHE_SIZE = 100000
+
+
+def normalize_words(text):
+    """Lower-cases `text`, undoes leetspeak and returns its alphanumeric words."""
+    return WORD_RE.findall(str(text).lower().translate(LEET))
+
+
+def _add_run(terms, run):
+    """Adds every stretch of two or more consecutive short pieces, up to MAX_JOINED_CHARS."""
+    for start in range(len(run) - 1):
+        joined = run[start]
+        for piece in run[start + 1:]:
+            joined += piece
+            if len(joined) > MAX_JOINED_CHARS:
+                break
+            terms.add(joined)
+
+
+def index_terms(text):
+    """The set of terms a message is indexed under: its words plus joined spaced-out spellings."""
+    words = normalize_words(text)
+    terms = set(words)
+    run = []
+    for i, word in enumerate(words):
+        if i and (len(word) <= JOIN_PIECE_CHARS or len(words[i - 1]) <= JOIN_PIECE_CHARS):
+            terms.add(words[i - 1] + word)
+        if len(word) <= JOIN_PIECE_CHARS:
+            run.append(word)
+            continue
+        _add_run(terms, run)
+        run = []
+    _add_run(terms, run)
+    return terms
+
+
+def default_max_edits(word):
+    """Edits tolerated for a query word: none up to 4 characters, 1 up to 8, then 2."""
+    if len(word) <= 4:
+        return 0
+    return 1 if len(word) <= 8 else 2
+
+
+def _grams(term):
+    padded = f"^{term}$"
+    return {padded[i:i + GRAM] for i in range(len(padded) - GRAM + 1)}
+
+
+def within_edits(a, b, max_edits):
+    """
+    True if `a` becomes `b` in at most `max_edits` insertions, deletions,
+    substitutions or adjacent transpositions (optimal string alignment distance).
+    """
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    if max_edits == 0:
+        return a == b
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > max_edits:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= max_edits
+
+
+def _query_words(query, max_edits):
+    """[(word, edits)] for the query's words and, for several words, their joined form."""
+    words = normalize_words(query)
+    if len(words) > 1:
+        words = [''.join(words)] + words
+    # At least one trigram must be shared, or the index could not propose the term
+    return [(word, min(default_max_edits(word) if max_edits is None else max_edits, (len(word) - 1) // GRAMS_PER_EDIT))
+            for word in words]
+
+
+class FuzzyTermSet:
+    """
+    A fixed set of queries (such as the suspicious terms) with a trigram index
+    over their words, for finding which of them one message matches. Matches
+    are the same as FuzzyIndex.search() would give for that message.
+    """
+
+    def __init__(self, queries, max_edits=None):
+        self._queries = {}  # query -> [(word, edits)]
+        self._edits = {}    # query word -> edits tolerated
+        self._needed = {}   # query word -> trigrams a candidate term must share
+        self._grams = {}    # trigram -> query words (with edits) containing it
+        self._lengths = set()  # term lengths within the edits of some query word
+        self._cache = {}       # message term -> query words it is within the edits of
+        for query in queries:
+            pairs = _query_words(query, max_edits)
+            if not pairs:
+                continue
+            self._queries[query] = pairs
+            for word, edits in pairs:
+                if word in self._edits:
+                    continue
+                self._edits[word] = edits
+                if edits:
+                    self._lengths.update(range(len(word) - edits, len(word) + edits + 1))
+                    grams = _grams(word)
+                    self._needed[word] = len(grams) - GRAMS_PER_EDIT * edits
+                    for gram in grams:
+                        self._grams.setdefault(gram, set()).add(word)
+
+    def _near_words(self, term):
+        """The query words (with edits) that `term` is within the edits of."""
+        words = self._cache.get(term)
+        if words is None:
+            shared = {}
+            for gram in _grams(term):
+                for word in self._grams.get(gram, ()):
+                    shared[word] = shared.get(word, 0) + 1
+            words = tuple(word for word, count in shared.items()
+                          if count >= self._needed[word] and within_edits(word, term, self._edits[word]))
+            if len(self._cache) >= TERM_CACHE_SIZE:
+                self._cache.clear()
+            self._cache[term] = words
+        return words
+
+    def _found_words(self, terms):
+        """The query words present in a message's index_terms() set, exactly or within their edits."""
+        found = {term for term in terms if term in self._edits}
+        for term in terms:
+            if len(term) in self._lengths:
+                found.update(self._near_words(term))
+        return found
+
+    def matches(self, text):
+        """The queries that approximately occur in `text`."""
+        if not self._queries:
+            return set()
+        found = self._found_words(index_terms(text))
+        if not found:
+            return set()
+        return {query for query, pairs in self._queries.items()
+                if pairs[0][0] in found or (len(pairs) > 1 and all(word in found for word, _ in pairs[1:]))}
+
+
+class FuzzyIndex:
+    """Term -> Text log IDs with a trigram index over the terms, maintained incrementally."""
+
+    def __init__(self):
+        self._postings = {}
+        self._grams = {}
+
+    def _add_term(self, term, log_id):
+        ids = self._postings.get(term)
+        if ids is None:
+            ids = self._postings[term] = set()
+            for gram in _grams(term):
+                self._grams.setdefault(gram, set()).add(term)
+        ids.add(log_id)
+
+    def _remove_term(self, term, log_id):
+        ids = self._postings.get(term)
+        if ids is None:
+            return
+        ids.discard(log_id)
+        if not ids:
+            del self._postings[term]
+            for gram in _grams(term):
+                terms = self._grams.get(gram)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._grams[gram]
+
+    @staticmethod
+    def _terms(log):
+        if log.get('type') != "Text":
+            return ()
+        return index_terms(log.get('content_or_duration', ''))
+
+    # --- Maintenance (called by the log store) ---
+
+    def rebuild(self, logs):
+        self._postings = {}
+        self._grams = {}
+        for log in logs:
+            for term in self._terms(log):
+                self._add_term(term, log['id'])
+
+    def add(self, log):
+        for term in self._terms(log):
+            self._add_term(term, log['id'])
+
+    def remove(self, log):
+        for term in self._terms(log):
+            self._remove_term(term, log['id'])
+
+    # --- Queries ---
+
+    def matching_terms(self, word, max_edits=0):
+        """Indexed terms within `max_edits` of `word`, found through the trigram index."""
+        if max_edits <= 0:
+            return [word] if word in self._postings else []
+        grams = _grams(word)
+        needed = len(grams) - GRAMS_PER_EDIT * max_edits
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        return [term for term, count in shared.items()
+                if count >= needed and within_edits(word, term, max_edits)]
+
+    def _ids(self, word, max_edits):
+        matched = set()
+        for term in self.matching_terms(word, max_edits):
+            matched |= self._postings[term]
+        return matched
+
+    def search(self, query, max_edits=None):
+        """
+        Returns the set of Text log IDs approximately containing `query`, or None
+        when the query has no words. `max_edits` defaults to default_max_edits().
+        """
+        pairs = _query_words(query, max_edits)
+        if not pairs:
+            return None
+        result = self._ids(*pairs[0])
+        if len(pairs) > 1:
+            postings = sorted((self._ids(word, edits) for word, edits in pairs[1:]), key=len)
+            every = set(postings[0])
+            for ids in postings[1:]:
+                if not every:
+                    break
+                every &= ids
+            result |= every
+        return result
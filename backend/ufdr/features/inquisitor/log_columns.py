@@ -0,0 +1,222 @@
+import numpy as np
+
+from date_index import datetime_key
+
+# --- Columnar Filter Engine ---
+#
+# Mirrors the filterable fields of every log into NumPy columns indexed by a
+# row slot:
+#   type / sender gender   small-int categorical codes
+#   date key               int64 (see date_index.datetime_key), -1 when undated
+#   length                 int64 (call duration or content length)
+#   suspicious, alive      bool
+# A filter is compiled into one boolean mask per predicate and the masks are
+# AND-ed together in a single vectorized pass. Removed rows are only marked
+# dead; the columns are compacted once dead rows dominate. The dict records
+# stay in the log store and are only touched to display the results.
+
+UNDATED = -1
+# Rows whose length cannot be computed never fail the min length filter
+UNKNOWN_LENGTH = np.iinfo(np.int64).max
+INITIAL_CAPACITY = 1024
+
+
+def log_length(log):
+    """Length used by the Min Length/Duration filter: seconds for calls, characters otherwise."""
+    content = str(log.get('content_or_duration', '')).lower()
+    try:
+        return int(content) if log.get('type') in ["Call"] and content.isdigit() else len(content)
+    except ValueError:
+        return UNKNOWN_LENGTH
+
+
+class ResultIds:
+    """Lazy sequence of the log IDs behind a filter result; IDs are resolved only when read."""
+
+    def __init__(self, ids, slots):
+        # `ids` is the slot -> ID list at filter time. Compaction replaces that
+        # list rather than editing it, so the slots here stay valid.
+        self._ids = ids
+        self._slots = slots
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._ids[slot] for slot in self._slots[index].tolist()]
+        return self._ids[int(self._slots[index])]
+
+    def __iter__(self):
+        for slot in self._slots.tolist():
+            yield self._ids[slot]
+
+
+class LogColumns:
+    """NumPy column mirror of the log store used to evaluate filters as vectorized masks."""
+
+    def __init__(self):
+        self._type_codes = {}
+        self._gender_codes = {}
+        self._reset(INITIAL_CAPACITY)
+
+    def _reset(self, capacity):
+        self._size = 0
+        self._dead = 0
+        self._ids = []
+        self._slot_of = {}
+        self._order = None
+        self.type_code = np.zeros(capacity, dtype=np.int16)
+        self.gender_code = np.zeros(capacity, dtype=np.int16)
+        self.date_key = np.zeros(capacity, dtype=np.int64)
+        self.length = np.zeros(capacity, dtype=np.int64)
+        self.suspicious = np.zeros(capacity, dtype=bool)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self):
+        return self._size - self._dead
+
+    @staticmethod
+    def _code(codes, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(codes)
+        return code
+
+    @staticmethod
+    def _date_key(log):
+        key = datetime_key(log.get('date', ''), log.get('time', ''))
+        return UNDATED if key is None else key
+
+    def _grow(self, needed):
+        capacity = len(self.alive)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ('type_code', 'gender_code', 'date_key', 'length', 'suspicious', 'alive'):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            setattr(self, name, grown)
+
+    def _write_row(self, slot, log):
+        self.type_code[slot] = self._code(self._type_codes, log.get('type'))
+        self.gender_code[slot] = self._code(self._gender_codes, log.get('sender_gender'))
+        self.date_key[slot] = self._date_key(log)
+        self.length[slot] = log_length(log)
+        self.suspicious[slot] = bool(log.get('is_suspicious', False))
+        self.alive[slot] = True
+
+    # --- Maintenance (called by the log store) ---
+
+    def rebuild(self, logs):
+        # A sized view (e.g. LogStore's lazily unpacked logs) is walked once as is
+        if not hasattr(logs, '__len__'):
+            logs = list(logs)
+        self._reset(max(INITIAL_CAPACITY, len(logs)))
+        for slot, log in enumerate(logs):
+            self._ids.append(log['id'])
+            self._slot_of[log['id']] = slot
+            self._write_row(slot, log)
+        self._size = len(logs)
+
+    def add(self, log):
+        slot = self._size
+        self._grow(slot + 1)
+        self._ids.append(log['id'])
+        self._slot_of[log['id']] = slot
+        self._write_row(slot, log)
+        self._size += 1
+        self._order = None
+
+    def update(self, old, new):
+        """Rewrites a log's row in place, so an edited log keeps its position among equal dates."""
+        slot = self._slot_of.get(old['id'])
+        if slot is None or new['id'] != old['id']:
+            self.remove(old)
+            self.add(new)
+            return
+        self._write_row(slot, new)
+        self._order = None
+
+    def remove(self, log):
+        slot = self._slot_of.pop(log['id'], None)
+        if slot is None:
+            return
+        self.alive[slot] = False
+        self._dead += 1
+        if self._dead > INITIAL_CAPACITY and self._dead * 2 > self._size:
+            self._compact()
+
+    def _compact(self):
+        """Drops dead rows from every column and renumbers the slots."""
+        keep = np.flatnonzero(self.alive[:self._size])
+        for name in ('type_code', 'gender_code', 'date_key', 'length', 'suspicious', 'alive'):
+            column = getattr(self, name)
+            compacted = np.zeros(max(INITIAL_CAPACITY, len(keep)), dtype=column.dtype)
+            compacted[:len(keep)] = column[keep]
+            setattr(self, name, compacted)
+        self._ids = [self._ids[slot] for slot in keep.tolist()]
+        self._slot_of = {log_id: slot for slot, log_id in enumerate(self._ids)}
+        self._size = len(keep)
+        self._dead = 0
+        self._order = None
+
+    # --- Queries ---
+
+    def _chronological_order(self):
+        """Slots sorted by date key (undated first); cached until rows are added or rewritten."""
+        if self._order is None:
+            self._order = np.argsort(self.date_key[:self._size], kind='stable')
+        return self._order
+
+    def filter(self, log_type="All", gender="All", min_length=-1, suspicious="All",
+               min_key=None, max_key=None, ids=None):
+        """
+        Returns the slots of the live rows matching every filter, in chronological
+        order. `ids` optionally restricts the result to a set of log IDs (e.g.
+        keyword matches from the inverted index).
+        """
+        n = self._size
+        mask = self.alive[:n].copy()
+
+        if log_type != "All":
+            code = self._type_codes.get(log_type)
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+            mask &= self.type_code[:n] == code
+
+        if gender != "All":
+            code = self._gender_codes.get(gender)
+            if code is None:
+                return np.empty(0, dtype=np.intp)
+            mask &= self.gender_code[:n] == code
+
+        if min_key is not None or max_key is not None:
+            dates = self.date_key[:n]
+            mask &= dates != UNDATED
+            if min_key is not None:
+                mask &= dates >= min_key
+            if max_key is not None:
+                mask &= dates <= max_key
+
+        if min_length > 0:
+            mask &= self.length[:n] >= min_length
+
+        if suspicious == "Suspicious":
+            mask &= self.suspicious[:n]
+        elif suspicious == "Normal":
+            mask &= ~self.suspicious[:n]
+
+        if ids is not None:
+            id_mask = np.zeros(n, dtype=bool)
+            id_mask[[self._slot_of[log_id] for log_id in ids if log_id in self._slot_of]] = True
+            mask &= id_mask
+
+        order = self._chronological_order()
+        return order[mask[order]]
+
+    def result_ids(self, slots):
+        """Wraps result slots in a lazy sequence of log IDs."""
+        return ResultIds(self._ids, slots)
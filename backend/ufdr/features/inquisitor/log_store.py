@@ -0,0 +1,448 @@
+import json
+import os
+import threading
+
+from body_file import BodyFile, BodyRef, pack, summarize, unpack
+
+# --- Journaled Communication Log Store ---
+#
+# On disk a case is two JSONL files:
+#   <snapshot>  one log record per line, written only by compaction
+#   <journal>   one operation per line, appended on every change:
+#                 {"op": "add", "log": {...}}
+#                 {"op": "set", "id": "<log id>", "fields": {...}}
+#                 {"op": "del", "id": "<log id>"}          (tombstone)
+#                 {"op": "del", "ids": ["<log id>", ...]}  (batch of tombstones)
+# The in-memory state is the snapshot with the journal replayed on top, so a
+# single add or delete costs one short line instead of a full-file rewrite.
+# compact() folds the journal into a fresh snapshot; it runs on a background
+# thread once the journal grows past `compact_threshold` operations.
+#
+# Secondary indexes register with add_index(). An index implements
+# rebuild(logs), add(log) and remove(log) and is kept in step with every change;
+# it may also implement remove_many(logs) to drop a batch in a single pass, and
+# update(old, new) to replace a log in place instead of removing and re-adding it.
+#
+# Journal lines are queued in memory and written by _write_pending(); given a
+# BackgroundWriter that happens off the calling (UI) thread.
+#
+# Long message bodies are not held in memory: the in-memory records keep a
+# BodyRef into a memory-mapped spill file (body_file.py) and the full text is
+# read back only by get(), iteration and the indexes. The log view renders rows
+# from get_summary(), which never touches the spill file. Compaction also copies
+# the live bodies to a fresh spill file once edits and deletions have left most
+# of the old one unreferenced.
+
+DEFAULT_COMPACT_THRESHOLD = 5000
+# The spill file is rewritten at compaction once it is this many times the size of the live bodies
+BODY_FILE_SLACK = 2
+
+
+def _read_jsonl(path):
+    """Yields the decoded lines of a JSONL file, skipping torn or blank lines."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-append can leave a partial last line behind.
+                continue
+
+
+def _write_jsonl_atomic(path, records):
+    """Writes records to `path` as JSONL via a temp file and an atomic rename."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write('\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class LogStore:
+    """In-memory communication logs backed by a snapshot plus an append-only journal."""
+
+    def __init__(self, snapshot_path, journal_path, legacy_path=None, compact_threshold=DEFAULT_COMPACT_THRESHOLD, writer=None):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.legacy_path = legacy_path
+        self.compact_threshold = compact_threshold
+        self.writer = writer
+
+        self._logs = {}
+        self._bodies = None
+        self._indexes = []
+        self._journal = None
+        self._journal_ops = 0
+        self._pending = []
+        self._unsaved = False # bulk-loaded logs not yet written to a snapshot
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock() # always taken before self._lock
+        self._compact_lock = threading.Lock()
+        self._compact_thread = None
+
+        self.load()
+
+    @property
+    def lock(self):
+        """Held by readers that walk the logs or secondary indexes off the main thread."""
+        return self._lock
+
+    @property
+    def _compacting_path(self):
+        return self.journal_path + '.compacting'
+
+    # --- Loading and Migration ---
+
+    def load(self):
+        """Rebuilds the in-memory state from the snapshot and the journal."""
+        with self._lock:
+            if self._journal:
+                self._journal.close()
+            self._migrate_legacy()
+
+            if self._bodies is not None:
+                self._bodies.close()
+            self._bodies = BodyFile(os.path.dirname(os.path.abspath(self.snapshot_path)))
+            self._logs = {}
+            for log in _read_jsonl(self.snapshot_path):
+                self._logs[log['id']] = self._pack(log)
+
+            # A journal left behind by an interrupted compaction is older than the
+            # live journal, so it is replayed first.
+            self._replay(self._compacting_path)
+            self._journal_ops = self._replay(self.journal_path)
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+
+            for index in self._indexes:
+                index.rebuild(self._unpacked())
+
+        if os.path.exists(self._compacting_path):
+            self.compact()
+        elif self._journal_ops >= self.compact_threshold:
+            self.compact_async()
+
+    def _migrate_legacy(self):
+        """One-time import of a legacy whole-document JSON log file into a snapshot."""
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return
+        if os.path.exists(self.snapshot_path) or os.path.exists(self.journal_path):
+            return
+        try:
+            with open(self.legacy_path, 'r', encoding='utf-8') as f:
+                legacy_logs = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error migrating legacy logs from {self.legacy_path}: {e}")
+            return
+        _write_jsonl_atomic(self.snapshot_path, legacy_logs)
+        print(f"Migrated {len(legacy_logs)} log entries from {self.legacy_path} to {self.snapshot_path}")
+
+    def _replay(self, path):
+        """Applies every operation in a journal file to the in-memory state."""
+        ops = 0
+        for entry in _read_jsonl(path):
+            op = entry.get('op')
+            if op == 'add':
+                log = entry['log']
+                self._logs[log['id']] = self._pack(log, self._logs.get(log['id']))
+            elif op == 'set':
+                log = self._logs.get(entry['id'])
+                if log is not None:
+                    self._logs[entry['id']] = self._pack({**log, **entry['fields']})
+            elif op == 'del':
+                for log_id in entry.get('ids') or [entry['id']]:
+                    self._logs.pop(log_id, None)
+            ops += 1
+        return ops
+
+    # --- Record Bodies ---
+
+    def _pack(self, log, previous=None):
+        """
+        The in-memory form of a log: a long body is spilled and replaced by a
+        BodyRef, or keeps the BodyRef of the record it replaces if unchanged.
+        """
+        return pack(log, self._bodies, previous)
+
+    def _unpack(self, record):
+        """The full log for an in-memory record."""
+        return unpack(record)
+
+    def _unpacked(self):
+        """The current logs, unpacked one at a time as they are walked (caller holds the lock)."""
+        return _UnpackedLogs(self, list(self._logs.values()))
+
+    # --- Secondary Indexes ---
+
+    def add_index(self, index):
+        """Registers a secondary index, building it from the current logs."""
+        with self._lock:
+            index.rebuild(self._unpacked())
+            self._indexes.append(index)
+        return index
+
+    def _index_add(self, log):
+        for index in self._indexes:
+            index.add(log)
+
+    def _index_remove(self, log):
+        for index in self._indexes:
+            index.remove(log)
+
+    def _index_update(self, old, new):
+        for index in self._indexes:
+            if hasattr(index, 'update'):
+                index.update(old, new)
+            else:
+                index.remove(old)
+                index.add(new)
+
+    def _index_remove_many(self, logs):
+        for index in self._indexes:
+            if hasattr(index, 'remove_many'):
+                index.remove_many(logs)
+            else:
+                for log in logs:
+                    index.remove(log)
+
+    # --- Reads ---
+
+    def __len__(self):
+        return len(self._logs)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(self._unpacked())
+
+    def __contains__(self, log_id):
+        return log_id in self._logs
+
+    def get(self, log_id):
+        """Returns the log with the given ID, or None."""
+        record = self._logs.get(log_id)
+        return self._unpack(record) if record is not None else None
+
+    def get_summary(self, log_id):
+        """
+        Returns the log with the given ID for display, or None: `content_or_duration`
+        is cut to a short preview and `content_length` holds its full length.
+        """
+        record = self._logs.get(log_id)
+        return summarize(record) if record is not None else None
+
+    # --- Writes ---
+
+    def _append(self, entry):
+        self._pending.append(json.dumps(entry) + '\n')
+        self._journal_ops += 1
+
+    def _commit(self):
+        """Hands the queued journal lines to the writer thread (or writes them now)."""
+        if self.writer:
+            self.writer.submit(self._write_pending)
+        else:
+            self._write_pending()
+
+    def _write_pending(self):
+        with self._io_lock:
+            with self._lock:
+                lines, self._pending = self._pending, []
+            if lines and self._journal:
+                self._journal.write(''.join(lines))
+                self._journal.flush()
+
+    def add(self, log):
+        """Adds a log entry and journals it."""
+        with self._lock:
+            previous = self._logs.get(log['id'])
+            self._logs[log['id']] = self._pack(log, previous)
+            self._append({"op": "add", "log": log})
+            if previous is not None:
+                self._index_update(self._unpack(previous), log)
+            else:
+                self._index_add(log)
+        self._commit()
+        self._maybe_compact()
+
+    def update_many(self, changes):
+        """
+        Applies {log_id: {field: value}} updates as one journal batch. Records are
+        replaced rather than mutated so a snapshot being written keeps a stable view.
+        """
+        with self._lock:
+            for log_id, fields in changes.items():
+                record = self._logs.get(log_id)
+                if record is None:
+                    continue
+                log = self._unpack(record)
+                updated = {**log, **fields}
+                self._logs[log_id] = self._pack(updated, record)
+                self._index_update(log, updated)
+                self._append({"op": "set", "id": log_id, "fields": fields})
+        self._commit()
+        self._maybe_compact()
+
+    def remove(self, log_id):
+        """Removes a log entry by ID, journaling a tombstone. Returns the removed log or None."""
+        with self._lock:
+            log = self._logs.pop(log_id, None)
+            if log is not None:
+                log = self._unpack(log)
+                self._append({"op": "del", "id": log_id})
+                self._index_remove(log)
+        if log is not None:
+            self._commit()
+            self._maybe_compact()
+        return log
+
+    def remove_many(self, log_ids):
+        """
+        Removes every log in `log_ids` with one batch tombstone and one pass over
+        the indexes; the records are dropped from disk at the next compaction.
+        Returns the removed logs (unknown IDs are skipped).
+        """
+        with self._lock:
+            removed = []
+            for log_id in dict.fromkeys(log_ids):
+                log = self._logs.pop(log_id, None)
+                if log is not None:
+                    removed.append(self._unpack(log))
+            if removed:
+                self._pending.append(json.dumps({"op": "del", "ids": [log['id'] for log in removed]}) + '\n')
+                self._journal_ops += len(removed)
+                self._index_remove_many(removed)
+        if removed:
+            self._commit()
+            self._maybe_compact()
+        return removed
+
+    def add_batches(self, batches):
+        """
+        Bulk-loads an iterable of log batches. Logs are held in memory as they
+        arrive, the secondary indexes are rebuilt once at the end, and the case is
+        persisted by a single snapshot write instead of a journal line per log.
+        Batches loaded before an error are kept. Returns the number of logs added.
+        """
+        count = 0
+        try:
+            for batch in batches:
+                with self._lock:
+                    for log in batch:
+                        self._logs[log['id']] = self._pack(log, self._logs.get(log['id']))
+                    self._unsaved = True
+                count += len(batch)
+        finally:
+            with self._lock:
+                for index in self._indexes:
+                    index.rebuild(self._unpacked())
+            self.compact()
+        return count
+
+    # --- Compaction ---
+
+    def _maybe_compact(self):
+        if self._journal_ops >= self.compact_threshold:
+            self.compact_async()
+
+    def compact_async(self):
+        """Starts a background compaction unless one is already running."""
+        if self._compact_thread and self._compact_thread.is_alive():
+            return
+        self._compact_thread = threading.Thread(target=self.compact, daemon=True)
+        self._compact_thread.start()
+
+    def compact(self):
+        """Folds the journal into a new snapshot."""
+        with self._compact_lock:
+            with self._io_lock, self._lock:
+                if not self._journal_ops and not self._unsaved and not os.path.exists(self._compacting_path):
+                    return
+                # Drain queued lines into the old journal, then rotate it so
+                # writers can keep appending while the snapshot is written
+                # outside the lock.
+                if self._pending:
+                    self._journal.write(''.join(self._pending))
+                    self._pending = []
+                self._journal.close()
+                if os.path.exists(self._compacting_path):
+                    with open(self._compacting_path, 'a', encoding='utf-8') as dst, open(self.journal_path, 'r', encoding='utf-8') as src:
+                        dst.write(src.read())
+                    os.remove(self.journal_path)
+                else:
+                    os.replace(self.journal_path, self._compacting_path)
+                self._journal = open(self.journal_path, 'a', encoding='utf-8')
+                self._journal_ops = 0
+                self._unsaved = False
+                records = list(self._logs.values())
+
+            try:
+                _write_jsonl_atomic(self.snapshot_path, (self._unpack(record) for record in records))
+                os.remove(self._compacting_path)
+            except (IOError, OSError) as e:
+                # The rotated journal is kept and replayed on the next load.
+                print(f"Error compacting logs into {self.snapshot_path}: {e}")
+                with self._lock:
+                    self._unsaved = True
+                return
+            self._compact_bodies(records)
+
+    def _compact_bodies(self, records):
+        """
+        Copies the bodies still referenced by `records` to a fresh spill file once
+        the current one is mostly dead space, then points the records at the copies.
+        """
+        live = [record['content_or_duration'] for record in records if isinstance(record.get('content_or_duration'), BodyRef)]
+        old_bodies = self._bodies
+        if old_bodies is None or len(old_bodies) <= BODY_FILE_SLACK * sum(ref.size for ref in live):
+            return
+        # Copied outside the lock; readers keep resolving the old refs meanwhile
+        bodies = BodyFile(os.path.dirname(os.path.abspath(self.snapshot_path)))
+        moved = {ref: bodies.copy(ref) for ref in live if ref.bodies is old_bodies}
+        with self._lock:
+            if self._bodies is not old_bodies:
+                bodies.close()
+                return
+            for log_id, record in self._logs.items():
+                ref = record.get('content_or_duration')
+                if isinstance(ref, BodyRef) and ref.bodies is old_bodies:
+                    # Records are replaced rather than mutated, as in update_many()
+                    self._logs[log_id] = {**record, 'content_or_duration': moved.get(ref) or bodies.copy(ref)}
+            self._bodies = bodies
+        # The old file is closed once the last reader holding one of its refs drops it
+
+    def close(self):
+        """Flushes queued writes, waits for a running compaction and closes the journal."""
+        if self.writer:
+            self.writer.flush()
+        self._write_pending()
+        if self._compact_thread:
+            self._compact_thread.join()
+        with self._io_lock, self._lock:
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+            if self._bodies is not None:
+                self._bodies.close()
+                self._bodies = None
+
+
+class _UnpackedLogs:
+    """A sized, lazily unpacked view over a list of in-memory log records."""
+
+    def __init__(self, store, records):
+        self._store = store
+        self._records = records
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        for record in self._records:
+            yield self._store._unpack(record)
@@ -0,0 +1,382 @@
+import argparse
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from activity_index import DIMENSIONS, GRANULARITIES, bucket_label
+from date_index import filter_date_key
+from storage import open_storage
+
+# --- Headless Log Query Engine ---
+#
+# The log view's search and filter semantics, without Tk:
+#   LogQuery     one search (keyword plus type / date range / sender gender /
+#                minimum length or duration / suspicious filters), validated on
+#                construction and convertible to and from a plain dict
+#   QueryEngine  runs a LogQuery against a storage backend (storage.py) and
+#                streams the matching records in chronological order, and
+#                answers per hour/day/week activity counts from the backend's
+#                aggregates (activity_index.py) and contact queries from its
+#                contact graph (contact_graph.py)
+# LogAnalyzerApp builds a LogQuery from its filter widgets; the command line
+# below runs single queries or a file of saved queries and writes JSONL or CSV.
+
+LOG_TYPES = ["All", "Text", "Audio", "Video", "Call"]
+GENDERS = ["All", "M", "F", "O"]
+SUSPICIOUS_FILTERS = ["All", "Suspicious", "Normal"]
+
+# Output columns, in the order records are stored
+RECORD_FIELDS = ['id', 'type', 'sender_name', 'receiver_name', 'sender_gender', 'receiver_gender',
+                 'date', 'time', 'content_or_duration', 'is_suspicious']
+OUTPUT_FORMATS = ('jsonl', 'csv')
+
+# Records streamed between cancellation checks
+FETCH_PAGE_SIZE = 1000
+# Rows listed by the contact queries unless --limit is given
+DEFAULT_CONTACT_LIMIT = 10
+
+
+class LogQuery:
+    """A log view search. Raises ValueError for an unknown option or malformed bound."""
+
+    FIELDS = ('name', 'keyword', 'log_type', 'gender', 'date_from', 'date_to', 'min_length', 'suspicious', 'fuzzy')
+
+    def __init__(self, keyword='', log_type="All", gender="All", date_from=None, date_to=None,
+                 min_length=-1, suspicious="All", name=None, fuzzy=False):
+        if log_type not in LOG_TYPES:
+            raise ValueError(f"Unknown log type '{log_type}' (expected one of {', '.join(LOG_TYPES)})")
+        if gender not in GENDERS:
+            raise ValueError(f"Unknown gender '{gender}' (expected one of {', '.join(GENDERS)})")
+        if suspicious not in SUSPICIOUS_FILTERS:
+            raise ValueError(f"Unknown suspicious filter '{suspicious}' (expected one of {', '.join(SUSPICIOUS_FILTERS)})")
+
+        self.name = name
+        self.keyword = (keyword or '').strip().lower()
+        # Fuzzy keywords also match obfuscated spellings in Text content (fuzzy_index.py)
+        self.fuzzy = bool(fuzzy)
+        self.log_type = log_type
+        self.gender = gender
+        self.suspicious = suspicious
+        self.min_length = int(min_length) if min_length not in (None, '') else -1
+
+        # Date bounds are 'YYYY-MM-DD' and inclusive of the whole day
+        self.date_from = date_from or None
+        self.date_to = date_to or None
+        self.min_key = filter_date_key(self.date_from) if self.date_from else None
+        self.max_key = filter_date_key(self.date_to, end_of_day=True) if self.date_to else None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Builds a query from a saved-query dict (unknown keys are rejected)."""
+        unknown = set(data) - set(cls.FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown query field(s): {', '.join(sorted(unknown))}")
+        return cls(**data)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def filters(self):
+        """Keyword arguments for a storage backend's query_log_ids()."""
+        return {
+            'keyword': self.keyword, 'log_type': self.log_type, 'gender': self.gender,
+            'min_length': self.min_length, 'suspicious': self.suspicious,
+            'min_key': self.min_key, 'max_key': self.max_key, 'fuzzy': self.fuzzy,
+        }
+
+    def __repr__(self):
+        options = ', '.join(f"{field}={value!r}" for field, value in self.to_dict().items() if value not in (None, '', -1, "All", False))
+        return f"LogQuery({options})"
+
+
+class QueryEngine:
+    """Runs LogQuery objects against a storage backend."""
+
+    def __init__(self, storage, page_size=FETCH_PAGE_SIZE):
+        self.storage = storage
+        self.page_size = page_size
+
+    def ids(self, query, token=None):
+        """Matching log IDs in chronological order, as a lazily paged sequence."""
+        return self.storage.query_log_ids(token=token, **query.filters())
+
+    def count(self, query):
+        return len(self.ids(query))
+
+    def run(self, query, token=None, limit=None):
+        """Yields the matching records in chronological order."""
+        return self.records(self.ids(query, token=token), token=token, limit=limit)
+
+    def records(self, ids, token=None, limit=None):
+        """Yields the records for a sequence of log IDs in one pass over it."""
+        # A SQLite result streams whole rows from its own cursor; any other
+        # sequence is read once, in order, with a lookup per ID. Neither re-runs
+        # the query per page.
+        iter_logs = getattr(ids, 'iter_logs', None)
+        logs = iter_logs() if iter_logs else map(self.storage.logs.get, ids)
+        if limit is not None:
+            logs = islice(logs, limit)
+        for count, log in enumerate(logs):
+            if token and count % self.page_size == 0:
+                token.check()
+            # A log deleted after the query ran is skipped
+            if log is not None:
+                yield log
+
+    def histogram(self, granularity, date_from=None, date_to=None, dimension=None, value=None):
+        """
+        Message counts per bucket between two 'YYYY-MM-DD' days (inclusive), as
+        (label, total, suspicious) oldest first; `dimension`/`value` restrict the
+        counts to one type, sender or receiver.
+        """
+        min_key, max_key = _date_keys(date_from, date_to)
+        rows = self.storage.activity_histogram(granularity, min_key=min_key, max_key=max_key,
+                                               dimension=dimension, value=value)
+        return [(bucket_label(granularity, bucket), total, suspicious) for bucket, total, suspicious in rows]
+
+    def breakdown(self, dimension, date_from=None, date_to=None):
+        """(value, total, suspicious) per type, sender or receiver between two days, busiest first."""
+        min_key, max_key = _date_keys(date_from, date_to)
+        return self.storage.activity_breakdown(dimension, min_key=min_key, max_key=max_key)
+
+    def top_talkers(self, limit=DEFAULT_CONTACT_LIMIT):
+        """[(person, logs sent or received)], busiest first."""
+        with self.storage.logs.lock:
+            return self.storage.contacts.top_talkers(limit)
+
+    def top_contacts(self, person, limit=DEFAULT_CONTACT_LIMIT):
+        """[(other person, total, suspicious)] for everyone `person` communicated with, busiest first."""
+        with self.storage.logs.lock:
+            return self.storage.contacts.top_contacts(person, limit)
+
+    def shortest_path(self, source, target):
+        """Fewest-hops chain of people from `source` to `target`, or None if unconnected."""
+        with self.storage.logs.lock:
+            return self.storage.contacts.shortest_path(source, target)
+
+    def neighborhood(self, person, hops=1):
+        """{other person: distance} for everyone within `hops` links of `person`."""
+        with self.storage.logs.lock:
+            return self.storage.contacts.neighborhood(person, hops)
+
+
+def _date_keys(date_from, date_to):
+    """Key bounds for an inclusive 'YYYY-MM-DD' day range. Raises ValueError on a malformed day."""
+    return (filter_date_key(date_from) if date_from else None,
+            filter_date_key(date_to, end_of_day=True) if date_to else None)
+
+
+# --- Result Writers ---
+
+def write_jsonl(records, f):
+    """Writes records one JSON object per line. Returns the number written."""
+    count = 0
+    for record in records:
+        f.write(json.dumps(record))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def write_csv(records, f):
+    """Writes records as CSV with a header row. Returns the number written."""
+    writer = csv.DictWriter(f, fieldnames=RECORD_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+WRITERS = {'jsonl': write_jsonl, 'csv': write_csv}
+
+
+def open_output(path, compress=None):
+    """Opens a result file for writing text, gzip-compressed if `compress` (default: `path` ends in '.gz')."""
+    if compress is None:
+        compress = path.lower().endswith('.gz')
+    if compress:
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def write_results(records, path, output_format):
+    """Streams records to `path` ('-' for stdout). Returns the number written."""
+    write = WRITERS[output_format]
+    if path == '-':
+        return write(records, sys.stdout)
+    with open_output(path) as f:
+        return write(records, f)
+
+
+def load_saved_queries(path):
+    """Reads a JSONL file of saved queries (one LogQuery dict per line)."""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+                data.setdefault('name', f"query-{line_number}")
+                queries.append(LogQuery.from_dict(data))
+            except (json.JSONDecodeError, TypeError, ValueError) as e:
+                raise ValueError(f"{path}, line {line_number}: {e}")
+    return queries
+
+
+def run_saved_queries(engine, queries, output_dir, output_format, jobs=1, limit=None, compress=False):
+    """
+    Runs saved queries on `jobs` threads, writing each result set to
+    <output_dir>/<name>.<format> (.gz if `compress`). Yields (query, count, seconds)
+    in query order.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    def run_one(query):
+        started = time.monotonic()
+        path = os.path.join(output_dir, f"{query.name}.{output_format}" + (".gz" if compress else ""))
+        count = write_results(engine.run(query, limit=limit), path, output_format)
+        return query, count, time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        for result in executor.map(run_one, queries):
+            yield result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run communication log queries without the GUI.")
+    parser.add_argument('--data-dir', default='.', help="directory holding the case data (default: current directory)")
+    parser.add_argument('--storage', choices=['journal', 'sqlite'], help="storage backend (default: INQUISITOR_STORAGE or journal)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='jsonl', help="output format")
+    parser.add_argument('--output', default='-', help="output file for a single query, gzip-compressed if it ends in .gz (default: stdout)")
+    parser.add_argument('--limit', type=int, help="maximum number of records per query")
+    parser.add_argument('--count', action='store_true', help="print the number of matches instead of the records")
+
+    single = parser.add_argument_group("single query")
+    single.add_argument('--keyword', default='')
+    single.add_argument('--fuzzy', action='store_true', help="match the keyword approximately (leetspeak, spacing, typos) in Text content")
+    single.add_argument('--type', dest='log_type', default="All", choices=LOG_TYPES)
+    single.add_argument('--gender', default="All", choices=GENDERS, help="sender gender")
+    single.add_argument('--from', dest='date_from', help="first day, YYYY-MM-DD")
+    single.add_argument('--to', dest='date_to', help="last day, YYYY-MM-DD")
+    single.add_argument('--min-length', type=int, default=-1, help="minimum text length or call duration")
+    single.add_argument('--suspicious', default="All", choices=SUSPICIOUS_FILTERS)
+
+    activity = parser.add_argument_group("activity counts (use --from/--to and --type)")
+    activity.add_argument('--histogram', choices=list(GRANULARITIES), help="print message counts per hour, day or week")
+    activity.add_argument('--breakdown', choices=list(DIMENSIONS), help="print message counts per type, sender or receiver")
+    activity.add_argument('--sender', help="count only messages from this sender (--histogram)")
+    activity.add_argument('--receiver', help="count only messages to this receiver (--histogram)")
+
+    contacts = parser.add_argument_group("contacts (use --limit for the number of rows)")
+    contacts.add_argument('--top-talkers', action='store_true', help="print the people with the most logs")
+    contacts.add_argument('--contacts', metavar='NAME', help="print who NAME communicated with most")
+    contacts.add_argument('--path', nargs=2, metavar=('FROM', 'TO'), help="print the shortest chain of contacts between two people")
+    contacts.add_argument('--neighborhood', metavar='NAME', help="print everyone within --hops links of NAME")
+    contacts.add_argument('--hops', type=int, default=1, help="neighborhood radius (default: 1)")
+
+    saved = parser.add_argument_group("saved queries")
+    saved.add_argument('--queries', help="JSONL file of saved queries to run")
+    saved.add_argument('--output-dir', default='query_results', help="directory for saved query results")
+    saved.add_argument('--gzip', action='store_true', help="gzip-compress saved query results")
+    saved.add_argument('--jobs', type=int, default=os.cpu_count() or 1, help="queries run in parallel")
+
+    args = parser.parse_args(argv)
+
+    # Paths given on the command line are relative to where it was run, not the data directory
+    queries_path = os.path.abspath(args.queries) if args.queries else None
+    output = os.path.abspath(args.output) if args.output != '-' else '-'
+    output_dir = os.path.abspath(args.output_dir)
+
+    os.chdir(args.data_dir)
+    storage = open_storage(backend=args.storage)
+    engine = QueryEngine(storage)
+    try:
+        if args.histogram or args.breakdown:
+            return _print_activity(engine, args)
+        if args.top_talkers or args.contacts or args.path or args.neighborhood:
+            return _print_contacts(engine, args)
+
+        if queries_path:
+            queries = load_saved_queries(queries_path)
+            if args.count:
+                for query in queries:
+                    print(f"{query.name}\t{engine.count(query)}")
+                return 0
+            for query, count, seconds in run_saved_queries(engine, queries, output_dir, args.format,
+                                                           jobs=args.jobs, limit=args.limit, compress=args.gzip):
+                print(f"{query.name}: {count} records in {seconds:.2f}s", file=sys.stderr)
+            return 0
+
+        query = LogQuery(
+            keyword=args.keyword, log_type=args.log_type, gender=args.gender, date_from=args.date_from,
+            date_to=args.date_to, min_length=args.min_length, suspicious=args.suspicious, fuzzy=args.fuzzy
+        )
+        if args.count:
+            print(engine.count(query))
+        else:
+            write_results(engine.run(query, limit=args.limit), output, args.format)
+        return 0
+    except (IOError, OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        storage.close()
+
+
+def _print_activity(engine, args):
+    """Prints tab-separated activity counts for --histogram or --breakdown."""
+    if args.keyword or args.gender != "All" or args.min_length > 0 or args.suspicious != "All":
+        raise ValueError("activity counts only filter on --from/--to and one of --type, --sender or --receiver")
+    if args.histogram:
+        dimensions = [(name, value) for name, value in (('type', None if args.log_type == "All" else args.log_type),
+                                                        ('sender', args.sender), ('receiver', args.receiver))
+                      if value is not None]
+        if len(dimensions) > 1:
+            raise ValueError("--histogram filters on at most one of --type, --sender or --receiver")
+        dimension, value = dimensions[0] if dimensions else (None, None)
+        rows = engine.histogram(args.histogram, args.date_from, args.date_to, dimension=dimension, value=value)
+        print("bucket\ttotal\tsuspicious")
+    else:
+        rows = engine.breakdown(args.breakdown, args.date_from, args.date_to)
+        print(f"{args.breakdown}\ttotal\tsuspicious")
+    for label, total, suspicious in rows:
+        print(f"{label}\t{total}\t{suspicious}")
+    return 0
+
+
+def _print_contacts(engine, args):
+    """Prints the answer to one contact graph query."""
+    limit = args.limit or DEFAULT_CONTACT_LIMIT
+    if args.path:
+        path = engine.shortest_path(*args.path)
+        if path is None:
+            print(f"No chain of contacts links {args.path[0]} and {args.path[1]}", file=sys.stderr)
+            return 1
+        print(" -> ".join(path))
+    elif args.neighborhood:
+        distances = engine.neighborhood(args.neighborhood, hops=args.hops)
+        print("person\thops")
+        for person, hops in sorted(distances.items(), key=lambda item: (item[1], item[0])):
+            print(f"{person}\t{hops}")
+    elif args.contacts:
+        print("contact\ttotal\tsuspicious")
+        for person, total, suspicious in engine.top_contacts(args.contacts, limit):
+            print(f"{person}\t{total}\t{suspicious}")
+    else:
+        print("person\ttotal")
+        for person, total in engine.top_talkers(limit):
+            print(f"{person}\t{total}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
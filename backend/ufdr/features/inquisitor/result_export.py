@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+
+from query_engine import WRITERS, LogQuery, open_output
+
+# --- Streaming Result Export ---
+#
+# Writes a result set (a LogQuery, or the ID sequence behind the current log
+# view) to CSV or JSONL, gzip-compressed when the file name ends in '.gz'.
+# Records are streamed in one pass by QueryEngine.records() and written as
+# they arrive, so memory stays flat however many rows match. Rows go to
+# '<path>.part', which replaces `path` only once the export has finished; a
+# cancelled or failed export leaves no partial file behind.
+
+PROGRESS_INTERVAL = 1.0
+
+EXPORT_FILE_TYPES = [
+    ("CSV", "*.csv"),
+    ("JSON Lines", "*.jsonl"),
+    ("Compressed CSV", "*.csv.gz"),
+    ("Compressed JSON Lines", "*.jsonl.gz"),
+]
+
+
+def format_for_path(path):
+    """'csv' or 'jsonl', from a file name such as results.csv or results.jsonl.gz."""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    extension = os.path.splitext(name)[1]
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    raise ValueError(f"Unsupported export file type: {extension or path} (expected .csv or .jsonl, optionally .gz)")
+
+
+class ExportCancelled(Exception):
+    """Raised inside the record stream once an export is cancelled."""
+
+
+class ExportStats:
+    """Running totals for one export, handed to the progress callback."""
+
+    def __init__(self, path, total):
+        self.path = path
+        self.total = total
+        self.written = 0
+        self.cancelled = False
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rate(self):
+        """Written records per second."""
+        return self.written / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def percent(self):
+        return 100.0 * self.written / self.total if self.total else 100.0
+
+    def summary(self):
+        if self.cancelled:
+            return f"Export to {os.path.basename(self.path)} cancelled after {self.written} of {self.total} records"
+        return (f"Exported {self.written} records to {os.path.basename(self.path)} in {self.elapsed:.1f}s "
+                f"[{self.rate:,.0f} records/s]")
+
+
+class ResultExporter:
+    """Streams a query's results to a file, reporting progress along the way."""
+
+    def __init__(self, engine, progress=None, progress_interval=PROGRESS_INTERVAL):
+        self.engine = engine
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """Stops the export after the current record; nothing is left at the target path."""
+        self._cancel.set()
+
+    def run(self, results, path, output_format=None):
+        """
+        Exports `results` (a LogQuery or a sequence of log IDs) to `path` and
+        returns its ExportStats. The format defaults to the one in the file name.
+        """
+        write = WRITERS[output_format or format_for_path(path)]
+        ids = self.engine.ids(results) if isinstance(results, LogQuery) else results
+        stats = ExportStats(path, len(ids))
+        part_path = path + '.part'
+        try:
+            with open_output(part_path, compress=path.lower().endswith('.gz')) as f:
+                write(self._tracked(self.engine.records(ids), stats), f)
+            os.replace(part_path, path)
+        except ExportCancelled:
+            stats.cancelled = True
+            os.remove(part_path)
+        except BaseException:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            raise
+        stats.finished = time.monotonic()
+        if self.progress:
+            self.progress(stats)
+        return stats
+
+    def _tracked(self, records, stats):
+        last_report = time.monotonic()
+        for record in records:
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            yield record
+            stats.written += 1
+            if self.progress and time.monotonic() - last_report >= self.progress_interval:
+                last_report = time.monotonic()
+                self.progress(stats)
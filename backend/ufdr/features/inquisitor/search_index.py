@@ -0,0 +1,93 @@
+import re
+from bisect import bisect_left, insort
+
+# --- Keyword Inverted Index ---
+#
+# Maps every lower-cased word token found in the searchable fields of a log to
+# the set of log IDs containing it. A keyword query is tokenized the same way
+# and answered by intersecting posting lists, smallest first. Query tokens are
+# matched as prefixes by default ("burn" finds "burner"), resolved through a
+# sorted vocabulary so no log text is scanned at query time.
+
+TOKEN_RE = re.compile(r'\w+')
+SEARCH_FIELDS = ('content_or_duration', 'sender_name', 'receiver_name')
+
+
+def tokenize(text):
+    """Splits text into lower-cased word tokens."""
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class InvertedIndex:
+    """Token -> log ID postings over the searchable log fields, maintained incrementally."""
+
+    def __init__(self, fields=SEARCH_FIELDS):
+        self.fields = fields
+        self._postings = {}
+        self._vocab = []
+
+    def _log_tokens(self, log):
+        tokens = set()
+        for field in self.fields:
+            tokens.update(tokenize(log.get(field, '')))
+        return tokens
+
+    # --- Maintenance (called by the log store) ---
+
+    def rebuild(self, logs):
+        self._postings = {}
+        for log in logs:
+            log_id = log['id']
+            for token in self._log_tokens(log):
+                self._postings.setdefault(token, set()).add(log_id)
+        self._vocab = sorted(self._postings)
+
+    def add(self, log):
+        log_id = log['id']
+        for token in self._log_tokens(log):
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                insort(self._vocab, token)
+            ids.add(log_id)
+
+    def remove(self, log):
+        log_id = log['id']
+        for token in self._log_tokens(log):
+            ids = self._postings.get(token)
+            if ids is None:
+                continue
+            ids.discard(log_id)
+            if not ids:
+                del self._postings[token]
+                del self._vocab[bisect_left(self._vocab, token)]
+
+    # --- Queries ---
+
+    def _lookup(self, token, prefix):
+        if not prefix:
+            return self._postings.get(token, set())
+        start = bisect_left(self._vocab, token)
+        end = bisect_left(self._vocab, token + '\U0010ffff', start)
+        if end - start == 1:
+            return self._postings[self._vocab[start]]
+        matched = set()
+        for word in self._vocab[start:end]:
+            matched |= self._postings[word]
+        return matched
+
+    def search(self, query, prefix=True):
+        """
+        Returns the set of log IDs containing every token of `query`, or None when
+        the query has no tokens (i.e. it does not filter anything).
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return None
+        postings = sorted((self._lookup(token, prefix) for token in tokens), key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
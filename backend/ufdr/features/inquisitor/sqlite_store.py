@@ -0,0 +1,743 @@
+import json
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from itertools import islice
+
+from activity_index import GRANULARITIES, bucket_range, check_query
+from body_file import PREVIEW_CHARS
+from contact_graph import ContactGraph
+from date_index import datetime_key
+from fuzzy_index import FuzzyIndex
+from log_columns import log_length
+from search_index import tokenize
+
+# --- SQLite Storage Backend ---
+#
+# Logs, users and access history live in one SQLite database in WAL mode, so
+# readers (the query worker) never block the writer and nothing is held in RAM
+# beyond the rows on screen. Each add or delete is a single-row transaction.
+# Filters are pushed down as SQL against (column, ts) indexes on type, sender
+# gender and suspicion; each ends in the rowid, so it also returns the matches
+# in display order (ts, rowid) without a sort. Keyword search uses an FTS5
+# index with prefix queries when SQLite provides it. Per-hour activity counts
+# live in the `activity` table, kept up to date by triggers, so the activity
+# histogram and breakdown never scan the logs.
+#
+# Each thread gets its own connection (sqlite3 connections are not shared
+# across threads). In-memory indexes that cannot be expressed in SQL (the
+# contact graph, the fuzzy keyword index) are registered with add_index() and
+# kept in step with the writes made through this process. They are the one
+# exception to the flat memory use: each is built on first use (a contact
+# query, a fuzzy search or a fuzzy rescan) and then grows with the case. Run
+# `python sqlite_store.py <db> [<data dir>]` to migrate an existing file-based
+# case into a database.
+
+LOG_FIELDS = ('id', 'type', 'sender_name', 'receiver_name', 'sender_gender', 'receiver_gender',
+              'date', 'time', 'content_or_duration', 'is_suspicious')
+MIGRATION_BATCH_SIZE = 10000
+# Number of SQLite VM steps between cancellation checks during a query
+PROGRESS_STEPS = 10000
+# IDs bound per statement in batch operations (older SQLite builds allow 999 parameters)
+ID_CHUNK_SIZE = 500
+SECONDS_PER_HOUR = 3600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    type TEXT,
+    sender_name TEXT,
+    receiver_name TEXT,
+    sender_gender TEXT,
+    receiver_gender TEXT,
+    date TEXT,
+    time TEXT,
+    content_or_duration TEXT,
+    is_suspicious INTEGER NOT NULL DEFAULT 0,
+    ts INTEGER,
+    length INTEGER,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs(ts);
+CREATE INDEX IF NOT EXISTS idx_logs_type_ts ON logs(type, ts);
+CREATE INDEX IF NOT EXISTS idx_logs_gender_ts ON logs(sender_gender, ts);
+CREATE INDEX IF NOT EXISTS idx_logs_suspicious_ts ON logs(is_suspicious, ts);
+-- Served the activity queries before the activity table
+DROP INDEX IF EXISTS idx_logs_sender;
+DROP INDEX IF EXISTS idx_logs_receiver;
+
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS access_history (
+    seq INTEGER PRIMARY KEY,
+    timestamp TEXT,
+    user TEXT,
+    action TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_access_timestamp ON access_history(timestamp);
+CREATE INDEX IF NOT EXISTS idx_access_user ON access_history(user, seq);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+    content_or_duration, sender_name, receiver_name, content='logs', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS logs_fts_ai AFTER INSERT ON logs BEGIN
+    INSERT INTO logs_fts(rowid, content_or_duration, sender_name, receiver_name)
+    VALUES (new.rowid, new.content_or_duration, new.sender_name, new.receiver_name);
+END;
+CREATE TRIGGER IF NOT EXISTS logs_fts_ad AFTER DELETE ON logs BEGIN
+    INSERT INTO logs_fts(logs_fts, rowid, content_or_duration, sender_name, receiver_name)
+    VALUES ('delete', old.rowid, old.content_or_duration, old.sender_name, old.receiver_name);
+END;
+CREATE TRIGGER IF NOT EXISTS logs_fts_au AFTER UPDATE ON logs BEGIN
+    INSERT INTO logs_fts(logs_fts, rowid, content_or_duration, sender_name, receiver_name)
+    VALUES ('delete', old.rowid, old.content_or_duration, old.sender_name, old.receiver_name);
+    INSERT INTO logs_fts(rowid, content_or_duration, sender_name, receiver_name)
+    VALUES (new.rowid, new.content_or_duration, new.sender_name, new.receiver_name);
+END;
+"""
+
+# One row per (hour, dimension, value) holding the total and suspicious counts
+# of the dated logs in that hour, for dimension 'type', 'sender' and 'receiver'
+# (every log is counted once per dimension, so the per-type rows of an hour sum
+# to all of its logs). Values are stored JSON-quoted, so a missing name counts
+# as 'null' instead of disappearing into SQL's NULL semantics. Day and week
+# buckets are sums of whole hours. Rows that drop to zero are kept.
+ACTIVITY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity (
+    hour INTEGER NOT NULL,
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    suspicious INTEGER NOT NULL,
+    PRIMARY KEY (hour, dimension, value)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS logs_activity_ai AFTER INSERT ON logs WHEN new.ts IS NOT NULL BEGIN
+    INSERT INTO activity (hour, dimension, value, total, suspicious)
+    VALUES (new.ts / 3600, 'type', json_quote(new.type), 1, new.is_suspicious),
+           (new.ts / 3600, 'sender', json_quote(new.sender_name), 1, new.is_suspicious),
+           (new.ts / 3600, 'receiver', json_quote(new.receiver_name), 1, new.is_suspicious)
+    ON CONFLICT DO UPDATE SET total = total + 1, suspicious = suspicious + excluded.suspicious;
+END;
+CREATE TRIGGER IF NOT EXISTS logs_activity_ad AFTER DELETE ON logs WHEN old.ts IS NOT NULL BEGIN
+    UPDATE activity SET total = total - 1, suspicious = suspicious - old.is_suspicious
+    WHERE hour = old.ts / 3600 AND (dimension, value) IN (VALUES ('type', json_quote(old.type)),
+        ('sender', json_quote(old.sender_name)), ('receiver', json_quote(old.receiver_name)));
+END;
+CREATE TRIGGER IF NOT EXISTS logs_activity_au_old
+AFTER UPDATE OF ts, type, sender_name, receiver_name, is_suspicious ON logs WHEN old.ts IS NOT NULL BEGIN
+    UPDATE activity SET total = total - 1, suspicious = suspicious - old.is_suspicious
+    WHERE hour = old.ts / 3600 AND (dimension, value) IN (VALUES ('type', json_quote(old.type)),
+        ('sender', json_quote(old.sender_name)), ('receiver', json_quote(old.receiver_name)));
+END;
+CREATE TRIGGER IF NOT EXISTS logs_activity_au_new
+AFTER UPDATE OF ts, type, sender_name, receiver_name, is_suspicious ON logs WHEN new.ts IS NOT NULL BEGIN
+    INSERT INTO activity (hour, dimension, value, total, suspicious)
+    VALUES (new.ts / 3600, 'type', json_quote(new.type), 1, new.is_suspicious),
+           (new.ts / 3600, 'sender', json_quote(new.sender_name), 1, new.is_suspicious),
+           (new.ts / 3600, 'receiver', json_quote(new.receiver_name), 1, new.is_suspicious)
+    ON CONFLICT DO UPDATE SET total = total + 1, suspicious = suspicious + excluded.suspicious;
+END;
+"""
+
+# Counts for the logs already in a database created before the activity table
+ACTIVITY_BACKFILL = """
+INSERT INTO activity (hour, dimension, value, total, suspicious)
+SELECT ts / 3600 AS hour, 'type', json_quote(type), COUNT(*), SUM(is_suspicious) FROM logs
+WHERE ts IS NOT NULL GROUP BY hour, 3;
+INSERT INTO activity (hour, dimension, value, total, suspicious)
+SELECT ts / 3600 AS hour, 'sender', json_quote(sender_name), COUNT(*), SUM(is_suspicious) FROM logs
+WHERE ts IS NOT NULL GROUP BY hour, 3;
+INSERT INTO activity (hour, dimension, value, total, suspicious)
+SELECT ts / 3600 AS hour, 'receiver', json_quote(receiver_name), COUNT(*), SUM(is_suspicious) FROM logs
+WHERE ts IS NOT NULL GROUP BY hour, 3;
+"""
+
+
+class _Connections:
+    """Hands out one WAL-mode connection per thread for a database file."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._all = []
+        self._lock = threading.Lock()
+
+    def get(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+        self._local = threading.local()
+
+
+def _log_row(log):
+    """Flattens a log dict into a `logs` table row."""
+    extra = {key: value for key, value in log.items() if key not in LOG_FIELDS}
+    length = log_length(log)
+    return (
+        log['id'], log.get('type'), log.get('sender_name'), log.get('receiver_name'),
+        log.get('sender_gender'), log.get('receiver_gender'), log.get('date'), log.get('time'),
+        log.get('content_or_duration'), 1 if log.get('is_suspicious') else 0,
+        datetime_key(log.get('date', ''), log.get('time', '')),
+        length, json.dumps(extra) if extra else None
+    )
+
+
+def _row_log(row):
+    """Rebuilds a log dict from a `logs` table row."""
+    log = {field: row[field] for field in LOG_FIELDS}
+    log['is_suspicious'] = bool(log['is_suspicious'])
+    if row['extra']:
+        log.update(json.loads(row['extra']))
+    return log
+
+
+_LOG_COLUMNS = ('type', 'sender_name', 'receiver_name', 'sender_gender', 'receiver_gender', 'date', 'time',
+                'content_or_duration', 'is_suspicious', 'ts', 'length', 'extra')
+# An upsert, not INSERT OR REPLACE: re-adding an ID updates its row in place, so the
+# rowid is kept and the logs_fts_au trigger replaces its FTS entry (the implicit
+# delete of a REPLACE fires no trigger and would leave a stale FTS row behind)
+_INSERT_LOG = (
+    f"INSERT INTO logs (id, {', '.join(_LOG_COLUMNS)}) VALUES ({', '.join('?' * (len(_LOG_COLUMNS) + 1))}) "
+    f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in _LOG_COLUMNS)}"
+)
+_UPDATE_LOG = f"UPDATE logs SET {', '.join(f'{column} = ?' for column in _LOG_COLUMNS)} WHERE id = ?"
+_SELECT_LOG = (
+    "SELECT id, type, sender_name, receiver_name, sender_gender, receiver_gender, date, time, "
+    "content_or_duration, is_suspicious, extra FROM logs"
+)
+# Display rows carry a preview of the body plus its full length, not the body itself
+_SELECT_SUMMARY = (
+    "SELECT id, type, sender_name, receiver_name, sender_gender, receiver_gender, date, time, "
+    f"substr(content_or_duration, 1, {PREVIEW_CHARS}) AS content_or_duration, "
+    "length(content_or_duration) AS content_length, is_suspicious, extra FROM logs"
+)
+# Undated logs first (NULL sorts first), then chronological; ties in insertion
+# order (same as LogColumns). Every (column, ts) index ends in the rowid, so
+# this order is read straight off the index used for the filter
+_ORDER_BY = " ORDER BY ts, rowid"
+
+
+class SQLiteLogStore:
+    """Communication log store backed by the `logs` table."""
+
+    def __init__(self, connections, has_fts):
+        self._connections = connections
+        self.has_fts = has_fts
+        self.lock = threading.RLock()
+        self._indexes = []
+
+    def _conn(self):
+        return self._connections.get()
+
+    # --- In-Memory Indexes ---
+
+    def add_index(self, index):
+        """Registers an in-memory index, building it from one pass over the table."""
+        with self.lock:
+            index.rebuild(self)
+            self._indexes.append(index)
+        return index
+
+    def _index_add(self, logs):
+        for log in logs:
+            for index in self._indexes:
+                index.add(log)
+
+    def _index_remove(self, logs):
+        for log in logs:
+            for index in self._indexes:
+                index.remove(log)
+
+    def _replaced(self, conn, log_ids):
+        """The stored logs an upsert of `log_ids` is about to overwrite (only read when indexed)."""
+        if not self._indexes:
+            return []
+        replaced = []
+        for start in range(0, len(log_ids), ID_CHUNK_SIZE):
+            chunk = log_ids[start:start + ID_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            replaced.extend(_row_log(row) for row in conn.execute(_SELECT_LOG + f" WHERE id IN ({placeholders})", chunk))
+        return replaced
+
+    # --- Reads ---
+
+    def __len__(self):
+        return self._conn().execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+
+    def __iter__(self):
+        # A dedicated cursor streams rows, so iteration never loads the whole case
+        cursor = self._conn().execute(_SELECT_LOG + _ORDER_BY)
+        for row in cursor:
+            yield _row_log(row)
+
+    def __contains__(self, log_id):
+        return self._conn().execute("SELECT 1 FROM logs WHERE id = ?", (log_id,)).fetchone() is not None
+
+    def get(self, log_id):
+        row = self._conn().execute(_SELECT_LOG + " WHERE id = ?", (log_id,)).fetchone()
+        return _row_log(row) if row else None
+
+    def get_summary(self, log_id):
+        """Returns the log for display with a preview body and `content_length`, or None."""
+        row = self._conn().execute(_SELECT_SUMMARY + " WHERE id = ?", (log_id,)).fetchone()
+        if not row:
+            return None
+        log = _row_log(row)
+        log['content_length'] = row['content_length'] or 0
+        return log
+
+    # --- Writes (one transaction each) ---
+
+    def add(self, log):
+        with self.lock, self._conn() as conn:
+            replaced = self._replaced(conn, [log['id']])
+            conn.execute(_INSERT_LOG, _log_row(log))
+            self._index_remove(replaced)
+            self._index_add([log])
+
+    def add_many(self, logs):
+        logs = list(logs)
+        with self.lock, self._conn() as conn:
+            replaced = self._replaced(conn, [log['id'] for log in logs])
+            conn.executemany(_INSERT_LOG, (_log_row(log) for log in logs))
+            self._index_remove(replaced)
+            self._index_add(logs)
+
+    def add_batches(self, batches):
+        """
+        Bulk-loads an iterable of log batches, one transaction per batch, so other
+        writers (access history, manual edits) get the database between batches
+        instead of waiting out the busy timeout. Batches loaded before an error
+        are kept. Returns the count.
+        """
+        conn = self._conn()
+        count = 0
+        for batch in batches:
+            with self.lock, conn:
+                replaced = self._replaced(conn, [log['id'] for log in batch])
+                conn.executemany(_INSERT_LOG, [_log_row(log) for log in batch])
+                self._index_remove(replaced)
+                self._index_add(batch)
+            count += len(batch)
+        return count
+
+    def update_many(self, changes):
+        with self.lock, self._conn() as conn:
+            for log_id, fields in changes.items():
+                row = conn.execute(_SELECT_LOG + " WHERE id = ?", (log_id,)).fetchone()
+                if row is None:
+                    continue
+                log = _row_log(row)
+                updated = {**log, **fields}
+                row = _log_row(updated)
+                conn.execute(_UPDATE_LOG, row[1:] + row[:1])
+                self._index_remove([log])
+                self._index_add([updated])
+
+    def remove(self, log_id):
+        conn = self._conn()
+        with self.lock, conn:
+            row = conn.execute(_SELECT_LOG + " WHERE id = ?", (log_id,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("DELETE FROM logs WHERE id = ?", (log_id,))
+            log = _row_log(row)
+            self._index_remove([log])
+        return log
+
+    def remove_many(self, log_ids):
+        """Removes every log in `log_ids` in one transaction. Returns the removed logs."""
+        log_ids = list(dict.fromkeys(log_ids))
+        removed = []
+        conn = self._conn()
+        with self.lock, conn:
+            for start in range(0, len(log_ids), ID_CHUNK_SIZE):
+                chunk = log_ids[start:start + ID_CHUNK_SIZE]
+                placeholders = ', '.join('?' * len(chunk))
+                removed.extend(_row_log(row) for row in conn.execute(_SELECT_LOG + f" WHERE id IN ({placeholders})", chunk))
+                conn.execute(f"DELETE FROM logs WHERE id IN ({placeholders})", chunk)
+            self._index_remove(removed)
+        return removed
+
+    def close(self):
+        pass
+
+    # --- Queries ---
+
+    def _where(self, keyword, log_type, gender, min_length, suspicious, min_key, max_key, ids=None):
+        """Translates the log view filters into a WHERE clause and its parameters."""
+        clauses = []
+        params = []
+        if ids is not None:
+            # IDs matched outside SQL travel as one JSON parameter, so any connection can re-run the query
+            clauses.append("id IN (SELECT value FROM json_each(?))")
+            params.append(json.dumps(list(ids)))
+        if keyword:
+            tokens = tokenize(keyword)
+            if tokens and self.has_fts:
+                # Every token must match as a word prefix (same semantics as InvertedIndex)
+                match = ' AND '.join('"' + token.replace('"', '""') + '"*' for token in tokens)
+                clauses.append("rowid IN (SELECT rowid FROM logs_fts WHERE logs_fts MATCH ?)")
+                params.append(match)
+            elif tokens:
+                for token in tokens:
+                    clauses.append("(lower(content_or_duration) LIKE ? OR lower(sender_name) LIKE ? OR lower(receiver_name) LIKE ?)")
+                    params.extend([f"%{token}%"] * 3)
+        if log_type != "All":
+            clauses.append("type = ?")
+            params.append(log_type)
+        if gender != "All":
+            clauses.append("sender_gender = ?")
+            params.append(gender)
+        if min_key is not None:
+            clauses.append("ts >= ?")
+            params.append(min_key)
+        if max_key is not None:
+            clauses.append("ts <= ?")
+            params.append(max_key)
+        if min_length > 0:
+            clauses.append("length >= ?")
+            params.append(min_length)
+        if suspicious == "Suspicious":
+            clauses.append("is_suspicious = 1")
+        elif suspicious == "Normal":
+            clauses.append("is_suspicious = 0")
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return where, params
+
+    def query_ids(self, token=None, keyword='', log_type="All", gender="All", min_length=-1,
+                  suspicious="All", min_key=None, max_key=None, ids=None):
+        """
+        Runs the filters as SQL and returns a lazily paged, chronological ID
+        sequence, limited to `ids` when given.
+        """
+        where, params = self._where(keyword, log_type, gender, min_length, suspicious, min_key, max_key, ids=ids)
+        conn = self._conn()
+        if token:
+            # Abort the running statement as soon as a newer query cancels this one
+            conn.set_progress_handler(lambda: 1 if token.cancelled else 0, PROGRESS_STEPS)
+        try:
+            count = conn.execute("SELECT COUNT(*) FROM logs" + where, params).fetchone()[0]
+        except sqlite3.OperationalError:
+            if token:
+                token.check()
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+        return SQLiteResultIds(self, where, params, count)
+
+    def _hour_range(self, granularity, min_key, max_key):
+        """A clause on activity.hour covering the whole buckets of a key range, and its parameters."""
+        size, offset = GRANULARITIES[granularity]
+        first, last = bucket_range(granularity, min_key, max_key)
+        clause = ""
+        params = []
+        if first is not None:
+            clause += " AND hour >= ?"
+            params.append((first * size + offset) // SECONDS_PER_HOUR)
+        if last is not None:
+            clause += " AND hour < ?"
+            params.append(((last + 1) * size + offset) // SECONDS_PER_HOUR)
+        return clause, params
+
+    def activity_histogram(self, granularity, min_key=None, max_key=None, dimension=None, value=None):
+        """Per-bucket (bucket, total, suspicious) counts, summed from the hourly activity table."""
+        check_query(granularity, dimension)
+        size, offset = GRANULARITIES[granularity]
+        hours, params = self._hour_range(granularity, min_key, max_key)
+        rows = self._conn().execute(
+            f"SELECT (hour * {SECONDS_PER_HOUR} - {offset}) / {size} AS bucket, SUM(total), SUM(suspicious) "
+            f"FROM activity WHERE dimension = ?{'' if dimension is None else ' AND value = json_quote(?)'}{hours} "
+            "GROUP BY bucket HAVING SUM(total) > 0 ORDER BY bucket",
+            (['type'] if dimension is None else [dimension, value]) + params
+        )
+        return [tuple(row) for row in rows]
+
+    def activity_breakdown(self, dimension, min_key=None, max_key=None, granularity='day'):
+        """(value, total, suspicious) counts per value of `dimension`, busiest first."""
+        check_query(granularity, dimension)
+        hours, params = self._hour_range(granularity, min_key, max_key)
+        rows = self._conn().execute(
+            f"SELECT value, SUM(total), SUM(suspicious) FROM activity WHERE dimension = ?{hours} "
+            "GROUP BY value HAVING SUM(total) > 0",
+            [dimension] + params
+        )
+        rows = [(json.loads(row[0]), row[1], row[2]) for row in rows]
+        # Same order as ActivityIndex.breakdown
+        rows.sort(key=lambda row: (-row[1], str(row[0])))
+        return rows
+
+
+class SQLiteResultIds:
+    """Sequence of matching log IDs that fetches only the slices that are read."""
+
+    def __init__(self, store, where, params, count):
+        self._store = store
+        self._where = where
+        self._params = params
+        self._count = count
+        # Position -> (ts, rowid) of the row just before it, recorded at the end
+        # of every slice read. The next slice resumes after that key through the
+        # index instead of counting past every earlier row with OFFSET, so paging
+        # through a result stays linear; reading away from every anchor skips
+        # rows from the nearest one before it.
+        self._anchors = {0: None}
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._count)
+            if step != 1:
+                raise ValueError("SQLiteResultIds only supports contiguous slices")
+            if stop <= start:
+                return []
+            base = max(position for position in self._anchors if position <= start)
+            rows = self._rows_after(self._anchors[base])
+            ids = []
+            key = None
+            for log_id, ts, rowid in islice(rows, start - base, stop - base):
+                ids.append(log_id)
+                key = (ts, rowid)
+            rows.close()
+            if len(ids) == stop - start:
+                self._anchors[stop] = key
+            return ids
+        ids = self[index:index + 1]
+        if not ids:
+            raise IndexError(index)
+        return ids[0]
+
+    def __iter__(self):
+        for log_id, _, _ in self._rows_after(None):
+            yield log_id
+
+    def iter_logs(self):
+        """Yields the matching logs in order, streamed from a single cursor."""
+        cursor = self._store._conn().execute(_SELECT_LOG + self._where + _ORDER_BY, self._params)
+        for row in cursor:
+            yield _row_log(row)
+
+    def _rows_after(self, key):
+        """Yields (id, ts, rowid) for the matches ordered after `key`, a (ts, rowid) pair, or all of them."""
+        conn = self._store._conn()
+        select = "SELECT id, ts, rowid FROM logs" + self._where
+        if key is None:
+            yield from conn.execute(select + _ORDER_BY, self._params)
+            return
+        ts, rowid = key
+        select += " AND " if self._where else " WHERE "
+        if ts is None:
+            # Undated logs sort first: finish them, then read the dated ones
+            yield from conn.execute(select + "ts IS NULL AND rowid > ?" + _ORDER_BY, self._params + [rowid])
+            yield from conn.execute(select + "ts IS NOT NULL" + _ORDER_BY, self._params)
+        else:
+            yield from conn.execute(select + "(ts, rowid) > (?, ?)" + _ORDER_BY, self._params + [ts, rowid])
+
+
+class SQLiteAccessHistory:
+    """Append-only access history backed by the `access_history` table."""
+
+    def __init__(self, connections):
+        self._connections = connections
+
+    def append(self, entry):
+        # A single-row insert in WAL mode is cheap enough to run inline, and keeps
+        # the entry visible to the admin view immediately
+        with self._connections.get() as conn:
+            conn.execute(
+                "INSERT INTO access_history (timestamp, user, action) VALUES (?, ?, ?)",
+                (entry.get('timestamp'), entry.get('user'), entry.get('action'))
+            )
+
+    def append_many(self, entries):
+        with self._connections.get() as conn:
+            conn.executemany(
+                "INSERT INTO access_history (timestamp, user, action) VALUES (?, ?, ?)",
+                ((entry.get('timestamp'), entry.get('user'), entry.get('action')) for entry in entries)
+            )
+
+    def __len__(self):
+        return self._connections.get().execute("SELECT COUNT(*) FROM access_history").fetchone()[0]
+
+    def users(self):
+        rows = self._connections.get().execute("SELECT DISTINCT user FROM access_history")
+        return sorted(row[0] for row in rows if row[0] is not None)
+
+    def iter_newest_first(self, user=None, start=None, end=None):
+        clauses = []
+        params = []
+        if user:
+            clauses.append("user = ?")
+            params.append(user)
+        if start:
+            clauses.append("timestamp >= ?")
+            params.append(start)
+        if end:
+            clauses.append("timestamp <= ?")
+            params.append(end)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        rows = self._connections.get().execute(
+            "SELECT timestamp, user, action FROM access_history" + where + " ORDER BY seq DESC", params
+        )
+        for row in rows:
+            yield {"timestamp": row[0], "user": row[1], "action": row[2]}
+
+    def close(self):
+        pass
+
+
+class SQLiteUsers(MutableMapping):
+    """username -> credentials mapping; every assignment is written immediately."""
+
+    def __init__(self, connections):
+        self._connections = connections
+
+    def __getitem__(self, username):
+        row = self._connections.get().execute("SELECT data FROM users WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            raise KeyError(username)
+        return json.loads(row[0])
+
+    def __setitem__(self, username, data):
+        with self._connections.get() as conn:
+            conn.execute("INSERT OR REPLACE INTO users (username, data) VALUES (?, ?)", (username, json.dumps(data)))
+
+    def __delitem__(self, username):
+        with self._connections.get() as conn:
+            if conn.execute("DELETE FROM users WHERE username = ?", (username,)).rowcount == 0:
+                raise KeyError(username)
+
+    def __iter__(self):
+        rows = self._connections.get().execute("SELECT username FROM users").fetchall()
+        return iter(row[0] for row in rows)
+
+    def __len__(self):
+        return self._connections.get().execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+
+class SQLiteStorage:
+    """SQLite backend for LogAnalyzerApp (see storage.py for the backend interface)."""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._connections = _Connections(db_path)
+
+        conn = self._connections.get()
+        conn.executescript(SCHEMA)
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'activity'").fetchone() is None:
+            # Created with the triggers in one transaction, so no write is counted twice or missed
+            conn.executescript("BEGIN; " + ACTIVITY_SCHEMA + ACTIVITY_BACKFILL + "COMMIT;")
+        try:
+            conn.executescript(FTS_SCHEMA)
+            has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: keyword search falls back to LIKE scans
+            has_fts = False
+
+        self.logs = SQLiteLogStore(self._connections, has_fts)
+        self.access_history = SQLiteAccessHistory(self._connections)
+        self.users = SQLiteUsers(self._connections)
+        self._contacts = None
+        self._fuzzy_index = None
+
+    @property
+    def contacts(self):
+        """The ContactGraph, built from the database on first use and then kept up to date."""
+        with self.logs.lock:
+            if self._contacts is None:
+                self._contacts = self.logs.add_index(ContactGraph())
+            return self._contacts
+
+    @property
+    def fuzzy_index(self):
+        """The FuzzyIndex over Text content, built from the database on first use."""
+        with self.logs.lock:
+            if self._fuzzy_index is None:
+                self._fuzzy_index = self.logs.add_index(FuzzyIndex())
+            return self._fuzzy_index
+
+    def query_log_ids(self, token=None, fuzzy=False, **filters):
+        if fuzzy and filters.get('keyword'):
+            with self.logs.lock:
+                ids = self.fuzzy_index.search(filters.pop('keyword'))
+            return self.logs.query_ids(token=token, ids=ids, **filters)
+        return self.logs.query_ids(token=token, **filters)
+
+    def activity_histogram(self, granularity, min_key=None, max_key=None, dimension=None, value=None):
+        return self.logs.activity_histogram(granularity, min_key=min_key, max_key=max_key, dimension=dimension, value=value)
+
+    def activity_breakdown(self, dimension, min_key=None, max_key=None, granularity='day'):
+        return self.logs.activity_breakdown(dimension, min_key=min_key, max_key=max_key, granularity=granularity)
+
+    def save_users(self):
+        # Users are written row by row as they are assigned
+        pass
+
+    def import_from(self, storage, batch_size=MIGRATION_BATCH_SIZE):
+        """Bulk-copies logs, users and access history from another storage backend."""
+        batch = []
+        for log in storage.logs:
+            batch.append(log)
+            if len(batch) >= batch_size:
+                self.logs.add_many(batch)
+                batch = []
+        if batch:
+            self.logs.add_many(batch)
+
+        for username, data in storage.users.items():
+            self.users[username] = data
+
+        # Access history is stored oldest-first
+        entries = list(storage.access_history.iter_newest_first())
+        entries.reverse()
+        for start in range(0, len(entries), batch_size):
+            self.access_history.append_many(entries[start:start + batch_size])
+
+    def close(self):
+        self._connections.close()
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python sqlite_store.py <database file> [<case data directory>]")
+        sys.exit(1)
+
+    db_path = os.path.abspath(sys.argv[1])
+    if len(sys.argv) > 2:
+        os.chdir(sys.argv[2])
+
+    from storage import open_journal_storage
+
+    source = open_journal_storage()
+    target = SQLiteStorage(db_path)
+    target.import_from(source)
+    print(f"Migrated {len(target.logs)} log entries, {len(target.users)} users and "
+          f"{len(target.access_history)} access entries into {db_path}")
+    source.close()
+    target.close()
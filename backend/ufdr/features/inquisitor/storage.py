@@ -0,0 +1,147 @@
+import json
+import os
+
+from access_journal import AccessJournal
+from activity_index import ActivityIndex
+from contact_graph import ContactGraph
+from fuzzy_index import FuzzyIndex
+from log_columns import LogColumns
+from log_store import LogStore
+from search_index import InvertedIndex
+from sqlite_store import SQLiteStorage
+
+# --- Case Data Files (relative to the working directory) ---
+
+LOGS_FILE = 'communication_logs.json' # Legacy whole-document format, migrated once into the journaled store
+LOGS_SNAPSHOT_FILE = 'communication_logs.snapshot.jsonl'
+LOGS_JOURNAL_FILE = 'communication_logs.journal.jsonl'
+USERS_FILE = 'user_credentials.json'
+ACCESS_LOG_FILE = 'access_history.json' # Legacy whole-document format, migrated once into ACCESS_LOG_DIR
+ACCESS_LOG_DIR = 'access_history'
+SQLITE_DB_FILE = 'inquisitor.db'
+
+# Storage backend: 'journal' (JSONL files + in-memory indexes) or 'sqlite' (SQLITE_DB_FILE).
+# A new SQLite database is seeded from any existing journal files.
+STORAGE_BACKEND = os.environ.get('INQUISITOR_STORAGE', 'journal')
+
+# --- Storage Backends ---
+#
+# LogAnalyzerApp talks to its data through a storage object exposing:
+#   logs             the communication log store (add / remove / update_many / get / iteration)
+#   access_history   append-only access journal (append / iter_newest_first / users)
+#   users            mapping of username -> credentials
+#   query_log_ids()  runs the log view filters and returns the matching IDs in
+#                    chronological order, as a sequence supporting len() and slicing;
+#                    fuzzy=True matches the keyword through the FuzzyIndex
+#   fuzzy_index      FuzzyIndex over Text content (fuzzy_index.py), read under logs.lock
+#   activity_histogram() / activity_breakdown()
+#                    per hour/day/week message counts (see activity_index.py)
+#   contacts         who-talks-to-whom ContactGraph (contact_graph.py), read under logs.lock
+#   save_users(), close()
+# JournalStorage (below) keeps everything in files and answers queries from
+# in-memory indexes; SQLiteStorage (sqlite_store.py) pushes queries down to SQL.
+
+
+def load_data(filepath, default_data={}):
+    """Loads data from a JSON file."""
+    if os.path.exists(filepath):
+        try:
+            with open(filepath, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return default_data
+    return default_data
+
+def save_data(filepath, data):
+    """Saves data to a JSON file."""
+    try:
+        with open(filepath, 'w') as f:
+            json.dump(data, f, indent=4)
+    except IOError as e:
+        print(f"Error saving data to {filepath}: {e}")
+
+
+class JournalStorage:
+    """File-based backend: journaled log store, segmented access history and a JSON users file."""
+
+    name = 'journal'
+
+    def __init__(self, snapshot_path, journal_path, legacy_logs_path, access_dir, legacy_access_path,
+                 users_path, default_users, writer=None):
+        self.users_path = users_path
+        self.writer = writer
+
+        self.logs = LogStore(snapshot_path, journal_path, legacy_path=legacy_logs_path, writer=writer)
+        self.search_index = self.logs.add_index(InvertedIndex())
+        self.log_columns = self.logs.add_index(LogColumns())
+        self.activity = self.logs.add_index(ActivityIndex())
+        self.contacts = self.logs.add_index(ContactGraph())
+        self.fuzzy_index = self.logs.add_index(FuzzyIndex())
+
+        self.access_history = AccessJournal(access_dir, legacy_path=legacy_access_path, writer=writer)
+        # IMPORTANT: If the users file exists, it will load whatever format it has (old string or new dict)
+        self.users = load_data(users_path, default_data=default_users)
+
+    def query_log_ids(self, token=None, keyword='', log_type="All", gender="All", min_length=-1,
+                      suspicious="All", min_key=None, max_key=None, fuzzy=False):
+        with self.logs.lock:
+            # Keyword matches come from the inverted index (word prefixes over content,
+            # sender and receiver) instead of a substring scan of every log; fuzzy
+            # matches come from the n-gram index over message content
+            keyword_ids = None
+            if keyword:
+                keyword_ids = self.fuzzy_index.search(keyword) if fuzzy else self.search_index.search(keyword)
+            if token:
+                token.check()
+
+            # The remaining filters are evaluated as vectorized masks over the log
+            # columns; the result comes back in chronological order
+            slots = self.log_columns.filter(
+                log_type=log_type, gender=gender, min_length=min_length, suspicious=suspicious,
+                min_key=min_key, max_key=max_key, ids=keyword_ids
+            )
+            return self.log_columns.result_ids(slots)
+
+    def activity_histogram(self, granularity, min_key=None, max_key=None, dimension=None, value=None):
+        with self.logs.lock:
+            return self.activity.histogram(granularity, min_key=min_key, max_key=max_key, dimension=dimension, value=value)
+
+    def activity_breakdown(self, dimension, min_key=None, max_key=None, granularity='day'):
+        with self.logs.lock:
+            return self.activity.breakdown(dimension, min_key=min_key, max_key=max_key, granularity=granularity)
+
+    def save_users(self):
+        if self.writer:
+            self.writer.submit(save_data, self.users_path, dict(self.users))
+        else:
+            save_data(self.users_path, self.users)
+
+    def close(self):
+        self.logs.close()
+        if self.writer:
+            self.writer.flush()
+        self.access_history.close()
+
+
+def open_journal_storage(default_users=None, writer=None):
+    """Opens the file-based case data in the current directory."""
+    return JournalStorage(
+        LOGS_SNAPSHOT_FILE, LOGS_JOURNAL_FILE, LOGS_FILE, ACCESS_LOG_DIR, ACCESS_LOG_FILE,
+        USERS_FILE, default_users or {}, writer=writer
+    )
+
+
+def open_storage(backend=None, default_users=None, writer=None):
+    """Opens the configured storage backend, seeding a new SQLite database from the journal files."""
+    if (backend or STORAGE_BACKEND) != 'sqlite':
+        return open_journal_storage(default_users=default_users, writer=writer)
+
+    is_new = not os.path.exists(SQLITE_DB_FILE)
+    storage = SQLiteStorage(SQLITE_DB_FILE)
+    if is_new:
+        source = open_journal_storage()
+        storage.import_from(source)
+        source.close()
+    if default_users and not len(storage.users):
+        storage.users.update(default_users)
+    return storage
@@ -0,0 +1,185 @@
+import json
+import os
+from collections import deque
+
+from fuzzy_index import FuzzyTermSet
+
+# --- Suspicious Term Matcher ---
+#
+# The term list is compiled once into an Aho-Corasick automaton, so scanning a
+# message is a single pass over its characters no matter how many terms there
+# are. Matches follow the old regex semantics: case-insensitive, whole words
+# only (a hit must not be glued to a letter, digit or underscore on either side).
+# In fuzzy mode a term also counts when it appears obfuscated (leetspeak,
+# spaced out or within a small edit distance, see fuzzy_index.py); the terms'
+# words are indexed by trigram once per reload, so a message only runs the
+# edit distance check against the terms it shares trigrams with.
+
+DEFAULT_THRESHOLD = 1.0
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == '_'
+
+
+def _normalize_terms(terms):
+    """Accepts a list of terms or a {term: weight} mapping and returns {term: weight}."""
+    if isinstance(terms, dict):
+        items = terms.items()
+    else:
+        items = ((term, 1.0) for term in terms)
+    weighted = {}
+    for term, weight in items:
+        term = term.strip().lower()
+        if term:
+            weighted[term] = float(weight)
+    return weighted
+
+
+class SuspiciousTermMatcher:
+    """Weighted multi-term matcher compiled once and reloadable at runtime."""
+
+    def __init__(self, terms, threshold=DEFAULT_THRESHOLD, terms_path=None, fuzzy=False):
+        self.threshold = threshold
+        self.terms_path = terms_path
+        self.fuzzy = fuzzy
+        self._terms_mtime = None
+        self.reload(terms)
+
+    @classmethod
+    def from_file(cls, terms_path, default_terms, threshold=DEFAULT_THRESHOLD, fuzzy=False):
+        """Builds a matcher from a JSON terms file, falling back to `default_terms`."""
+        matcher = cls(default_terms, threshold=threshold, terms_path=terms_path, fuzzy=fuzzy)
+        matcher.reload_if_changed()
+        return matcher
+
+    # --- Compilation ---
+
+    def reload(self, terms):
+        """Replaces the term list and recompiles the automaton."""
+        self.weights = _normalize_terms(terms)
+
+        goto = [{}]     # state -> {char: next state}
+        outputs = [[]]  # state -> terms ending in that state
+        for term in self.weights:
+            state = 0
+            for ch in term:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(term)
+
+        # Breadth-first construction of failure links
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                f = goto[f].get(ch, 0)
+                fail[nxt] = f if f != nxt else 0
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._outputs = outputs
+        self._fuzzy_terms = FuzzyTermSet(self.weights)
+
+    def reload_if_changed(self):
+        """Reloads the terms file if it changed since the last load. Returns True on reload."""
+        if not self.terms_path or not os.path.exists(self.terms_path):
+            return False
+        mtime = os.path.getmtime(self.terms_path)
+        if mtime == self._terms_mtime:
+            return False
+        try:
+            with open(self.terms_path, 'r', encoding='utf-8') as f:
+                terms = json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error loading suspicious terms from {self.terms_path}: {e}")
+            return False
+        self._terms_mtime = mtime
+        self.reload(terms)
+        return True
+
+    # --- Matching ---
+
+    def find(self, text):
+        """Returns (term, start, end, weight) for every whole-word hit in `text`."""
+        if not text:
+            return []
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        lowered = text.lower()
+        hits = []
+        state = 0
+        for i, ch in enumerate(lowered):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for term in outputs[state]:
+                start, end = i - len(term) + 1, i + 1
+                if start > 0 and _is_word_char(lowered[start - 1]):
+                    continue
+                if end < len(lowered) and _is_word_char(lowered[end]):
+                    continue
+                hits.append((term, start, end, self.weights[term]))
+        return hits
+
+    def matched_terms(self, text):
+        """The distinct terms found in `text` (exactly, or approximately in fuzzy mode)."""
+        terms = {hit[0] for hit in self.find(text)}
+        if self.fuzzy and text:
+            terms |= self._fuzzy_terms.matches(text)
+        return terms
+
+    def score(self, text):
+        """Sums the weights of the distinct terms found in `text`."""
+        return sum(self.weights[term] for term in self.matched_terms(text))
+
+    def is_suspicious(self, text):
+        return self.score(text) >= self.threshold
+
+    def flag(self, log):
+        """Computes `is_suspicious` for a log record; only Text content is scanned."""
+        if log.get('type') != "Text":
+            return False
+        return self.is_suspicious(log.get('content_or_duration', ''))
+
+    def rescan_all(self, store, fuzzy_index=None):
+        """
+        Recomputes `is_suspicious` for every log. Returns the number changed.
+        In fuzzy mode, given the store's FuzzyIndex, each term's fuzzy matches are
+        looked up in the index once instead of per message; the exact hits still
+        come from the scan, so the flags are the same as flag() gives.
+        """
+        fuzzy_hits = None
+        if self.fuzzy and fuzzy_index is not None:
+            fuzzy_hits = {}
+            with store.lock:
+                for term in self.weights:
+                    for log_id in fuzzy_index.search(term) or ():
+                        fuzzy_hits.setdefault(log_id, set()).add(term)
+
+        changes = {}
+        for log in store:
+            if fuzzy_hits is None:
+                flagged = self.flag(log)
+            elif log.get('type') != "Text":
+                flagged = False
+            else:
+                # The index misses exact hits its word splitting cannot see (e.g. non-Latin scripts)
+                terms = {hit[0] for hit in self.find(log.get('content_or_duration', ''))}
+                terms |= fuzzy_hits.get(log['id'], set())
+                flagged = sum(self.weights[term] for term in terms) >= self.threshold
+            if flagged != log.get('is_suspicious', False):
+                changes[log['id']] = {"is_suspicious": flagged}
+        if changes:
+            store.update_many(changes)
+        return len(changes)
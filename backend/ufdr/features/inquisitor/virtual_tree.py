@@ -0,0 +1,192 @@
+# --- Virtualized Treeview ---
+#
+# A ttk.Treeview gets slow once it holds tens of thousands of items, so only a
+# window of the result set is materialized: a few pages of `page_size` rows,
+# with the next page fetched whenever the user scrolls near the bottom (or the
+# previous one near the top). The window holds at most `max_pages` pages; the
+# page farthest from the one being fetched is dropped, and fetched again if the
+# user scrolls back, so the tree's size depends on the viewport and not on how
+# deep the user has scrolled. Rows use the log ID as their Treeview iid, which
+# lets a new result set be applied as a diff against the rows already on screen
+# (delete what left, move what was reordered, insert what is new, update what
+# changed) instead of a rebuild.
+
+from collections import deque
+
+DEFAULT_PAGE_SIZE = 200
+# Pages kept in the tree at once
+DEFAULT_MAX_PAGES = 5
+# Fraction of the scrollable height after which the next page is fetched (and,
+# mirrored, before which the previous page is fetched)
+FETCH_THRESHOLD = 0.9
+
+
+class VirtualTreeview:
+    """Shows a (possibly huge) sequence of row IDs in a Treeview, a bounded window of pages at a time."""
+
+    def __init__(self, tree, scrollbar, row_values, page_size=DEFAULT_PAGE_SIZE, max_pages=DEFAULT_MAX_PAGES,
+                 on_window_change=None):
+        """
+        `row_values(iid)` returns (values, tags) for a row, or None if the row no
+        longer exists. `on_window_change(first, last, total)` is called whenever
+        the window moves: rows first..last-1 of `total` are materialized.
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_values = row_values
+        self.page_size = page_size
+        self.max_pages = max(2, max_pages)
+        self.on_window_change = on_window_change
+
+        self._rows = []        # full result: any sequence of iids supporting len() and slicing
+        self._start = 0        # index in self._rows where the window starts
+        self._loaded = 0       # index in self._rows where the window ends
+        self._shown = []       # iids currently in the tree, in display order
+        self._pages = deque()  # iids shown per page of the window, top to bottom
+        self._values = {}      # iid -> (values, tags) as last written to the tree
+        self._fetch_pending = False
+
+        tree.configure(yscrollcommand=self._on_yscroll)
+        scrollbar.configure(command=tree.yview)
+
+    def __len__(self):
+        return len(self._rows)
+
+    @property
+    def rows(self):
+        """The full result currently applied (every matching iid, not just the window)."""
+        return self._rows
+
+    def set_rows(self, rows):
+        """Replaces the result set and shows its first page."""
+        self._rows = rows
+        self._apply_window(0, 1)
+        self.tree.yview_moveto(0)
+
+    def refresh(self):
+        """Re-applies the current result set at the same window, e.g. after rows were edited."""
+        self._apply_window(self._start, max(1, len(self._pages)))
+
+    # --- Window Management ---
+
+    def _page(self, start):
+        """Resolves the page of rows beginning at `start` into (iid, values) pairs."""
+        page = []
+        for iid in self._rows[start:start + self.page_size]:
+            row = self.row_values(iid)
+            if row is not None:
+                page.append((iid, row))
+        return page
+
+    def _apply_window(self, start, pages):
+        # A shrunken result keeps the window inside it
+        last_page = max(0, (len(self._rows) - 1) // self.page_size)
+        first_page = min(start // self.page_size, last_page)
+        pages = min(pages, last_page - first_page + 1)
+        resolved = [self._page((first_page + i) * self.page_size) for i in range(pages)]
+        window = [item for page in resolved for item in page]
+        self._start = first_page * self.page_size
+        self._loaded = min(self._start + pages * self.page_size, len(self._rows))
+        self._pages = deque([iid for iid, _ in page] for page in resolved)
+
+        target_set = {iid for iid, _ in window}
+        old_set = set(self._shown)
+
+        removed = [iid for iid in self._shown if iid not in target_set]
+        if removed:
+            self.tree.delete(*removed)
+            for iid in removed:
+                del self._values[iid]
+
+        # Walk the target order against the surviving rows: rows already in
+        # place are left alone, out-of-order rows are moved, new rows inserted.
+        current = [iid for iid in self._shown if iid in target_set]
+        pos = 0
+        moved = set()
+        for index, (iid, row) in enumerate(window):
+            while pos < len(current) and current[pos] in moved:
+                pos += 1
+            if pos < len(current) and current[pos] == iid:
+                pos += 1
+            elif iid in old_set:
+                self.tree.move(iid, '', index)
+                moved.add(iid)
+            else:
+                values, tags = row
+                self.tree.insert('', index, iid=iid, values=values, tags=tags)
+                self._values[iid] = row
+                continue
+            if self._values.get(iid) != row:
+                values, tags = row
+                self.tree.item(iid, values=values, tags=tags)
+                self._values[iid] = row
+
+        self._shown = [iid for iid, _ in window]
+        self._notify()
+
+    def _insert_page(self, start, at_top):
+        """Inserts the page beginning at `start` above or below the window; returns its iids."""
+        iids = []
+        for iid, (values, tags) in self._page(start):
+            # Skip a row that moved into the window since the result was applied
+            if iid in self._values:
+                continue
+            self.tree.insert('', len(iids) if at_top else 'end', iid=iid, values=values, tags=tags)
+            self._values[iid] = (values, tags)
+            iids.append(iid)
+        return iids
+
+    def _drop_page(self, at_top):
+        """Removes the top or bottom page of the window from the tree; returns how many rows went."""
+        iids = self._pages.popleft() if at_top else self._pages.pop()
+        if iids:
+            self.tree.delete(*iids)
+            for iid in iids:
+                del self._values[iid]
+        return len(iids)
+
+    def _extend(self, at_top=False):
+        """Materializes the page next to the window, dropping the farthest page if the window is full."""
+        self._fetch_pending = False
+        if (self._start <= 0) if at_top else (self._loaded >= len(self._rows)):
+            return
+        # Keep the first visible row in place while rows come and go above it
+        first_row = round(float(self.tree.yview()[0]) * len(self._shown))
+        if at_top:
+            self._start = max(0, self._start - self.page_size)
+            iids = self._insert_page(self._start, at_top=True)
+            self._pages.appendleft(iids)
+            self._shown[:0] = iids
+            first_row += len(iids)
+        else:
+            iids = self._insert_page(self._loaded, at_top=False)
+            self._pages.append(iids)
+            self._shown.extend(iids)
+            self._loaded = min(self._loaded + self.page_size, len(self._rows))
+        if len(self._pages) > self.max_pages:
+            dropped = self._drop_page(at_top=not at_top)
+            if at_top:
+                del self._shown[len(self._shown) - dropped:]
+                self._loaded = self._start + len(self._pages) * self.page_size
+            else:
+                del self._shown[:dropped]
+                self._start += self.page_size
+                first_row -= dropped
+        if self._shown:
+            self.tree.yview_moveto(max(0, first_row) / len(self._shown))
+        self._notify()
+
+    def _on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self._fetch_pending:
+            return
+        if float(last) >= FETCH_THRESHOLD and self._loaded < len(self._rows):
+            self._fetch_pending = True
+            self.tree.after_idle(self._extend)
+        elif float(first) <= 1 - FETCH_THRESHOLD and self._start > 0:
+            self._fetch_pending = True
+            self.tree.after_idle(lambda: self._extend(at_top=True))
+
+    def _notify(self):
+        if self.on_window_change:
+            self.on_window_change(self._start, self._loaded, len(self._rows))
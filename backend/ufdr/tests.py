@@ -1,3 +1,491 @@
-from django.test import TestCase
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+# the ChronoTrack and Inquisitor modules import their siblings by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "features", "chronotrack"))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "features", "inquisitor"))
+
+from body_file import BodyFile, pack, unpack  # noqa: E402
+from fuzzy_index import FuzzyIndex, FuzzyTermSet  # noqa: E402
+from log_store import LogStore  # noqa: E402
+from sqlite_store import SQLiteStorage  # noqa: E402
+from storage import JournalStorage  # noqa: E402
+from suspicious_matcher import SuspiciousTermMatcher  # noqa: E402
+from upload_registry import DEFAULT_TTL_SECONDS, UploadRegistry  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class FakeFilesApi:
+    """In-memory stand-in for client.files: upload() and get(), plus delete() for the tests."""
+
+    def __init__(self, clock, delay=0.0):
+        self.clock = clock
+        self.delay = delay
+        self.uploads = []
+        self.files = {}
+        self._lock = threading.Lock()
+
+    def upload(self, file, config=None):
+        with self._lock:
+            name = f"files/{len(self.uploads)}"
+            self.uploads.append(file)
+        # long enough for concurrent callers to overlap
+        time.sleep(self.delay)
+        remote = SimpleNamespace(name=name, uri=f"https://example.invalid/{name}",
+                                 mime_type=(config or {}).get("mime_type"),
+                                 expiration_time=self.clock() + DEFAULT_TTL_SECONDS)
+        self.files[name] = remote
+        return remote
+
+    def get(self, name):
+        return self.files[name]
+
+    def delete(self, name):
+        del self.files[name]
+
+
+class UploadRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.clock = FakeClock()
+        self.files_api = FakeFilesApi(self.clock)
+        self.registry = self.open_registry()
+
+    def open_registry(self):
+        registry = UploadRegistry(self.files_api, os.path.join(self.dir, "uploads.sqlite"), clock=self.clock)
+        self.addCleanup(registry.close)
+        return registry
+
+    def evidence(self, name, content=b"recording"):
+        path = os.path.join(self.dir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_same_content_is_reused(self):
+        first = self.registry.upload(self.evidence("a.mp3"), "audio/mpeg")
+        second = self.registry.upload(self.evidence("copy of a.mp3"), "audio/mpeg")
+        self.assertEqual(len(self.files_api.uploads), 1)
+        self.assertFalse(first.reused)
+        self.assertTrue(second.reused)
+        self.assertEqual(second.name, first.name)
+        self.assertEqual(second.mime_type, "audio/mpeg")
+        self.assertEqual((self.registry.uploaded, self.registry.reused), (1, 1))
+
+    def test_changed_content_is_uploaded(self):
+        path = self.evidence("a.mp3")
+        self.registry.upload(path)
+        self.evidence("a.mp3", b"edited recording")
+        entry = self.registry.upload(path)
+        self.assertEqual(len(self.files_api.uploads), 2)
+        self.assertFalse(entry.reused)
+
+    def test_reused_across_registry_instances(self):
+        path = self.evidence("a.mp3")
+        first = self.registry.upload(path)
+        self.registry.close()
+        entry = self.open_registry().upload(path)
+        self.assertTrue(entry.reused)
+        self.assertEqual(entry.name, first.name)
+
+    def test_handle_inside_expiry_margin_is_uploaded_again(self):
+        path = self.evidence("a.mp3")
+        first = self.registry.upload(path)
+        self.clock.now = first.expires - self.registry.expiry_margin - 1
+        self.assertTrue(self.registry.upload(path).reused)
+        self.clock.now = first.expires - self.registry.expiry_margin
+        entry = self.registry.upload(path)
+        self.assertFalse(entry.reused)
+        self.assertNotEqual(entry.name, first.name)
+        self.assertEqual(len(self.files_api.uploads), 2)
+        # the new handle replaces the old one
+        self.assertTrue(self.registry.upload(path).reused)
+        self.assertEqual(len(self.files_api.uploads), 2)
+
+    def test_handle_deleted_on_server_is_uploaded_again(self):
+        path = self.evidence("a.mp3")
+        first = self.registry.upload(path)
+        self.files_api.delete(first.name)
+        entry = self.registry.upload(path)
+        self.assertFalse(entry.reused)
+        self.assertNotEqual(entry.name, first.name)
+        self.assertEqual(len(self.files_api.uploads), 2)
+
+    def test_concurrent_uploads_of_same_content_share_one(self):
+        self.files_api.delay = 0.05
+        paths = [self.evidence(f"copy{i}.mp3") for i in range(8)]
+        barrier = threading.Barrier(len(paths))
+        results = [None] * len(paths)
+
+        def upload(i):
+            barrier.wait()
+            results[i] = self.registry.upload(paths[i])
+
+        threads = [threading.Thread(target=upload, args=(i,)) for i in range(len(paths))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.files_api.uploads), 1)
+        self.assertEqual({entry.name for entry in results}, {"files/0"})
+        self.assertEqual(sum(not entry.reused for entry in results), 1)
+        self.assertEqual((self.registry.uploaded, self.registry.reused), (1, len(paths) - 1))
+
+
+def text_log(log_id, content, **fields):
+    return {"id": log_id, "type": "Text", "sender_name": "a", "receiver_name": "b", "sender_gender": "M",
+            "receiver_gender": "F", "date": "01-03-2024", "time": "10:00:00", "content_or_duration": content,
+            "is_suspicious": False, **fields}
+
+
+class SuspiciousRescanTests(SimpleTestCase):
+    TERMS = {"bomb": 1.0, "attack": 1.0, "code word": 1.0, "धमाका": 1.0, "meeting": 0.5, "secret": 0.5}
+    MESSAGES = [
+        "the b0mb is ready", "a t t a c k at dawn", "c0de w0rd!", "कल धमाका होगा", "धमाका",
+        "secret meeting", "secret", "meet1ng later", "bombastic speech", "lunch at noon",
+        "attack@dawn", "the sekret meeting", "code and word", "",
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+
+    def open_store(self, name):
+        store = LogStore(os.path.join(self.dir, f"{name}.snapshot.jsonl"), os.path.join(self.dir, f"{name}.journal.jsonl"))
+        self.addCleanup(store.close)
+        logs = [text_log(str(i), message) for i, message in enumerate(self.MESSAGES)]
+        # stale flags, and a call that must never be flagged
+        logs.append(text_log("stale", "nothing to see", is_suspicious=True))
+        logs.append(text_log("call", "bomb", type="Call"))
+        store.add_batches([logs])
+        return store
+
+    def flags(self, store):
+        return {log["id"]: log["is_suspicious"] for log in store}
+
+    def test_indexed_rescan_matches_flagging_each_log(self):
+        matcher = SuspiciousTermMatcher(self.TERMS, fuzzy=True)
+        scanned = self.open_store("scanned")
+        indexed = self.open_store("indexed")
+        fuzzy_index = indexed.add_index(FuzzyIndex())
+
+        changed = matcher.rescan_all(scanned)
+        self.assertEqual(matcher.rescan_all(indexed, fuzzy_index=fuzzy_index), changed)
+        self.assertEqual(self.flags(indexed), self.flags(scanned))
+        self.assertEqual(self.flags(scanned), {log["id"]: matcher.flag(log) for log in scanned})
+        # exact hits the index's word splitting cannot see still count
+        self.assertTrue(self.flags(indexed)["3"])
+        self.assertFalse(self.flags(indexed)["stale"])
+        self.assertFalse(self.flags(indexed)["call"])
+        # a second rescan has nothing left to change
+        self.assertEqual(matcher.rescan_all(indexed, fuzzy_index=fuzzy_index), 0)
+
+
+def sample_logs(count=300, seed=7):
+    """Logs covering every filter: all types, undated and unnamed logs, bodies long enough to spill."""
+    rng = random.Random(seed)
+    words = ["send", "money", "package", "packed", "ready", "station", "call", "me", "tonight", "bomb", "secret"]
+    names = ["Aarav", "Priya", "Rahul", None]
+    logs = []
+    for i in range(count):
+        log_type = rng.choice(["Text", "Text", "Call", "Audio"])
+        if log_type == "Text":
+            content = " ".join(rng.choices(words, k=rng.randint(1, 30)))
+        else:
+            content = str(rng.randint(1, 600)) if log_type == "Call" else f"recording_{i}.mp3"
+        logs.append(text_log(
+            f"log-{i}", content, type=log_type, sender_name=rng.choice(names), receiver_name=rng.choice(names),
+            sender_gender=rng.choice("MFO"), receiver_gender=rng.choice("MFO"),
+            date="" if i % 25 == 0 else f"{rng.randint(1, 28):02d}-{rng.randint(1, 3):02d}-2024",
+            time=f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00", is_suspicious=rng.random() < 0.1,
+        ))
+    return logs
+
+
+class LogStoreTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.snapshot = os.path.join(self.dir, "logs.snapshot.jsonl")
+        self.journal = os.path.join(self.dir, "logs.journal.jsonl")
+
+    def open_store(self, **kwargs):
+        store = LogStore(self.snapshot, self.journal, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def edit(self, store):
+        """Adds, updates and removes through every journal operation; returns the expected logs."""
+        logs = sample_logs(60)
+        for log in logs[:40]:
+            store.add(log)
+        store.add_batches([logs[40:]])
+        store.add(dict(logs[3], content_or_duration="replaced " * 20))
+        store.update_many({"log-5": {"is_suspicious": True}, "log-6": {"content_or_duration": "edited"}, "missing": {"type": "Call"}})
+        store.remove("log-7")
+        self.assertEqual([log["id"] for log in store.remove_many(["log-8", "log-9", "log-8", "missing"])], ["log-8", "log-9"])
+        expected = {log["id"]: log for log in logs}
+        expected["log-3"] = dict(logs[3], content_or_duration="replaced " * 20)
+        expected["log-5"] = dict(logs[5], is_suspicious=True)
+        expected["log-6"] = dict(logs[6], content_or_duration="edited")
+        for log_id in ("log-7", "log-8", "log-9"):
+            del expected[log_id]
+        return expected
+
+    def contents(self, store):
+        return {log["id"]: log for log in store}
+
+    def test_reopen_replays_the_journal(self):
+        store = self.open_store()
+        expected = self.edit(store)
+        self.assertEqual(self.contents(store), expected)
+        store.close()
+        self.assertEqual(self.contents(self.open_store()), expected)
+
+    def test_compaction_folds_the_journal_into_the_snapshot(self):
+        store = self.open_store()
+        expected = self.edit(store)
+        store.compact()
+        self.assertEqual(os.path.getsize(self.journal), 0)
+        with open(self.snapshot, encoding="utf-8") as f:
+            self.assertEqual({json.loads(line)["id"] for line in f}, set(expected))
+        store.add(text_log("after", "written after the compaction"))
+        expected["after"] = store.get("after")
+        store.close()
+        self.assertEqual(self.contents(self.open_store()), expected)
+
+    def test_interrupted_compaction_is_replayed_before_the_journal(self):
+        store = self.open_store()
+        expected = self.edit(store)
+        store.close()
+        # a compaction that rotated the journal but never wrote its snapshot
+        os.replace(self.journal, self.journal + ".compacting")
+        with open(self.journal, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"op": "del", "id": "log-10"}) + "\n")
+        del expected["log-10"]
+        store = self.open_store()
+        self.assertEqual(self.contents(store), expected)
+        self.assertFalse(os.path.exists(self.journal + ".compacting"))
+
+    def test_torn_journal_line_is_skipped(self):
+        store = self.open_store()
+        expected = self.edit(store)
+        store.close()
+        with open(self.journal, "a", encoding="utf-8") as f:
+            f.write('{"op": "del", "id": "log-1')
+        self.assertEqual(self.contents(self.open_store()), expected)
+
+    def test_long_bodies_are_read_back_and_summarized(self):
+        store = self.open_store()
+        body = "a long message body " * 40
+        store.add(text_log("long", body))
+        self.assertEqual(store.get("long")["content_or_duration"], body)
+        summary = store.get_summary("long")
+        self.assertEqual(summary["content_length"], len(body))
+        self.assertTrue(body.startswith(summary["content_or_duration"]))
+        self.assertLess(len(summary["content_or_duration"]), len(body))
+        # edits and deletions leave dead space behind; compaction keeps every live body readable
+        for i in range(5):
+            store.update_many({"long": {"content_or_duration": f"{i} {body}"}})
+        store.add_batches([sample_logs(50)])
+        store.remove_many([f"log-{i}" for i in range(25)])
+        expected = self.contents(store)
+        store.compact()
+        self.assertEqual(self.contents(store), expected)
+        self.assertEqual(store.get("long")["content_or_duration"], f"4 {body}")
+
+
+class BodyFileTests(SimpleTestCase):
+    def setUp(self):
+        self.bodies = BodyFile()
+        self.addCleanup(self.bodies.close)
+
+    def test_short_content_stays_inline(self):
+        log = text_log("1", "short")
+        self.assertIs(pack(log, self.bodies), log)
+        self.assertEqual(len(self.bodies), 0)
+
+    def test_unchanged_body_keeps_its_ref(self):
+        log = text_log("1", "ünïcode body " * 20)
+        record = pack(log, self.bodies)
+        self.assertEqual(unpack(record), log)
+        size = len(self.bodies)
+        flagged = pack(dict(log, is_suspicious=True), self.bodies, record)
+        self.assertIs(flagged["content_or_duration"], record["content_or_duration"])
+        self.assertEqual(len(self.bodies), size)
+        edited = pack(dict(log, content_or_duration="other body " * 20), self.bodies, record)
+        self.assertEqual(unpack(edited)["content_or_duration"], "other body " * 20)
+        self.assertGreater(len(self.bodies), size)
+
+    def test_copied_body_reads_from_its_new_file(self):
+        record = pack(text_log("1", "copied body " * 20), self.bodies)
+        fresh = BodyFile()
+        self.addCleanup(fresh.close)
+        ref = fresh.copy(record["content_or_duration"])
+        self.assertIs(ref.bodies, fresh)
+        self.assertEqual(unpack(dict(record, content_or_duration=ref)), unpack(record))
+
+
+class StorageParityTests(SimpleTestCase):
+    """The journal and SQLite backends answer every query the same way."""
+
+    QUERIES = [
+        {},
+        {"keyword": "money"},
+        {"keyword": "pack"},
+        {"keyword": "send money"},
+        {"keyword": "aarav"},
+        {"log_type": "Text"},
+        {"gender": "F"},
+        {"min_length": 60},
+        {"suspicious": "Suspicious"},
+        {"suspicious": "Normal"},
+        {"min_key": 63843206400, "max_key": 63845798399},
+        {"keyword": "send", "log_type": "Text", "gender": "M", "min_key": 63842000000, "min_length": 20},
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.journal = self.open_journal()
+        self.sqlite = self.open_sqlite()
+        logs = sample_logs()
+        for storage in (self.journal, self.sqlite):
+            storage.logs.add_batches([logs[:200]])
+            for log in logs[200:]:
+                storage.logs.add(log)
+
+    def open_journal(self):
+        path = lambda name: os.path.join(self.dir, name)  # noqa: E731
+        storage = JournalStorage(path("logs.snapshot.jsonl"), path("logs.journal.jsonl"), path("logs.json"),
+                                 path("access"), path("access.json"), path("users.json"), {})
+        self.addCleanup(storage.close)
+        return storage
+
+    def open_sqlite(self):
+        storage = SQLiteStorage(os.path.join(self.dir, "case.db"))
+        self.addCleanup(storage.close)
+        return storage
+
+    def assertSameAnswers(self):
+        for query in self.QUERIES:
+            journal_ids = self.journal.query_log_ids(**query)
+            sqlite_ids = self.sqlite.query_log_ids(**query)
+            self.assertEqual(list(sqlite_ids), list(journal_ids), query)
+            self.assertEqual(len(sqlite_ids), len(journal_ids), query)
+            # slices read page by page match the full result
+            self.assertEqual([log_id for start in range(0, len(sqlite_ids), 7) for log_id in sqlite_ids[start:start + 7]],
+                             list(journal_ids), query)
+        for granularity in ("hour", "day", "week"):
+            for dimension, value in ((None, None), ("type", "Call"), ("sender", "Priya"), ("receiver", None)):
+                self.assertEqual(self.sqlite.activity_histogram(granularity, dimension=dimension, value=value),
+                                 self.journal.activity_histogram(granularity, dimension=dimension, value=value))
+            self.assertEqual(self.sqlite.activity_histogram(granularity, min_key=63843206400, max_key=63845798399),
+                             self.journal.activity_histogram(granularity, min_key=63843206400, max_key=63845798399))
+        for dimension in ("type", "sender", "receiver"):
+            self.assertEqual(self.sqlite.activity_breakdown(dimension), self.journal.activity_breakdown(dimension))
+        self.assertEqual({log["id"]: log for log in self.sqlite.logs}, {log["id"]: log for log in self.journal.logs})
+
+    def test_same_answers_after_loading(self):
+        self.assertSameAnswers()
+
+    def test_same_answers_after_edits(self):
+        for storage in (self.journal, self.sqlite):
+            storage.logs.update_many({f"log-{i}": {"is_suspicious": i % 2 == 0} for i in range(0, 300, 3)})
+            storage.logs.add(dict(storage.logs.get("log-1"), type="Call", date="15-02-2024", content_or_duration="42"))
+            removed = storage.logs.remove_many([f"log-{i}" for i in range(100, 150)] + ["missing"])
+            self.assertEqual(len(removed), 50)
+            self.assertIsNotNone(storage.logs.remove("log-2"))
+            self.assertIsNone(storage.logs.remove("log-2"))
+        self.assertSameAnswers()
+
+    def test_same_answers_after_reopening(self):
+        self.journal.logs.remove_many(["log-3", "log-4"])
+        self.sqlite.logs.remove_many(["log-3", "log-4"])
+        self.journal.close()
+        self.sqlite.close()
+        self.journal = self.open_journal()
+        self.sqlite = self.open_sqlite()
+        self.assertSameAnswers()
+
+
+class SuspiciousTermMatcherTests(SimpleTestCase):
+    def test_whole_words_only(self):
+        matcher = SuspiciousTermMatcher(["bomb", "code word", "word"])
+        self.assertEqual(matcher.find("A BOMB, bombastic"), [("bomb", 2, 6, 1.0)])
+        self.assertEqual({hit[0] for hit in matcher.find("the code word_")}, set())
+        self.assertEqual({hit[0] for hit in matcher.find("say the code word.")}, {"code word", "word"})
+        self.assertEqual(matcher.find(""), [])
+
+    def test_score_counts_each_term_once(self):
+        matcher = SuspiciousTermMatcher({"secret": 0.5, "meeting": 0.5, " Bomb ": 2})
+        self.assertEqual(matcher.score("secret secret"), 0.5)
+        self.assertFalse(matcher.is_suspicious("secret secret"))
+        self.assertTrue(matcher.is_suspicious("secret meeting"))
+        self.assertTrue(matcher.is_suspicious("bomb"))
+        self.assertFalse(matcher.flag({"type": "Call", "content_or_duration": "bomb"}))
+        self.assertTrue(matcher.flag({"type": "Text", "content_or_duration": "the bomb"}))
+
+    def test_reload_if_changed(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "terms.json")
+        matcher = SuspiciousTermMatcher.from_file(path, ["bomb"])
+        self.assertEqual(set(matcher.weights), {"bomb"})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"drop": 1.0}, f)
+        self.assertTrue(matcher.reload_if_changed())
+        self.assertFalse(matcher.reload_if_changed())
+        self.assertTrue(matcher.is_suspicious("the drop"))
+        self.assertFalse(matcher.is_suspicious("the bomb"))
+
+    def test_fuzzy_matches_obfuscated_terms(self):
+        terms = ["bomb", "attack", "target", "hide", "burner phone"]
+        exact = SuspiciousTermMatcher(terms)
+        fuzzy = SuspiciousTermMatcher(terms, fuzzy=True)
+        for text in ["the b0mb", "a t t a c k now", "hit the tagret", "@tt@ck", "burnerphone", "burnr phone"]:
+            self.assertFalse(exact.is_suspicious(text), text)
+            self.assertTrue(fuzzy.is_suspicious(text), text)
+        # no edits are tolerated on short words, and a longer word is not a hit
+        for text in ["hid it", "bombastic", "targeted", "attic"]:
+            self.assertFalse(fuzzy.is_suspicious(text), text)
+
+
+class FuzzyIndexTests(SimpleTestCase):
+    QUERIES = ["bomb", "attack", "target", "code word", "burner phone", "money"]
+
+    def test_term_set_agrees_with_index_search(self):
+        logs = sample_logs(200) + [text_log(f"x{i}", text) for i, text in enumerate(
+            ["b0mb", "a t t a c k", "tagret", "c0de w0rd", "code and word", "burnerphone", "m o n e y", "moneys"])]
+        index = FuzzyIndex()
+        index.rebuild(logs)
+        term_set = FuzzyTermSet(self.QUERIES)
+        for query in self.QUERIES:
+            expected = {log["id"] for log in logs if log["type"] == "Text" and query in term_set.matches(log["content_or_duration"])}
+            self.assertEqual(index.search(query), expected, query)
+
+    def test_removed_logs_are_not_found(self):
+        log = text_log("1", "the b0mb")
+        index = FuzzyIndex()
+        index.add(log)
+        self.assertEqual(index.search("bomb"), {"1"})
+        index.remove(log)
+        self.assertEqual(index.search("bomb"), set())
+        self.assertIsNone(index.search("-- ..."))